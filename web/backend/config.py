@@ -57,6 +57,13 @@ CONTENT_TYPES = {
     "other": REPORTS_DIR / "other",
 }
 
+# Fetch cache: compressed text of fetched sources, keyed by canonical source id
+FETCH_CACHE_DIR = PROJECT_ROOT / "cache" / "fetch"
+FETCH_CACHE_MAX_BYTES = int(os.getenv("FETCH_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+# Export settings
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "8"))
+
 # API settings
 API_PREFIX = "/api"
 CORS_ORIGINS = ["http://localhost:3000"]
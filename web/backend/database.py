@@ -1,5 +1,6 @@
 """SQLite database connection and operations."""
 
+import json
 import aiosqlite
 from datetime import datetime
 from typing import Optional
@@ -22,7 +23,10 @@ CREATE TABLE IF NOT EXISTS reports (
     summary TEXT,
     word_count INTEGER,
     content_text TEXT,
-    is_favorite INTEGER DEFAULT 0
+    is_favorite INTEGER DEFAULT 0,
+    key_takeaways TEXT,  -- JSON list extracted at index time
+    canonical_url TEXT,  -- source_url normalized for duplicate detection
+    concepts_source_modified_at DATETIME  -- file_modified_at when concepts were last extracted
 );
 
 -- Full-text search virtual table
@@ -51,6 +55,44 @@ CREATE TRIGGER IF NOT EXISTS reports_au AFTER UPDATE ON reports BEGIN
     VALUES (new.id, new.title, new.content_text);
 END;
 
+-- Report sections - H1/H2 sections parsed at index time
+CREATE TABLE IF NOT EXISTS report_sections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    report_id INTEGER NOT NULL,
+    ordinal INTEGER NOT NULL,
+    heading TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    anchor TEXT NOT NULL,
+    text TEXT,
+    char_start INTEGER NOT NULL,
+    char_end INTEGER NOT NULL,
+    UNIQUE(report_id, ordinal),
+    FOREIGN KEY (report_id) REFERENCES reports(id) ON DELETE CASCADE
+);
+
+-- Section-level full-text search
+CREATE VIRTUAL TABLE IF NOT EXISTS report_sections_fts USING fts5(
+    heading,
+    text,
+    content='report_sections',
+    content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS report_sections_ai AFTER INSERT ON report_sections BEGIN
+    INSERT INTO report_sections_fts(rowid, heading, text)
+    VALUES (new.id, new.heading, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS report_sections_ad AFTER DELETE ON report_sections BEGIN
+    INSERT INTO report_sections_fts(report_sections_fts, rowid, heading, text)
+    VALUES('delete', old.id, old.heading, old.text);
+END;
+
+-- Foreign keys are not enforced, so drop sections explicitly with their report
+CREATE TRIGGER IF NOT EXISTS reports_sections_ad AFTER DELETE ON reports BEGIN
+    DELETE FROM report_sections WHERE report_id = old.id;
+END;
+
 -- Activity logs table
 CREATE TABLE IF NOT EXISTS activity_logs (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -59,10 +101,100 @@ CREATE TABLE IF NOT EXISTS activity_logs (
     videos_count INTEGER DEFAULT 0,
     articles_count INTEGER DEFAULT 0,
     papers_count INTEGER DEFAULT 0,
+    other_count INTEGER DEFAULT 0,
     indexed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     file_modified_at DATETIME NOT NULL
 );
 
+-- Individual activity log entries (one row per logged report)
+CREATE TABLE IF NOT EXISTS activity_log_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    log_id INTEGER NOT NULL,
+    log_date DATE NOT NULL,
+    section TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    report_path TEXT NOT NULL,
+    entry_time TEXT,
+    FOREIGN KEY (log_id) REFERENCES activity_logs(id) ON DELETE CASCADE
+);
+
+CREATE TRIGGER IF NOT EXISTS activity_logs_ad AFTER DELETE ON activity_logs BEGIN
+    DELETE FROM activity_log_entries WHERE log_id = old.id;
+END;
+
+-- Flashcards extracted at index time; ids are derived from card content
+CREATE TABLE IF NOT EXISTS flashcards (
+    id INTEGER PRIMARY KEY,
+    report_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    card_key TEXT NOT NULL,
+    card_type TEXT,
+    front TEXT NOT NULL,
+    back TEXT NOT NULL,
+    tags TEXT,  -- JSON list
+    deck TEXT,
+    source TEXT,
+    content_hash TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_flashcards_report ON flashcards(report_id);
+CREATE INDEX IF NOT EXISTS idx_flashcards_updated ON flashcards(updated_at);
+
+CREATE TRIGGER IF NOT EXISTS reports_flashcards_ad AFTER DELETE ON reports BEGIN
+    DELETE FROM flashcards WHERE report_id = old.id;
+END;
+
+-- Generated digests, keyed by period, for cache invalidation
+CREATE TABLE IF NOT EXISTS digests (
+    period_key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    filepath TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    report_count INTEGER NOT NULL,
+    generated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- One row per Claude request: tokens, latency and cost by service and model
+CREATE TABLE IF NOT EXISTS llm_usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    service TEXT NOT NULL,  -- analysis, qa, concepts, credibility, ...
+    model TEXT NOT NULL,  -- API model id
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_creation_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_read_tokens INTEGER NOT NULL DEFAULT 0,
+    latency_ms INTEGER,  -- NULL for Message Batch results
+    cost REAL NOT NULL DEFAULT 0,
+    report_id INTEGER,
+    job_id TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Anthropic Message Batches submitted for bulk work, polled until they end
+CREATE TABLE IF NOT EXISTS llm_batches (
+    id TEXT PRIMARY KEY,  -- Anthropic batch id
+    kind TEXT NOT NULL,  -- 'analysis' or 'concepts'
+    status TEXT NOT NULL DEFAULT 'in_progress',  -- in_progress, processed, failed
+    request_count INTEGER NOT NULL,
+    succeeded_count INTEGER DEFAULT 0,
+    failed_count INTEGER DEFAULT 0,
+    error_message TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    completed_at DATETIME
+);
+
+-- One row per request in a batch; payload says where its result goes
+CREATE TABLE IF NOT EXISTS llm_batch_items (
+    batch_id TEXT NOT NULL,
+    custom_id TEXT NOT NULL,
+    payload TEXT NOT NULL,  -- JSON: job_id/report_id, title, source, ...
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending, succeeded, failed
+    PRIMARY KEY (batch_id, custom_id)
+);
+
 -- Analysis jobs tracking
 CREATE TABLE IF NOT EXISTS analysis_jobs (
     id TEXT PRIMARY KEY,
@@ -74,7 +206,8 @@ CREATE TABLE IF NOT EXISTS analysis_jobs (
     error_message TEXT,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     started_at DATETIME,
-    completed_at DATETIME
+    completed_at DATETIME,
+    checkpoint TEXT  -- JSON progress of long-running jobs, for resuming
 );
 
 -- Tags table
@@ -152,6 +285,16 @@ CREATE TABLE IF NOT EXISTS concept_relationships (
     UNIQUE(source_concept_id, target_concept_id, relationship_type)
 );
 
+-- Strength each report contributed to a relationship (undone on re-extraction)
+CREATE TABLE IF NOT EXISTS report_concept_relationships (
+    report_id INTEGER NOT NULL,
+    relationship_id INTEGER NOT NULL,
+    strength REAL NOT NULL,
+    PRIMARY KEY (report_id, relationship_id),
+    FOREIGN KEY (report_id) REFERENCES reports(id) ON DELETE CASCADE,
+    FOREIGN KEY (relationship_id) REFERENCES concept_relationships(id) ON DELETE CASCADE
+);
+
 -- Spaced repetition reviews
 CREATE TABLE IF NOT EXISTS reviews (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -208,7 +351,14 @@ CREATE TABLE IF NOT EXISTS goal_reports (
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_reports_type ON reports(content_type);
 CREATE INDEX IF NOT EXISTS idx_reports_created ON reports(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_reports_canonical_url ON reports(canonical_url);
+CREATE INDEX IF NOT EXISTS idx_log_entries_date ON activity_log_entries(log_date);
+CREATE INDEX IF NOT EXISTS idx_log_entries_log ON activity_log_entries(log_id);
 CREATE INDEX IF NOT EXISTS idx_jobs_status ON analysis_jobs(status);
+CREATE INDEX IF NOT EXISTS idx_llm_batches_status ON llm_batches(status);
+CREATE INDEX IF NOT EXISTS idx_llm_usage_created ON llm_usage(created_at);
+CREATE INDEX IF NOT EXISTS idx_llm_usage_service ON llm_usage(service, created_at);
+CREATE INDEX IF NOT EXISTS idx_llm_usage_model ON llm_usage(model, created_at);
 CREATE INDEX IF NOT EXISTS idx_report_tags_report ON report_tags(report_id);
 CREATE INDEX IF NOT EXISTS idx_report_tags_tag ON report_tags(tag_id);
 CREATE INDEX IF NOT EXISTS idx_collection_reports_collection ON collection_reports(collection_id);
@@ -217,6 +367,7 @@ CREATE INDEX IF NOT EXISTS idx_concepts_type ON concepts(concept_type);
 CREATE INDEX IF NOT EXISTS idx_concepts_name ON concepts(name);
 CREATE INDEX IF NOT EXISTS idx_report_concepts_report ON report_concepts(report_id);
 CREATE INDEX IF NOT EXISTS idx_report_concepts_concept ON report_concepts(concept_id);
+CREATE INDEX IF NOT EXISTS idx_report_concept_relationships_rel ON report_concept_relationships(relationship_id);
 CREATE INDEX IF NOT EXISTS idx_relationships_source ON concept_relationships(source_concept_id);
 CREATE INDEX IF NOT EXISTS idx_relationships_target ON concept_relationships(target_concept_id);
 CREATE INDEX IF NOT EXISTS idx_reviews_next ON reviews(next_review_date);
@@ -225,6 +376,17 @@ CREATE INDEX IF NOT EXISTS idx_goal_keywords ON goal_keywords(goal_id);
 CREATE INDEX IF NOT EXISTS idx_goal_reports ON goal_reports(goal_id);
 """
 
+# Columns added after the original schema: (table, column, definition).
+# CREATE TABLE IF NOT EXISTS leaves existing tables alone, so these are
+# added to older databases by init_db.
+COLUMN_MIGRATIONS = [
+    ("activity_logs", "other_count", "INTEGER DEFAULT 0"),
+    ("reports", "key_takeaways", "TEXT"),
+    ("reports", "canonical_url", "TEXT"),
+    ("reports", "concepts_source_modified_at", "DATETIME"),
+    ("analysis_jobs", "checkpoint", "TEXT"),
+]
+
 
 async def get_db() -> aiosqlite.Connection:
     """Get database connection."""
@@ -236,13 +398,24 @@ async def get_db() -> aiosqlite.Connection:
 async def init_db():
     """Initialize database with schema."""
     async with aiosqlite.connect(DATABASE_PATH) as db:
+        for table, column, definition in COLUMN_MIGRATIONS:
+            cursor = await db.execute(f"PRAGMA table_info({table})")
+            columns = {row[1] for row in await cursor.fetchall()}
+            if columns and column not in columns:
+                await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
         await db.executescript(SCHEMA)
         await db.commit()
 
 
 # Report operations
-async def upsert_report(data: dict):
-    """Insert or update a report in the database."""
+async def upsert_report(data: dict) -> int:
+    """
+    Insert or update a report in the database.
+
+    If data contains "sections" (from parse_report_sections) or
+    "flashcards" (Flashcard.to_record() dicts), they are stored in the
+    same transaction. Returns the report ID.
+    """
     async with aiosqlite.connect(DATABASE_PATH) as db:
         db.row_factory = aiosqlite.Row
 
@@ -252,37 +425,177 @@ async def upsert_report(data: dict):
             (data["filename"],)
         )
         existing = await cursor.fetchone()
+        sections = data.get("sections")
+        flashcards = data.get("flashcards")
+        key_takeaways = (
+            json.dumps(data["key_takeaways"]) if data.get("key_takeaways") is not None else None
+        )
 
         if existing:
+            report_id = existing["id"]
+
             # Update if file was modified
             if existing["file_modified_at"] != data["file_modified_at"].isoformat():
                 await db.execute("""
                     UPDATE reports SET
                         filepath = ?, title = ?, source_url = ?, content_type = ?,
                         created_at = ?, file_modified_at = ?, summary = ?,
-                        word_count = ?, content_text = ?, indexed_at = CURRENT_TIMESTAMP
+                        word_count = ?, content_text = ?, key_takeaways = ?,
+                        canonical_url = ?, indexed_at = CURRENT_TIMESTAMP
                     WHERE filename = ?
                 """, (
                     data["filepath"], data["title"], data.get("source_url"),
                     data["content_type"], data["created_at"].isoformat(),
                     data["file_modified_at"].isoformat(), data.get("summary"),
-                    data.get("word_count"), data.get("content_text"), data["filename"]
+                    data.get("word_count"), data.get("content_text"),
+                    key_takeaways, data.get("canonical_url"), data["filename"]
                 ))
+            else:
+                # Unchanged file: only backfill data that was never stored
+                if key_takeaways is not None:
+                    await db.execute(
+                        "UPDATE reports SET key_takeaways = ? WHERE id = ? AND key_takeaways IS NULL",
+                        (key_takeaways, report_id)
+                    )
+                if data.get("canonical_url"):
+                    await db.execute(
+                        # Also refreshes ids computed by older URL normalization rules
+                        "UPDATE reports SET canonical_url = ? WHERE id = ? AND canonical_url IS NOT ?",
+                        (data["canonical_url"], report_id, data["canonical_url"])
+                    )
+                if sections is not None:
+                    cursor = await db.execute(
+                        "SELECT 1 FROM report_sections WHERE report_id = ? LIMIT 1",
+                        (report_id,)
+                    )
+                    if await cursor.fetchone():
+                        sections = None
+                if flashcards is not None:
+                    cursor = await db.execute(
+                        "SELECT 1 FROM flashcards WHERE report_id = ? LIMIT 1",
+                        (report_id,)
+                    )
+                    if await cursor.fetchone():
+                        flashcards = None
         else:
             # Insert new report
-            await db.execute("""
+            cursor = await db.execute("""
                 INSERT INTO reports (
                     filename, filepath, title, source_url, content_type,
-                    created_at, file_modified_at, summary, word_count, content_text
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    created_at, file_modified_at, summary, word_count, content_text,
+                    key_takeaways, canonical_url
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                RETURNING id
             """, (
                 data["filename"], data["filepath"], data["title"],
                 data.get("source_url"), data["content_type"],
                 data["created_at"].isoformat(), data["file_modified_at"].isoformat(),
-                data.get("summary"), data.get("word_count"), data.get("content_text")
+                data.get("summary"), data.get("word_count"), data.get("content_text"),
+                key_takeaways, data.get("canonical_url")
             ))
+            report_id = (await cursor.fetchone())["id"]
+
+        if sections is not None:
+            await _replace_report_sections(db, report_id, sections)
+        if flashcards is not None:
+            await _sync_report_flashcards(db, report_id, flashcards)
 
         await db.commit()
+        return report_id
+
+
+async def _replace_report_sections(db: aiosqlite.Connection, report_id: int, sections: list[dict]):
+    """Replace all stored sections for a report (caller commits)."""
+    await db.execute("DELETE FROM report_sections WHERE report_id = ?", (report_id,))
+    await db.executemany(
+        """INSERT INTO report_sections
+           (report_id, ordinal, heading, level, anchor, text, char_start, char_end)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        [
+            (
+                report_id, s["ordinal"], s["heading"], s["level"], s["anchor"],
+                s["text"], s["char_start"], s["char_end"]
+            )
+            for s in sections
+        ]
+    )
+
+
+async def _sync_report_flashcards(db: aiosqlite.Connection, report_id: int, cards: list[dict]):
+    """
+    Upsert a report's flashcards and drop ones no longer extracted (caller commits).
+
+    updated_at only moves when a card's content hash changes, so
+    incremental exports skip cards that were merely re-indexed. A card id
+    already owned by another report is left alone rather than moved.
+    """
+    await db.executemany(
+        """INSERT INTO flashcards
+           (id, report_id, position, card_key, card_type, front, back, tags, deck, source, content_hash)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+           ON CONFLICT(id) DO UPDATE SET
+               report_id = excluded.report_id,
+               position = excluded.position,
+               card_key = excluded.card_key,
+               card_type = excluded.card_type,
+               front = excluded.front,
+               back = excluded.back,
+               tags = excluded.tags,
+               deck = excluded.deck,
+               source = excluded.source,
+               content_hash = excluded.content_hash,
+               updated_at = CASE WHEN flashcards.content_hash != excluded.content_hash
+                                 THEN CURRENT_TIMESTAMP ELSE flashcards.updated_at END
+           WHERE flashcards.report_id = excluded.report_id""",
+        [
+            (
+                c["id"], report_id, position, c["card_key"], c["card_type"], c["front"],
+                c["back"], json.dumps(c["tags"]), c["deck"], c["source"], c["content_hash"]
+            )
+            for position, c in enumerate(cards)
+        ]
+    )
+    await db.execute(
+        "DELETE FROM flashcards WHERE report_id = ? AND id NOT IN (SELECT value FROM json_each(?))",
+        (report_id, json.dumps([c["id"] for c in cards]))
+    )
+
+
+async def get_flashcards(
+    since: Optional[str] = None,
+    filepaths: Optional[list[str]] = None,
+) -> list[dict]:
+    """
+    Get stored flashcards in report/position order.
+
+    Args:
+        since: Only cards created or changed at or after this UTC timestamp ('YYYY-MM-DD HH:MM:SS')
+        filepaths: Only cards from these report files
+    """
+    query = """SELECT f.*, r.filepath
+               FROM flashcards f
+               JOIN reports r ON r.id = f.report_id"""
+    conditions = []
+    params = []
+    if since:
+        conditions.append("f.updated_at >= ?")
+        params.append(since)
+    if filepaths is not None:
+        conditions.append("r.filepath IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(filepaths))
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY r.filepath, f.position"
+
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(query, params)
+        cards = []
+        for row in await cursor.fetchall():
+            card = dict(row)
+            card["tags"] = json.loads(card["tags"]) if card["tags"] else []
+            cards.append(card)
+        return cards
 
 
 async def get_reports(
@@ -347,6 +660,22 @@ async def get_report_by_id(report_id: int) -> Optional[dict]:
         return None
 
 
+async def get_report_by_canonical_url(canonical_url: str) -> Optional[dict]:
+    """Get the most recent report for a canonical source URL (without content)."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+
+        cursor = await db.execute(
+            """SELECT id, filename, filepath, title, source_url, content_type,
+                      created_at, summary, word_count
+               FROM reports WHERE canonical_url = ?
+               ORDER BY created_at DESC LIMIT 1""",
+            (canonical_url,)
+        )
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+
 async def search_reports(query: str, limit: int = 20) -> list[dict]:
     """Full-text search across reports."""
     async with aiosqlite.connect(DATABASE_PATH) as db:
@@ -367,6 +696,42 @@ async def search_reports(query: str, limit: int = 20) -> list[dict]:
         return [dict(row) for row in rows]
 
 
+async def get_report_sections(report_id: int) -> list[dict]:
+    """Get the precomputed sections of a report in document order."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            """SELECT ordinal, heading, level, anchor, text, char_start, char_end
+               FROM report_sections WHERE report_id = ?
+               ORDER BY ordinal""",
+            (report_id,)
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+
+async def search_report_sections(query: str, limit: int = 20) -> list[dict]:
+    """Full-text search across report sections, returning section-level hits."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+
+        cursor = await db.execute(
+            """SELECT r.id as report_id, r.title, r.content_type, r.source_url, r.created_at,
+                      s.ordinal, s.heading, s.anchor, s.text, s.char_start, s.char_end,
+                      snippet(report_sections_fts, 1, '<mark>', '</mark>', '...', 32) as snippet
+               FROM report_sections_fts
+               JOIN report_sections s ON report_sections_fts.rowid = s.id
+               JOIN reports r ON s.report_id = r.id
+               WHERE report_sections_fts MATCH ?
+               ORDER BY rank
+               LIMIT ?""",
+            (query, limit)
+        )
+
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+
 async def delete_report(filepath: str):
     """Delete a report from the database."""
     async with aiosqlite.connect(DATABASE_PATH) as db:
@@ -464,6 +829,35 @@ async def update_job_progress(job_id: str, message: str):
         await db.commit()
 
 
+async def update_job_checkpoint(job_id: str, checkpoint: dict, message: Optional[str] = None):
+    """Save a job's resumable progress (and optionally its progress message)."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        if message is None:
+            await db.execute(
+                "UPDATE analysis_jobs SET checkpoint = ? WHERE id = ?",
+                (json.dumps(checkpoint), job_id)
+            )
+        else:
+            await db.execute(
+                "UPDATE analysis_jobs SET checkpoint = ?, progress_message = ? WHERE id = ?",
+                (json.dumps(checkpoint), message, job_id)
+            )
+        await db.commit()
+
+
+async def get_unfinished_jobs(job_type: str) -> list[dict]:
+    """Pending or running jobs of a type (e.g. to resume after a restart)."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            """SELECT * FROM analysis_jobs
+               WHERE job_type = ? AND status IN ('pending', 'running')
+               ORDER BY created_at""",
+            (job_type,)
+        )
+        return [dict(row) for row in await cursor.fetchall()]
+
+
 async def get_job(job_id: str) -> Optional[dict]:
     """Get job by ID."""
     async with aiosqlite.connect(DATABASE_PATH) as db:
@@ -795,42 +1189,149 @@ async def upsert_concept(name: str, concept_type: str, description: str = None)
             return row["id"]
 
 
-async def link_concept_to_report(report_id: int, concept_id: int, relevance: float = 1.0, context: str = None):
-    """Link a concept to a report."""
+async def get_reports_needing_concepts(limit: Optional[int] = None, exclude: list[int] = ()) -> list[dict]:
+    """
+    Reports to (re-)extract concepts from, newest first.
+
+    That's reports without concepts that were never extracted, and reports
+    whose file changed since their concepts were extracted - except ones
+    waiting in an unfinished concepts Message Batch.
+    """
+    params: list = []
+    exclude_clause = ""
+    if exclude:
+        exclude_clause = f"AND r.id NOT IN ({','.join('?' * len(exclude))})"
+        params.extend(exclude)
+    params.append(limit if limit is not None else -1)
+
     async with aiosqlite.connect(DATABASE_PATH) as db:
-        await db.execute(
-            """INSERT OR REPLACE INTO report_concepts
-               (report_id, concept_id, relevance_score, context_snippet)
-               VALUES (?, ?, ?, ?)""",
-            (report_id, concept_id, relevance, context)
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            f"""SELECT r.id, r.title, r.file_modified_at
+                FROM reports r
+                WHERE ((r.concepts_source_modified_at IS NULL
+                        AND NOT EXISTS (SELECT 1 FROM report_concepts rc WHERE rc.report_id = r.id))
+                       OR r.concepts_source_modified_at != r.file_modified_at)
+                      AND r.id NOT IN (
+                          SELECT json_extract(i.payload, '$.report_id')
+                          FROM llm_batch_items i JOIN llm_batches b ON b.id = i.batch_id
+                          WHERE b.kind = 'concepts' AND i.status = 'pending')
+                      {exclude_clause}
+                ORDER BY r.created_at DESC
+                LIMIT ?""",
+            params
         )
-        await db.commit()
+        return [dict(row) for row in await cursor.fetchall()]
+
 
+async def ingest_concept_graph(
+    report_id: int,
+    concepts: list[dict],
+    relationships: list[dict],
+    context: str = None,
+) -> dict:
+    """
+    Store a report's extracted concepts and relationships in one transaction.
+
+    Replaces the report's earlier contribution - its concept links (and
+    those concepts' mention counts) and the strength it added to
+    relationships - then upserts the concepts and links them to the report,
+    upserts relationships between them (adding to the strength of existing
+    ones), and marks the report's current content as extracted.
+
+    Args:
+        report_id: Report the concepts were extracted from
+        concepts: Dicts with name, and optionally type and description
+        relationships: Dicts with source and target (concept names), and
+            optionally type and strength
+        context: Snippet stored with each report link (e.g. the title)
+
+    Returns:
+        Dict with concepts_stored and relationships_stored
+    """
+    # One row per concept name (names are stored lowercase)
+    rows = {}
+    for concept in concepts:
+        name = (concept.get("name") or "").strip().lower()
+        if name and name not in rows:
+            rows[name] = (name, concept.get("type") or "concept", concept.get("description"))
+    if not rows:
+        return {"concepts_stored": 0, "relationships_stored": 0}
 
-async def create_concept_relationship(source_id: int, target_id: int, rel_type: str, strength: float = 1.0):
-    """Create or strengthen a relationship between concepts."""
     async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            """UPDATE concepts SET mention_count = MAX(mention_count - 1, 0)
+               WHERE id IN (SELECT concept_id FROM report_concepts WHERE report_id = ?)""",
+            (report_id,)
+        )
+        await db.execute("DELETE FROM report_concepts WHERE report_id = ?", (report_id,))
+        await db.execute(
+            """UPDATE concept_relationships SET strength = strength - (
+                   SELECT rcr.strength FROM report_concept_relationships rcr
+                   WHERE rcr.report_id = ? AND rcr.relationship_id = concept_relationships.id)
+               WHERE id IN (SELECT relationship_id FROM report_concept_relationships WHERE report_id = ?)""",
+            (report_id, report_id)
+        )
+        await db.execute(
+            """DELETE FROM concept_relationships WHERE strength <= 0
+               AND id IN (SELECT relationship_id FROM report_concept_relationships WHERE report_id = ?)""",
+            (report_id,)
+        )
+        await db.execute("DELETE FROM report_concept_relationships WHERE report_id = ?", (report_id,))
+
+        await db.executemany(
+            """INSERT INTO concepts (name, concept_type, description) VALUES (?, ?, ?)
+               ON CONFLICT(name) DO UPDATE SET
+                   mention_count = mention_count + 1,
+                   updated_at = CURRENT_TIMESTAMP""",
+            list(rows.values())
+        )
         cursor = await db.execute(
-            """SELECT id, strength FROM concept_relationships
+            f"SELECT name, id FROM concepts WHERE name IN ({','.join('?' * len(rows))})",
+            list(rows)
+        )
+        concept_ids = dict(await cursor.fetchall())
+
+        await db.executemany(
+            """INSERT INTO report_concepts (report_id, concept_id, relevance_score, context_snippet)
+               VALUES (?, ?, 1.0, ?)
+               ON CONFLICT(report_id, concept_id) DO UPDATE SET
+                   relevance_score = excluded.relevance_score,
+                   context_snippet = excluded.context_snippet""",
+            [(report_id, concept_id, context) for concept_id in concept_ids.values()]
+        )
+
+        # Strength per edge (an edge listed twice counts twice)
+        edges: dict[tuple, float] = {}
+        for rel in relationships:
+            source_id = concept_ids.get(str(rel.get("source") or "").strip().lower())
+            target_id = concept_ids.get(str(rel.get("target") or "").strip().lower())
+            if source_id and target_id:
+                key = (source_id, target_id, rel.get("type") or "related_to")
+                edges[key] = edges.get(key, 0) + rel.get("strength", 1.0)
+        await db.executemany(
+            """INSERT INTO concept_relationships
+               (source_concept_id, target_concept_id, relationship_type, strength)
+               VALUES (?, ?, ?, ?)
+               ON CONFLICT(source_concept_id, target_concept_id, relationship_type) DO UPDATE SET
+                   strength = strength + excluded.strength""",
+            [(*key, strength) for key, strength in edges.items()]
+        )
+        await db.executemany(
+            """INSERT INTO report_concept_relationships (report_id, relationship_id, strength)
+               SELECT ?, id, ? FROM concept_relationships
                WHERE source_concept_id = ? AND target_concept_id = ? AND relationship_type = ?""",
-            (source_id, target_id, rel_type)
+            [(report_id, strength, *key) for key, strength in edges.items()]
         )
-        existing = await cursor.fetchone()
 
-        if existing:
-            await db.execute(
-                "UPDATE concept_relationships SET strength = strength + ? WHERE id = ?",
-                (strength, existing[0])
-            )
-        else:
-            await db.execute(
-                """INSERT INTO concept_relationships
-                   (source_concept_id, target_concept_id, relationship_type, strength)
-                   VALUES (?, ?, ?, ?)""",
-                (source_id, target_id, rel_type, strength)
-            )
+        await db.execute(
+            "UPDATE reports SET concepts_source_modified_at = file_modified_at WHERE id = ?",
+            (report_id,)
+        )
         await db.commit()
 
+    return {"concepts_stored": len(concept_ids), "relationships_stored": len(edges)}
+
 
 async def get_knowledge_graph(limit: int = 100) -> dict:
     """Get nodes and edges for the knowledge graph."""
@@ -1133,3 +1634,454 @@ async def delete_goal(goal_id: int):
     async with aiosqlite.connect(DATABASE_PATH) as db:
         await db.execute("DELETE FROM learning_goals WHERE id = ?", (goal_id,))
         await db.commit()
+
+
+# ============ ACTIVITY LOG OPERATIONS ============
+
+async def upsert_activity_log(data: dict) -> bool:
+    """
+    Insert or update a parsed activity log and replace its entries.
+
+    Expects: log_date, filepath, file_modified_at, entries (list of dicts
+    with section, title, report_path, time). Returns False if the stored
+    copy is already up to date.
+    """
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        modified_at = data["file_modified_at"].isoformat()
+
+        cursor = await db.execute(
+            "SELECT id, file_modified_at FROM activity_logs WHERE log_date = ?",
+            (data["log_date"],)
+        )
+        existing = await cursor.fetchone()
+        if existing and existing["file_modified_at"] == modified_at:
+            return False
+
+        entries = data["entries"]
+        counts = {"videos": 0, "articles": 0, "papers": 0, "other": 0}
+        for entry in entries:
+            counts[entry["section"]] += 1
+
+        cursor = await db.execute(
+            """INSERT INTO activity_logs
+               (log_date, filepath, videos_count, articles_count, papers_count,
+                other_count, file_modified_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(log_date) DO UPDATE SET
+                   filepath = excluded.filepath,
+                   videos_count = excluded.videos_count,
+                   articles_count = excluded.articles_count,
+                   papers_count = excluded.papers_count,
+                   other_count = excluded.other_count,
+                   file_modified_at = excluded.file_modified_at,
+                   indexed_at = CURRENT_TIMESTAMP
+               RETURNING id""",
+            (
+                data["log_date"], data["filepath"], counts["videos"],
+                counts["articles"], counts["papers"], counts["other"], modified_at
+            )
+        )
+        log_id = (await cursor.fetchone())["id"]
+
+        await db.execute("DELETE FROM activity_log_entries WHERE log_id = ?", (log_id,))
+        await db.executemany(
+            """INSERT INTO activity_log_entries
+               (log_id, log_date, section, position, title, report_path, entry_time)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (
+                    log_id, data["log_date"], e["section"], position,
+                    e["title"], e["report_path"], e.get("time")
+                )
+                for position, e in enumerate(entries)
+            ]
+        )
+
+        await db.commit()
+        return True
+
+
+async def append_activity_log_entries(
+    log_date: str,
+    filepath: str,
+    previous_modified_at: Optional[datetime],
+    file_modified_at: datetime,
+    entries: list[dict],
+) -> bool:
+    """
+    Add entries that were just appended to a log file without re-parsing it.
+
+    previous_modified_at is the file's mtime before the append (None if the
+    file was created). Returns False when the index was not in sync with
+    that version of the file, in which case the caller should re-index the
+    whole file instead.
+    """
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+
+        cursor = await db.execute(
+            "SELECT id, file_modified_at FROM activity_logs WHERE log_date = ?",
+            (log_date,)
+        )
+        existing = await cursor.fetchone()
+        expected = previous_modified_at.isoformat() if previous_modified_at else None
+        if (existing["file_modified_at"] if existing else None) != expected:
+            return False
+
+        counts = {"videos": 0, "articles": 0, "papers": 0, "other": 0}
+        for entry in entries:
+            counts[entry["section"]] += 1
+
+        cursor = await db.execute(
+            """INSERT INTO activity_logs
+               (log_date, filepath, videos_count, articles_count, papers_count,
+                other_count, file_modified_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(log_date) DO UPDATE SET
+                   videos_count = videos_count + excluded.videos_count,
+                   articles_count = articles_count + excluded.articles_count,
+                   papers_count = papers_count + excluded.papers_count,
+                   other_count = other_count + excluded.other_count,
+                   file_modified_at = excluded.file_modified_at,
+                   indexed_at = CURRENT_TIMESTAMP
+               RETURNING id""",
+            (
+                log_date, filepath, counts["videos"], counts["articles"],
+                counts["papers"], counts["other"], file_modified_at.isoformat()
+            )
+        )
+        log_id = (await cursor.fetchone())["id"]
+
+        cursor = await db.execute(
+            "SELECT COALESCE(MAX(position), -1) + 1 FROM activity_log_entries WHERE log_id = ?",
+            (log_id,)
+        )
+        next_position = (await cursor.fetchone())[0]
+
+        await db.executemany(
+            """INSERT INTO activity_log_entries
+               (log_id, log_date, section, position, title, report_path, entry_time)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (
+                    log_id, log_date, e["section"], next_position + i,
+                    e["title"], e["report_path"], e.get("time")
+                )
+                for i, e in enumerate(entries)
+            ]
+        )
+
+        await db.commit()
+        return True
+
+
+async def delete_activity_log(log_date: str):
+    """Remove an activity log (and its entries) from the index."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute("DELETE FROM activity_logs WHERE log_date = ?", (log_date,))
+        await db.commit()
+
+
+async def get_activity_logs(limit: int = 30) -> list[dict]:
+    """Get indexed activity logs, newest first."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            """SELECT log_date, filepath, videos_count, articles_count,
+                      papers_count, other_count
+               FROM activity_logs
+               ORDER BY log_date DESC
+               LIMIT ?""",
+            (limit,)
+        )
+        return [dict(row) for row in await cursor.fetchall()]
+
+
+async def get_activity_entries(start_date: str, end_date: str) -> list[dict]:
+    """Get all activity log entries between two dates (inclusive)."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            """SELECT log_date, section, title, report_path, entry_time
+               FROM activity_log_entries
+               WHERE log_date BETWEEN ? AND ?
+               ORDER BY log_date DESC, position""",
+            (start_date, end_date)
+        )
+        return [dict(row) for row in await cursor.fetchall()]
+
+
+async def get_activity_heatmap(start_date: str, end_date: str) -> list[dict]:
+    """Get per-day entry counts between two dates for a calendar heatmap."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            """SELECT log_date,
+                      COUNT(*) as total,
+                      SUM(section = 'videos') as videos,
+                      SUM(section = 'articles') as articles,
+                      SUM(section = 'papers') as papers,
+                      SUM(section = 'other') as other
+               FROM activity_log_entries
+               WHERE log_date BETWEEN ? AND ?
+               GROUP BY log_date
+               ORDER BY log_date""",
+            (start_date, end_date)
+        )
+        return [dict(row) for row in await cursor.fetchall()]
+
+
+async def get_activity_streak(today: Optional[str] = None) -> dict:
+    """
+    Compute current and longest activity streaks in one query.
+
+    A day is active if it has at least one log entry. The current streak
+    is the run ending today, or yesterday if nothing is logged yet today.
+    """
+    today = today or date.today().isoformat()
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            """WITH days AS (
+                   SELECT DISTINCT log_date FROM activity_log_entries
+               ),
+               islands AS (
+                   SELECT log_date,
+                          julianday(log_date) - ROW_NUMBER() OVER (ORDER BY log_date) as grp
+                   FROM days
+               ),
+               runs AS (
+                   SELECT MIN(log_date) as start_date, MAX(log_date) as end_date,
+                          COUNT(*) as length
+                   FROM islands GROUP BY grp
+               )
+               SELECT
+                   COALESCE(MAX(CASE WHEN end_date >= date(?, '-1 day') THEN length END), 0)
+                       as current_streak,
+                   COALESCE(MAX(length), 0) as longest_streak,
+                   COALESCE(SUM(length), 0) as active_days,
+                   MAX(end_date) as last_active_date
+               FROM runs""",
+            (today,)
+        )
+        return dict(await cursor.fetchone())
+
+
+# ============ DIGEST OPERATIONS ============
+
+async def get_reports_in_date_range(start_date: str, end_date: str) -> list[dict]:
+    """
+    Get reports created between two ISO datetimes (inclusive), newest first.
+
+    Uses the created_at index, so cost depends on the range, not the vault size.
+    key_takeaways is decoded to a list (None if the report predates takeaway indexing).
+    """
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            """SELECT id, filename, filepath, title, content_type, created_at,
+                      file_modified_at, key_takeaways
+               FROM reports
+               WHERE created_at BETWEEN ? AND ?
+               ORDER BY created_at DESC, filename DESC""",
+            (start_date, end_date)
+        )
+        reports = []
+        for row in await cursor.fetchall():
+            report = dict(row)
+            if report["key_takeaways"] is not None:
+                report["key_takeaways"] = json.loads(report["key_takeaways"])
+            reports.append(report)
+        return reports
+
+
+async def get_digest(period_key: str) -> Optional[dict]:
+    """Get the cached digest record for a period (e.g. 'weekly:2025-01-06')."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            "SELECT * FROM digests WHERE period_key = ?",
+            (period_key,)
+        )
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+
+async def save_digest(period_key: str, title: str, filepath: str, fingerprint: str, report_count: int):
+    """Record a generated digest and the fingerprint of the reports it covers."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            """INSERT INTO digests (period_key, title, filepath, fingerprint, report_count)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(period_key) DO UPDATE SET
+                   title = excluded.title,
+                   filepath = excluded.filepath,
+                   fingerprint = excluded.fingerprint,
+                   report_count = excluded.report_count,
+                   generated_at = CURRENT_TIMESTAMP""",
+            (period_key, title, filepath, fingerprint, report_count)
+        )
+        await db.commit()
+
+
+# ============ MESSAGE BATCH OPERATIONS ============
+
+async def create_llm_batch(batch_id: str, kind: str, items: list[tuple[str, dict]]):
+    """Record a submitted Message Batch and its items as (custom_id, payload) pairs."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            "INSERT INTO llm_batches (id, kind, request_count) VALUES (?, ?, ?)",
+            (batch_id, kind, len(items))
+        )
+        await db.executemany(
+            "INSERT INTO llm_batch_items (batch_id, custom_id, payload) VALUES (?, ?, ?)",
+            [(batch_id, custom_id, json.dumps(payload)) for custom_id, payload in items]
+        )
+        await db.commit()
+
+
+async def get_llm_batch(batch_id: str) -> Optional[dict]:
+    """Get a batch record with per-status item counts."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute("SELECT * FROM llm_batches WHERE id = ?", (batch_id,))
+        row = await cursor.fetchone()
+        if not row:
+            return None
+
+        batch = dict(row)
+        cursor = await db.execute(
+            "SELECT status, COUNT(*) FROM llm_batch_items WHERE batch_id = ? GROUP BY status",
+            (batch_id,)
+        )
+        batch["items"] = {status: count for status, count in await cursor.fetchall()}
+        return batch
+
+
+async def get_unfinished_llm_batches() -> list[dict]:
+    """Batches still waiting for results (e.g. to resume polling after a restart)."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            "SELECT * FROM llm_batches WHERE status = 'in_progress' ORDER BY created_at"
+        )
+        return [dict(row) for row in await cursor.fetchall()]
+
+
+async def get_pending_llm_batch_items(batch_id: str) -> dict[str, dict]:
+    """Payloads of items whose results haven't been applied, by custom_id."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        cursor = await db.execute(
+            "SELECT custom_id, payload FROM llm_batch_items WHERE batch_id = ? AND status = 'pending'",
+            (batch_id,)
+        )
+        return {custom_id: json.loads(payload) for custom_id, payload in await cursor.fetchall()}
+
+
+async def set_llm_batch_item_status(batch_id: str, custom_id: str, status: str):
+    """Mark one batch item as succeeded or failed once its result is applied."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            "UPDATE llm_batch_items SET status = ? WHERE batch_id = ? AND custom_id = ?",
+            (status, batch_id, custom_id)
+        )
+        await db.commit()
+
+
+async def finish_llm_batch(batch_id: str, status: str, error_message: Optional[str] = None):
+    """Close out a batch, recording item outcome counts."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            """UPDATE llm_batches SET
+                   status = ?, error_message = ?, completed_at = ?,
+                   succeeded_count = (SELECT COUNT(*) FROM llm_batch_items
+                                      WHERE batch_id = ? AND status = 'succeeded'),
+                   failed_count = (SELECT COUNT(*) FROM llm_batch_items
+                                   WHERE batch_id = ? AND status = 'failed')
+               WHERE id = ?""",
+            (status, error_message, datetime.now().isoformat(), batch_id, batch_id, batch_id)
+        )
+        await db.commit()
+
+
+# ============ LLM USAGE OPERATIONS ============
+
+# Aggregates shared by the usage rollups
+_USAGE_TOTALS = """COUNT(*) as requests,
+                   SUM(input_tokens) as input_tokens,
+                   SUM(output_tokens) as output_tokens,
+                   SUM(cache_creation_tokens) as cache_creation_tokens,
+                   SUM(cache_read_tokens) as cache_read_tokens,
+                   ROUND(SUM(cost), 4) as cost,
+                   ROUND(AVG(latency_ms)) as avg_latency_ms,
+                   MAX(latency_ms) as max_latency_ms"""
+
+_USAGE_GROUPS = {
+    "day": "date(created_at)",
+    "model": "model",
+    "service": "service",
+}
+
+
+async def record_llm_usage(
+    service: str,
+    model: str,
+    usage: dict,
+    cost: float,
+    latency_ms: Optional[int] = None,
+    report_id: Optional[int] = None,
+    job_id: Optional[str] = None,
+):
+    """Record one Claude request in the usage ledger."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            """INSERT INTO llm_usage
+               (service, model, input_tokens, output_tokens, cache_creation_tokens,
+                cache_read_tokens, latency_ms, cost, report_id, job_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                service, model,
+                usage.get("input_tokens", 0), usage.get("output_tokens", 0),
+                usage.get("cache_creation_input_tokens", 0), usage.get("cache_read_input_tokens", 0),
+                latency_ms, cost, report_id, job_id,
+            )
+        )
+        await db.commit()
+
+
+async def get_llm_usage_totals(since: str) -> dict:
+    """Usage totals for requests made since a 'YYYY-MM-DD' date (UTC)."""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            f"SELECT {_USAGE_TOTALS} FROM llm_usage WHERE created_at >= ?",
+            (since,)
+        )
+        return dict(await cursor.fetchone())
+
+
+async def get_llm_usage_rollup(group_by: str, since: str) -> list[dict]:
+    """
+    Usage aggregated per day, model or service since a 'YYYY-MM-DD' date (UTC).
+
+    Args:
+        group_by: 'day', 'model' or 'service'
+        since: First day to include
+
+    Returns:
+        One dict per group (key under group_by), days in order, others by cost
+    """
+    column = _USAGE_GROUPS[group_by]
+    order = column if group_by == "day" else "cost DESC"
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            f"""SELECT {column} as {group_by}, {_USAGE_TOTALS}
+                FROM llm_usage
+                WHERE created_at >= ?
+                GROUP BY {column}
+                ORDER BY {order}""",
+            (since,)
+        )
+        return [dict(row) for row in await cursor.fetchall()]
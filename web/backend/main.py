@@ -7,8 +7,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import CORS_ORIGINS, API_PREFIX
-from routers import reports, logs, analysis, batch, tags, collections, transcription, rss, export, knowledge_graph, qa, comparison, tts, reviews, credibility, goals, translate, recommendations
+from routers import reports, logs, analysis, batch, tags, collections, transcription, rss, export, knowledge_graph, qa, comparison, tts, reviews, credibility, goals, translate, recommendations, usage
+from services.concept_extractor import resume_extraction_jobs, stop_extraction_jobs
 from services.indexer import run_initial_index, FileWatcher
+from services.log_writer import log_writer
+from services.message_batches import batch_poller
+from services.whisper_pool import whisper_pool
 
 # File watcher for auto-indexing new reports
 file_watcher = FileWatcher()
@@ -28,12 +32,18 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Cerebro backend...")
     await run_initial_index()
     file_watcher.start()
+    batch_poller.start()  # Resume polling message batches from before a restart
+    await resume_extraction_jobs()
     logger.info("Cerebro backend ready (file watcher active)")
 
     yield
 
     # Shutdown
     file_watcher.stop()
+    await batch_poller.close()
+    await stop_extraction_jobs()
+    await log_writer.close()
+    await whisper_pool.close()
     logger.info("Shutting down Cerebro backend...")
 
 
@@ -72,6 +82,7 @@ app.include_router(credibility.router, prefix=f"{API_PREFIX}/credibility", tags=
 app.include_router(goals.router, prefix=f"{API_PREFIX}/goals", tags=["Learning Goals"])
 app.include_router(translate.router, prefix=f"{API_PREFIX}/translate", tags=["Translation"])
 app.include_router(recommendations.router, prefix=f"{API_PREFIX}/recommendations", tags=["Recommendations"])
+app.include_router(usage.router, prefix=f"{API_PREFIX}/usage", tags=["Usage"])
 
 
 @app.get("/")
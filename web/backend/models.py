@@ -34,6 +34,13 @@ class ReportList(BaseModel):
     page_size: int
 
 
+class ReportLookup(BaseModel):
+    """Existing report (if any) for a source URL."""
+    url: str
+    canonical_url: str
+    report: Optional[Report] = None
+
+
 class ActivityLogEntry(BaseModel):
     """Single entry in activity log."""
     title: str
@@ -50,10 +57,29 @@ class ActivityLog(BaseModel):
     other: list[ActivityLogEntry] = []
 
 
+class ActivityHeatmapDay(BaseModel):
+    """Activity counts for one day of the calendar heatmap."""
+    date: str
+    total: int
+    videos: int = 0
+    articles: int = 0
+    papers: int = 0
+    other: int = 0
+
+
+class ActivityStreak(BaseModel):
+    """Consecutive-day activity streaks."""
+    current_streak: int
+    longest_streak: int
+    active_days: int
+    last_active_date: Optional[str] = None
+
+
 class AnalysisRequest(BaseModel):
     """Request to analyze content."""
     url: str
     model: Literal["haiku", "sonnet", "opus"] = "sonnet"
+    force: bool = False  # Re-analyze even if a report for this source exists
 
 
 class AnalysisJob(BaseModel):
@@ -80,6 +106,31 @@ class SearchResult(BaseModel):
     snippet: str  # Matched text snippet
 
 
+class ReportSection(BaseModel):
+    """A parsed H1/H2 section of a report."""
+    ordinal: int
+    heading: str
+    level: int
+    anchor: str
+    text: str
+    char_start: int
+    char_end: int
+
+
+class SectionSearchResult(BaseModel):
+    """Section-level search hit."""
+    report_id: int
+    title: str
+    content_type: str
+    created_at: datetime
+    ordinal: int
+    heading: str
+    anchor: str  # Link target within the report, e.g. "key-takeaways"
+    char_start: int
+    char_end: int
+    snippet: str
+
+
 # Tag models
 class TagCreate(BaseModel):
     """Create a new tag."""
@@ -7,7 +7,7 @@ from sse_starlette.sse import EventSourceResponse
 from models import AnalysisRequest, AnalysisJob
 from database import create_job, get_job
 from config import ANTHROPIC_API_KEY, MODELS
-from services.analyzer import run_full_analysis
+from services.analyzer import run_full_analysis, find_existing_report, create_existing_report_job
 
 router = APIRouter()
 
@@ -16,13 +16,54 @@ async def run_analysis_background(
     job_id: str,
     url: str,
     content_type: str,
-    model: str
+    model: str,
+    force: bool = False,
 ):
     """Background task to run analysis."""
-    async for _ in run_full_analysis(url, content_type, model, job_id):
+    async for _ in run_full_analysis(url, content_type, model, job_id, force=force):
         pass  # Consume the generator in background mode
 
 
+async def submit_analysis(
+    request: AnalysisRequest,
+    content_type: str,
+    background_tasks: BackgroundTasks,
+) -> dict:
+    """Start an analysis job, or return the existing report for this source unless forced."""
+    job_id = str(uuid.uuid4())
+
+    if not request.force:
+        canonical_url, existing = await find_existing_report(request.url)
+        if existing:
+            await create_existing_report_job(job_id, content_type, request.url, existing)
+            return {
+                "job_id": job_id,
+                "status": "completed",
+                "model": request.model,
+                "canonical_url": canonical_url,
+                "existing_report": {
+                    "id": existing["id"],
+                    "title": existing["title"],
+                    "filepath": existing["filepath"],
+                    "created_at": existing["created_at"],
+                },
+            }
+
+    await create_job(job_id, content_type, request.url)
+
+    # Start analysis in background
+    background_tasks.add_task(
+        run_analysis_background,
+        job_id,
+        request.url,
+        content_type,
+        request.model,
+        request.force,
+    )
+
+    return {"job_id": job_id, "status": "pending", "model": request.model}
+
+
 @router.get("/status")
 async def check_status():
     """Check if API is ready (has API key configured)."""
@@ -56,53 +97,19 @@ async def get_models():
 @router.post("/youtube")
 async def analyze_youtube(request: AnalysisRequest, background_tasks: BackgroundTasks):
     """Submit YouTube URL for analysis."""
-    job_id = str(uuid.uuid4())
-    await create_job(job_id, "youtube", request.url)
-
-    # Start analysis in background
-    background_tasks.add_task(
-        run_analysis_background,
-        job_id,
-        request.url,
-        "youtube",
-        request.model
-    )
-
-    return {"job_id": job_id, "status": "pending", "model": request.model}
+    return await submit_analysis(request, "youtube", background_tasks)
 
 
 @router.post("/article")
 async def analyze_article(request: AnalysisRequest, background_tasks: BackgroundTasks):
     """Submit article URL for analysis."""
-    job_id = str(uuid.uuid4())
-    await create_job(job_id, "article", request.url)
-
-    background_tasks.add_task(
-        run_analysis_background,
-        job_id,
-        request.url,
-        "article",
-        request.model
-    )
-
-    return {"job_id": job_id, "status": "pending", "model": request.model}
+    return await submit_analysis(request, "article", background_tasks)
 
 
 @router.post("/arxiv")
 async def analyze_arxiv(request: AnalysisRequest, background_tasks: BackgroundTasks):
     """Submit arXiv URL for analysis."""
-    job_id = str(uuid.uuid4())
-    await create_job(job_id, "arxiv", request.url)
-
-    background_tasks.add_task(
-        run_analysis_background,
-        job_id,
-        request.url,
-        "arxiv",
-        request.model
-    )
-
-    return {"job_id": job_id, "status": "pending", "model": request.model}
+    return await submit_analysis(request, "arxiv", background_tasks)
 
 
 @router.get("/jobs/{job_id}")
@@ -3,10 +3,12 @@
 import uuid
 from fastapi import APIRouter, BackgroundTasks
 from pydantic import BaseModel
-from typing import List
+from typing import List, Literal
 
-from database import create_job, get_job
+from database import create_job, get_job, get_llm_batch
+from services.analyzer import find_existing_report, create_existing_report_job
 from services.cli_runner import run_claude_code_command
+from services.message_batches import submit_analysis_batch
 
 router = APIRouter()
 
@@ -14,6 +16,9 @@ router = APIRouter()
 class BatchRequest(BaseModel):
     """Batch processing request."""
     items: List[str]  # List of URLs or file paths
+    force: bool = False  # Re-analyze URLs that already have a report
+    bulk: bool = False  # Analyze URLs in a Message Batch (half price, results within 24h)
+    model: Literal["haiku", "sonnet", "opus"] = "sonnet"  # Model for bulk analysis
 
 
 class BatchItemStatus(BaseModel):
@@ -21,6 +26,7 @@ class BatchItemStatus(BaseModel):
     input: str
     status: str
     job_id: str | None = None
+    report_id: int | None = None
 
 
 @router.post("")
@@ -28,10 +34,15 @@ async def submit_batch(request: BatchRequest, background_tasks: BackgroundTasks)
     """
     Submit multiple items for batch processing.
 
-    Each item is processed sequentially as a separate job.
+    Each item is processed sequentially as a separate job. URLs that
+    already have a report get a completed job pointing at it (status
+    "exists") instead, unless force is set. With bulk, URLs are fetched
+    and analyzed together in a Message Batch; their jobs complete when
+    the batch ends (files are still processed one by one).
     """
     batch_id = str(uuid.uuid4())
     items_status = []
+    job_types = {}
 
     for item in request.items:
         job_id = str(uuid.uuid4())
@@ -50,7 +61,20 @@ async def submit_batch(request: BatchRequest, background_tasks: BackgroundTasks)
             job_type = "file"
             command = "analyze"
 
+        if job_type != "file" and not request.force:
+            _, existing = await find_existing_report(item)
+            if existing:
+                await create_existing_report_job(job_id, job_type, item, existing)
+                items_status.append({
+                    "input": item,
+                    "status": "exists",
+                    "job_id": job_id,
+                    "report_id": existing["id"],
+                })
+                continue
+
         await create_job(job_id, job_type, item)
+        job_types[job_id] = job_type
 
         items_status.append({
             "input": item,
@@ -58,8 +82,18 @@ async def submit_batch(request: BatchRequest, background_tasks: BackgroundTasks)
             "job_id": job_id,
         })
 
+    pending = [i for i in items_status if i["status"] == "pending"]
+    if request.bulk:
+        bulk_items = [
+            {"job_id": i["job_id"], "url": i["input"], "content_type": job_types[i["job_id"]],
+             "model": request.model, "force": request.force}
+            for i in pending if job_types[i["job_id"]] != "file"
+        ]
+        background_tasks.add_task(submit_analysis_batch, bulk_items)
+        pending = [i for i in pending if job_types[i["job_id"]] == "file"]
+
     # Process all items in background
-    background_tasks.add_task(process_batch, items_status)
+    background_tasks.add_task(process_batch, pending)
 
     return {
         "batch_id": batch_id,
@@ -90,7 +124,16 @@ def get_command_for_type(job_type: str) -> str:
 
 @router.get("/{batch_id}/status")
 async def get_batch_status(batch_id: str):
-    """Get status of all items in a batch."""
+    """
+    Get status of a batch.
+
+    Message batch ids (returned by bulk endpoints) report their progress;
+    for other batches check the individual job IDs.
+    """
+    message_batch = await get_llm_batch(batch_id)
+    if message_batch:
+        return {"batch_id": batch_id, **message_batch}
+
     # Note: In a full implementation, we'd store batch metadata
     # For now, return a placeholder
     return {"batch_id": batch_id, "status": "Check individual job IDs"}
@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from typing import Optional
 
 from services.comparison_service import compare_reports, get_comparison_suggestions
+from services.singleflight import singleflight
 
 router = APIRouter()
 
@@ -12,7 +13,7 @@ router = APIRouter()
 class ComparisonRequest(BaseModel):
     report_id_a: int
     report_id_b: int
-    model: str = "sonnet"
+    model: Optional[str] = None  # None: the comparison task's default model
 
 
 class ReportInfo(BaseModel):
@@ -50,10 +51,14 @@ async def create_comparison(request: ComparisonRequest):
             detail="Cannot compare a report with itself"
         )
 
-    result = await compare_reports(
-        report_id_a=request.report_id_a,
-        report_id_b=request.report_id_b,
-        model_key=request.model,
+    # Identical comparisons requested at the same time share one call
+    result = await singleflight.run(
+        ("comparison", request.report_id_a, request.report_id_b, request.model),
+        lambda: compare_reports(
+            report_id_a=request.report_id_a,
+            report_id_b=request.report_id_b,
+            model_key=request.model,
+        ),
     )
 
     if "error" in result:
@@ -6,6 +6,7 @@ from typing import Optional
 
 from database import get_report_by_id
 from services.credibility_service import analyze_credibility
+from services.singleflight import singleflight
 
 router = APIRouter()
 
@@ -43,11 +44,16 @@ async def analyze_report_credibility(report_id: int):
     if not content:
         raise HTTPException(status_code=400, detail="Report has no content")
 
-    result = await analyze_credibility(
-        content=content,
-        title=report["title"],
-        source_url=report.get("source_url", ""),
-        content_type=report["content_type"],
+    # Identical checks requested at the same time share one call
+    result = await singleflight.run(
+        ("credibility", report_id),
+        lambda: analyze_credibility(
+            content=content,
+            title=report["title"],
+            source_url=report.get("source_url", ""),
+            content_type=report["content_type"],
+            report_id=report_id,
+        ),
     )
 
     if "error" in result and not result.get("overall_score"):
@@ -1,14 +1,20 @@
 """Export router - Obsidian, Notion, and Anki exports."""
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import PlainTextResponse, JSONResponse
+import asyncio
+
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
 from pathlib import Path
 import tempfile
 
 from config import PROJECT_ROOT, REPORTS_DIR
-from services.export import export_to_obsidian, export_for_notion
+from services.export import (
+    export_to_obsidian, export_for_notion, iter_obsidian_zip, iter_notion_ndjson, iter_notion_json
+)
 from services.flashcards import generate_flashcards_batch, generate_flashcards_for_report
 from services.digest import generate_weekly_digest, generate_monthly_digest
 
@@ -19,6 +25,8 @@ class ExportRequest(BaseModel):
     format: str  # "obsidian", "notion", "anki"
     reports: Optional[List[str]] = None  # Specific report paths, or None for all
     output_path: Optional[str] = None
+    incremental: bool = True  # Obsidian: only rewrite changed reports
+    since: Optional[datetime] = None  # Anki: only cards added/changed after this (UTC)
 
 
 class DigestRequest(BaseModel):
@@ -32,6 +40,7 @@ class ExportResponse(BaseModel):
     failed: int
     output_path: Optional[str]
     message: str
+    synced_at: Optional[str] = None  # Anki: pass back as "since" on the next sync
 
 
 class DigestResponse(BaseModel):
@@ -41,39 +50,94 @@ class DigestResponse(BaseModel):
     reports_included: int
 
 
+def _report_path(relative: str) -> Path:
+    """
+    Path of a report given relative to reports/.
+
+    Raises HTTPException (400) for anything that isn't a .md file inside
+    REPORTS_DIR, so ".." or absolute paths can't read other files.
+    """
+    reports_dir = REPORTS_DIR.resolve()
+    path = (reports_dir / relative).resolve()
+    if path.suffix != ".md" or not path.is_relative_to(reports_dir):
+        raise HTTPException(status_code=400, detail=f"Invalid report path: {relative}")
+    return REPORTS_DIR / path.relative_to(reports_dir)
+
+
+def _resolve_reports(paths: Optional[List[str]]) -> Optional[List[Path]]:
+    """Existing report files for paths relative to reports/ (None for all reports)."""
+    if not paths:
+        return None
+    return [path for path in map(_report_path, paths) if path.exists()]
+
+
 @router.post("/obsidian", response_model=ExportResponse)
 async def export_obsidian(request: ExportRequest):
     """Export reports to Obsidian vault format."""
+    reports = _resolve_reports(request.reports)
     try:
         output_dir = Path(request.output_path) if request.output_path else PROJECT_ROOT / "exports" / "obsidian"
 
-        reports = None
-        if request.reports:
-            reports = [REPORTS_DIR / r for r in request.reports if (REPORTS_DIR / r).exists()]
-
-        stats = export_to_obsidian(output_dir, reports)
+        stats = await asyncio.to_thread(
+            export_to_obsidian, output_dir, reports, incremental=request.incremental
+        )
 
         return ExportResponse(
             status="success",
             exported=stats["exported"],
             failed=stats["failed"],
             output_path=stats["output_dir"],
-            message=f"Exported {stats['exported']} reports to Obsidian format",
+            message=(
+                f"Exported {stats['exported']} reports to Obsidian format "
+                f"({stats['unchanged']} unchanged, {stats['removed']} removed)"
+            ),
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/obsidian/zip")
+async def stream_obsidian_zip(
+    reports: Optional[List[str]] = Query(None, description="Report paths relative to reports/ (default: all)"),
+    include_structure: bool = Query(True, description="Keep category folders"),
+):
+    """Download an Obsidian vault as a ZIP built on the fly."""
+    filename = f"obsidian-export-{datetime.now().strftime('%Y-%m-%d')}.zip"
+    return StreamingResponse(
+        iter_obsidian_zip(_resolve_reports(reports), include_structure),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/notion/stream")
+async def stream_notion(
+    reports: Optional[List[str]] = Query(None, description="Report paths relative to reports/ (default: all)"),
+    format: str = Query("ndjson", description="ndjson (one report per line) or json"),
+):
+    """Stream a Notion export as NDJSON or as a chunked JSON document."""
+    if format == "ndjson":
+        body, media_type, ext = iter_notion_ndjson(_resolve_reports(reports)), "application/x-ndjson", "ndjson"
+    elif format == "json":
+        body, media_type, ext = iter_notion_json(_resolve_reports(reports)), "application/json", "json"
+    else:
+        raise HTTPException(status_code=400, detail="Invalid format. Use: ndjson, json")
+
+    filename = f"notion-export-{datetime.now().strftime('%Y-%m-%d')}.{ext}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.post("/notion", response_model=ExportResponse)
 async def export_notion(request: ExportRequest):
     """Export reports to Notion-compatible JSON."""
+    reports = _resolve_reports(request.reports)
     try:
         output_file = Path(request.output_path) if request.output_path else PROJECT_ROOT / "exports" / "notion-export.json"
 
-        reports = None
-        if request.reports:
-            reports = [REPORTS_DIR / r for r in request.reports if (REPORTS_DIR / r).exists()]
-
         stats = export_for_notion(output_file, reports)
 
         return ExportResponse(
@@ -90,21 +154,19 @@ async def export_notion(request: ExportRequest):
 @router.post("/anki", response_model=ExportResponse)
 async def export_anki(request: ExportRequest):
     """Generate Anki flashcards from reports."""
+    reports = _resolve_reports(request.reports)
     try:
         output_file = Path(request.output_path) if request.output_path else None
 
-        reports = None
-        if request.reports:
-            reports = [REPORTS_DIR / r for r in request.reports if (REPORTS_DIR / r).exists()]
-
-        stats = await generate_flashcards_batch(reports, output_file)
+        stats = await generate_flashcards_batch(reports, output_file, since=request.since)
 
         return ExportResponse(
             status="success",
             exported=stats["cards"],
             failed=stats["failed"],
             output_path=stats.get("output_file"),
-            message=f"Generated {stats['cards']} flashcards from {stats['processed']} reports",
+            message=f"Exported {stats['cards']} flashcards from {stats['processed']} reports",
+            synced_at=stats["synced_at"],
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -113,8 +175,8 @@ async def export_anki(request: ExportRequest):
 @router.get("/anki/{report_path:path}")
 async def get_flashcards_for_report(report_path: str, format: str = "csv"):
     """Generate flashcards for a specific report."""
+    full_path = _report_path(report_path)
     try:
-        full_path = REPORTS_DIR / report_path
         if not full_path.exists():
             raise HTTPException(status_code=404, detail="Report not found")
 
@@ -1,22 +1,31 @@
 """Knowledge Graph router - visualize and explore concept connections."""
 
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
 import logging
+import uuid
 
 from database import (
     get_knowledge_graph,
     get_concept_details,
     upsert_concept,
     get_report_by_id,
+    get_reports_needing_concepts,
+    get_unfinished_jobs,
+    create_job,
 )
-from services.concept_extractor import extract_and_store_concepts
+from services.concept_extractor import extract_and_store_concepts, start_extraction_job
+from services.singleflight import singleflight
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Serializes extract-all's check for a running job with starting one
+_extract_all_lock = asyncio.Lock()
+
 
 class ConceptCreate(BaseModel):
     name: str
@@ -108,11 +117,14 @@ async def extract_concepts_from_report(report_id: int):
     if not content:
         raise HTTPException(status_code=400, detail="Report has no content")
 
-    # Extract and store concepts
-    result = await extract_and_store_concepts(
-        report_id=report_id,
-        content=content,
-        title=report.get("title", ""),
+    # Extract and store concepts (concurrent requests for a report share one run)
+    result = await singleflight.run(
+        ("concepts", report_id),
+        lambda: extract_and_store_concepts(
+            report_id=report_id,
+            content=content,
+            title=report.get("title", ""),
+        ),
     )
 
     return ExtractionResult(
@@ -124,34 +136,34 @@ async def extract_concepts_from_report(report_id: int):
 
 @router.post("/extract-all")
 async def extract_concepts_from_all_reports(
-    background_tasks: BackgroundTasks,
-    limit: int = Query(50, ge=1, le=200, description="Max reports to process"),
+    limit: Optional[int] = Query(None, ge=1, description="Max reports to process (default: all that need it)"),
+    bulk: bool = Query(False, description="Submit as a Message Batch (half price, results within 24h)"),
 ):
     """
-    Extract concepts from all reports that haven't been processed yet.
+    Extract concepts from reports that don't have them or have changed since.
 
-    Runs in background to avoid timeout.
+    Runs as a background job (follow it at /api/analysis/jobs/{job_id}/stream
+    for progress, throughput and ETA) that resumes after a restart; while one
+    is unfinished, its job_id is returned instead of starting another. With
+    bulk, the extractions are submitted as one Message Batch and stored when
+    it ends. Reports waiting in such a batch are not selected again.
     """
-    from database import get_reports
-
-    async def process_reports():
-        reports, _ = await get_reports(page=1, page_size=limit)
-        processed = 0
-
-        for report in reports:
-            try:
-                content = report.get("content", "")
-                if content:
-                    await extract_and_store_concepts(
-                        report_id=report["id"],
-                        content=content,
-                        title=report.get("title", ""),
-                    )
-                    processed += 1
-            except Exception as e:
-                logger.error(f"Failed to extract concepts from report {report['id']}: {e}")
-
-        logger.info(f"Processed {processed} reports for concept extraction")
-
-    background_tasks.add_task(process_reports)
-    return {"message": f"Started extracting concepts from up to {limit} reports"}
+    if bulk:
+        from services.message_batches import submit_concept_batch
+
+        reports = await get_reports_needing_concepts(limit)
+        batch_ids = await submit_concept_batch([r["id"] for r in reports])
+        return {
+            "message": f"Submitted concept extraction for {len(reports)} reports as a message batch",
+            "batch_ids": batch_ids,
+        }
+
+    async with _extract_all_lock:
+        running = await get_unfinished_jobs("concepts")
+        if running:
+            return {"message": "Concept extraction is already running", "job_id": running[0]["id"]}
+
+        job_id = str(uuid.uuid4())
+        await create_job(job_id, "concepts", "all" if limit is None else str(limit))
+        start_extraction_job(job_id, limit)
+    return {"message": "Started concept extraction", "job_id": job_id}
@@ -1,13 +1,16 @@
 """Activity logs router."""
 
 from fastapi import APIRouter, HTTPException, Query
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
 from config import LOGS_DIR
-from models import ActivityLog, ActivityLogEntry
-from services.parser import parse_activity_log
+from database import (
+    get_activity_logs, get_activity_entries, get_activity_heatmap, get_activity_streak
+)
+from models import ActivityLog, ActivityLogEntry, ActivityHeatmapDay, ActivityStreak
+from services.indexer import index_log_file
 
 router = APIRouter()
 
@@ -17,28 +20,45 @@ def get_log_filepath(log_date: date) -> Path:
     return LOGS_DIR / f"{log_date.isoformat()}.md"
 
 
+def parse_date_param(value: str) -> date:
+    """Parse a YYYY-MM-DD path/query parameter."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+
+
+def build_activity_logs(entries: list[dict]) -> list[ActivityLog]:
+    """Group indexed entries (ordered by date) into one ActivityLog per day."""
+    logs: dict[str, ActivityLog] = {}
+    for entry in entries:
+        log = logs.get(entry["log_date"])
+        if log is None:
+            log = logs[entry["log_date"]] = ActivityLog(date=entry["log_date"])
+        getattr(log, entry["section"]).append(ActivityLogEntry(
+            title=entry["title"],
+            report_path=entry["report_path"],
+            time=entry["entry_time"] or "",
+        ))
+    return list(logs.values())
+
+
 @router.get("")
 async def list_logs(limit: int = Query(30, ge=1, le=365)):
     """List all available activity log dates."""
-    if not LOGS_DIR.exists():
-        return []
-
-    logs = []
-    for filepath in sorted(LOGS_DIR.glob("*.md"), reverse=True)[:limit]:
-        if filepath.name.startswith("."):
-            continue
+    logs = await get_activity_logs(limit=limit)
 
-        # Parse date from filename
-        try:
-            log_date = filepath.stem  # YYYY-MM-DD
-            logs.append({
-                "date": log_date,
-                "filepath": str(filepath),
-            })
-        except Exception:
-            continue
-
-    return logs
+    return [
+        {
+            "date": log["log_date"],
+            "filepath": log["filepath"],
+            "videos_count": log["videos_count"],
+            "articles_count": log["articles_count"],
+            "papers_count": log["papers_count"],
+            "other_count": log["other_count"],
+        }
+        for log in logs
+    ]
 
 
 @router.get("/today", response_model=ActivityLog)
@@ -47,33 +67,63 @@ async def get_today_log():
     return await get_log_by_date(date.today().isoformat())
 
 
+@router.get("/range", response_model=list[ActivityLog])
+async def get_logs_in_range(
+    start: str = Query(..., description="Start date (YYYY-MM-DD)"),
+    end: str = Query(..., description="End date (YYYY-MM-DD), inclusive"),
+):
+    """Get all activity logs between two dates, newest first."""
+    start_date, end_date = parse_date_param(start), parse_date_param(end)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start must be on or before end")
+
+    entries = await get_activity_entries(start_date.isoformat(), end_date.isoformat())
+    return build_activity_logs(entries)
+
+
+@router.get("/heatmap", response_model=list[ActivityHeatmapDay])
+async def get_heatmap(
+    start: Optional[str] = Query(None, description="Start date (default: 1 year ago)"),
+    end: Optional[str] = Query(None, description="End date (default: today)"),
+):
+    """Get per-day activity counts for a calendar heatmap (days without activity are omitted)."""
+    end_date = parse_date_param(end) if end else date.today()
+    start_date = parse_date_param(start) if start else end_date - timedelta(days=364)
+
+    days = await get_activity_heatmap(start_date.isoformat(), end_date.isoformat())
+    return [
+        ActivityHeatmapDay(
+            date=d["log_date"],
+            total=d["total"],
+            videos=d["videos"],
+            articles=d["articles"],
+            papers=d["papers"],
+            other=d["other"],
+        )
+        for d in days
+    ]
+
+
+@router.get("/streak", response_model=ActivityStreak)
+async def get_streak():
+    """Get current and longest consecutive-day activity streaks."""
+    streak = await get_activity_streak(date.today().isoformat())
+    return ActivityStreak(**streak)
+
+
 @router.get("/{log_date}", response_model=ActivityLog)
 async def get_log_by_date(log_date: str):
     """Get activity log for a specific date (YYYY-MM-DD)."""
-    try:
-        parsed_date = datetime.strptime(log_date, "%Y-%m-%d").date()
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    parsed_date = parse_date_param(log_date)
+    day = parsed_date.isoformat()
 
-    filepath = get_log_filepath(parsed_date)
-
-    if not filepath.exists():
-        # Return empty log for the date
-        return ActivityLog(
-            date=log_date,
-            videos=[],
-            articles=[],
-            papers=[],
-            other=[],
-        )
+    entries = await get_activity_entries(day, day)
 
-    content = filepath.read_text(encoding="utf-8")
-    parsed = parse_activity_log(content)
+    if not entries:
+        # Index on demand in case the watcher hasn't picked the file up yet
+        filepath = get_log_filepath(parsed_date)
+        if filepath.exists() and await index_log_file(filepath):
+            entries = await get_activity_entries(day, day)
 
-    return ActivityLog(
-        date=parsed["date"] or log_date,
-        videos=[ActivityLogEntry(**v) for v in parsed["videos"]],
-        articles=[ActivityLogEntry(**a) for a in parsed["articles"]],
-        papers=[ActivityLogEntry(**p) for p in parsed["papers"]],
-        other=[ActivityLogEntry(**o) for o in parsed["other"]],
-    )
+    logs = build_activity_logs(entries)
+    return logs[0] if logs else ActivityLog(date=day)
@@ -11,7 +11,7 @@ router = APIRouter()
 
 class QuestionRequest(BaseModel):
     question: str
-    model: str = "sonnet"
+    model: Optional[str] = None  # None: picked by task and context size
     max_reports: int = 5
 
 
@@ -26,6 +26,8 @@ class AnswerResponse(BaseModel):
     answer: str
     sources: list[SourceInfo]
     tokens_used: int
+    cache_creation_tokens: int = 0
+    cache_read_tokens: int = 0
     cost: Optional[float] = None
     model: Optional[str] = None
     followup_suggestions: list[str] = []
@@ -66,6 +68,8 @@ async def ask_question(request: QuestionRequest):
             for s in result.get("sources", [])
         ],
         tokens_used=result.get("tokens_used", 0),
+        cache_creation_tokens=result.get("cache_creation_tokens", 0),
+        cache_read_tokens=result.get("cache_read_tokens", 0),
         cost=result.get("cost"),
         model=result.get("model"),
         followup_suggestions=followups,
@@ -8,10 +8,14 @@ from pydantic import BaseModel
 
 from database import (
     get_reports, get_report_by_id, search_reports, toggle_favorite, get_favorite_reports,
-    get_report_filepath_by_id, delete_report_by_id, update_report_category
+    get_report_filepath_by_id, delete_report_by_id, update_report_category,
+    search_report_sections, get_report_sections
+)
+from models import (
+    Report, ReportList, ReportLookup, SearchResult, SectionSearchResult, ReportSection, FavoriteResponse
 )
-from models import Report, ReportList, SearchResult, FavoriteResponse
 from config import CONTENT_TYPES
+from services.analyzer import find_existing_report
 
 
 class BulkDeleteRequest(BaseModel):
@@ -107,6 +111,31 @@ async def search(
     ]
 
 
+@router.get("/search/sections")
+async def search_sections(
+    q: str = Query(..., min_length=1, description="Search query"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Full-text search returning matching report sections with anchors."""
+    results = await search_report_sections(q, limit=limit)
+
+    return [
+        SectionSearchResult(
+            report_id=r["report_id"],
+            title=r["title"],
+            content_type=r["content_type"],
+            created_at=r["created_at"],
+            ordinal=r["ordinal"],
+            heading=r["heading"],
+            anchor=r["anchor"],
+            char_start=r["char_start"],
+            char_end=r["char_end"],
+            snippet=r["snippet"],
+        )
+        for r in results
+    ]
+
+
 @router.get("/favorites")
 async def list_favorites():
     """Get all favorited reports."""
@@ -127,6 +156,28 @@ async def list_favorites():
     ]
 
 
+@router.get("/lookup", response_model=ReportLookup)
+async def lookup_report(url: str = Query(..., min_length=1, description="Source URL")):
+    """Find the report already generated for a URL (matched by canonical URL)."""
+    canonical_url, item = await find_existing_report(url)
+
+    report = None
+    if item:
+        report = Report(
+            id=item["id"],
+            filename=item["filename"],
+            filepath=item["filepath"],
+            title=item["title"],
+            source_url=item.get("source_url"),
+            content_type=item["content_type"],
+            created_at=item["created_at"],
+            summary=item.get("summary"),
+            word_count=item.get("word_count"),
+        )
+
+    return ReportLookup(url=url, canonical_url=canonical_url, report=report)
+
+
 @router.post("/{report_id}/favorite", response_model=FavoriteResponse)
 async def toggle_report_favorite(report_id: int):
     """Toggle favorite status for a report."""
@@ -156,6 +207,16 @@ async def get_report(report_id: int):
     )
 
 
+@router.get("/{report_id}/sections", response_model=List[ReportSection])
+async def list_report_sections(report_id: int):
+    """Get the indexed sections of a report."""
+    if not await get_report_filepath_by_id(report_id):
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    sections = await get_report_sections(report_id)
+    return [ReportSection(**s) for s in sections]
+
+
 @router.delete("/{report_id}")
 async def delete_report_endpoint(report_id: int):
     """Delete a report (file and database record)."""
@@ -1,8 +1,13 @@
 """RSS feed management router."""
 
-from fastapi import APIRouter, HTTPException
+import uuid
+from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
+
+from database import create_job
+from services.analyzer import find_existing_report
+from services.message_batches import submit_analysis_batch
 
 from services.rss import (
     add_feed,
@@ -131,14 +136,14 @@ async def delete_feed(feed_id: str):
 
 
 @router.post("/feeds/{feed_id}/check", response_model=List[ItemResponse])
-async def check_single_feed(feed_id: str):
-    """Check a specific feed for new items."""
+async def check_single_feed(feed_id: str, force: bool = False):
+    """Check a specific feed for new items (force queues already-analyzed URLs too)."""
     feed = get_feed(feed_id)
     if not feed:
         raise HTTPException(status_code=404, detail="Feed not found")
 
     try:
-        new_items = await check_feed(feed)
+        new_items = await check_feed(feed, force=force)
         return [ItemResponse(
             id=i.id,
             feed_id=i.feed_id,
@@ -154,10 +159,10 @@ async def check_single_feed(feed_id: str):
 
 
 @router.post("/feeds/check-all", response_model=CheckFeedsResponse)
-async def check_all():
-    """Check all enabled feeds for new items."""
+async def check_all(force: bool = False):
+    """Check all enabled feeds for new items (force queues already-analyzed URLs too)."""
     try:
-        results = await check_all_feeds()
+        results = await check_all_feeds(force=force)
         total_new = sum(len(items) for items in results.values())
 
         return CheckFeedsResponse(
@@ -212,3 +217,51 @@ async def mark_processed(item_id: str):
     """Mark an item as processed."""
     mark_item_processed(item_id)
     return {"status": "marked_processed", "item_id": item_id}
+
+
+@router.post("/backlog/analyze")
+async def analyze_backlog(
+    background_tasks: BackgroundTasks,
+    limit: int = 100,
+    model: Literal["haiku", "sonnet", "opus"] = "sonnet",
+    force: bool = False,
+):
+    """
+    Analyze unprocessed items in bulk as a Message Batch.
+
+    Creates a job per item; items are marked processed as their reports
+    are saved when the batch ends. Items that already have a report are
+    marked processed instead, unless force is set.
+    """
+    jobs = []
+    skipped = 0
+    for item in get_unprocessed_items(limit):
+        if not item.url:
+            continue
+        if not force:
+            _, existing = await find_existing_report(item.url)
+            if existing:
+                mark_item_processed(item.id)
+                skipped += 1
+                continue
+
+        feed = get_feed(item.feed_id)
+        job_id = str(uuid.uuid4())
+        content_type = feed.category if feed else "article"
+        await create_job(job_id, content_type, item.url)
+        jobs.append({
+            "job_id": job_id,
+            "url": item.url,
+            "content_type": content_type,
+            "model": model,
+            "rss_item_id": item.id,
+            "force": force,
+        })
+
+    if jobs:
+        background_tasks.add_task(submit_analysis_batch, jobs)
+
+    return {
+        "jobs": [{"item_id": j["rss_item_id"], "job_id": j["job_id"]} for j in jobs],
+        "already_analyzed": skipped,
+    }
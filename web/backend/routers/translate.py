@@ -4,12 +4,19 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 
-from anthropic import Anthropic
-from config import ANTHROPIC_API_KEY, MODELS
+from config import MODELS
 from database import get_report_by_id
+from services.llm import complete
+from services.model_router import route_model
+from services.singleflight import singleflight
+from services.token_budget import truncate_to_tokens
 
 router = APIRouter()
 
+# Content budget per translation; output can run longer than the input in
+# some languages, so this stays well under the 8192 output tokens allowed
+TRANSLATION_CONTENT_TOKENS = 4000
+
 LANGUAGES = {
     "es": "Spanish",
     "fr": "French",
@@ -38,12 +45,6 @@ class TranslationResponse(BaseModel):
     language_name: str
 
 
-def get_client() -> Anthropic:
-    if not ANTHROPIC_API_KEY:
-        raise ValueError("ANTHROPIC_API_KEY not set")
-    return Anthropic(api_key=ANTHROPIC_API_KEY)
-
-
 @router.get("/languages")
 async def get_supported_languages():
     """Get list of supported languages."""
@@ -74,8 +75,7 @@ async def translate_report(report_id: int, request: TranslateRequest):
     language_name = LANGUAGES[request.target_language]
 
     # Truncate if too long
-    if len(content) > 15000:
-        content = content[:15000] + "\n\n[Content truncated...]"
+    content = truncate_to_tokens(content, TRANSLATION_CONTENT_TOKENS)
 
     prompt = f"""Translate the following content to {language_name}.
 Maintain the markdown formatting and structure.
@@ -86,16 +86,18 @@ Content to translate:
 {content}"""
 
     try:
-        client = get_client()
-        model_info = MODELS["haiku"]
-
-        response = client.messages.create(
-            model=model_info["id"],
-            max_tokens=8192,
-            messages=[{"role": "user", "content": prompt}]
+        model_info = MODELS[route_model("translation")]
+
+        # Identical translations requested at the same time share one call
+        result = await singleflight.run(
+            ("translation", report_id, request.target_language, tuple(request.sections)),
+            lambda: complete(
+                model_info["id"], prompt, max_tokens=8192,
+                service="translation", report_id=report_id,
+            ),
         )
 
-        translated = response.content[0].text
+        translated = result.text
 
         # Extract translated title (first line)
         lines = translated.split('\n')
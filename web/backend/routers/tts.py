@@ -1,22 +1,29 @@
 """TTS Router - Generate audio versions of reports."""
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse
+import re
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
-from typing import Optional
+from typing import Iterator, Optional
 from pathlib import Path
 
-from config import PROJECT_ROOT
 from services.tts_service import (
     generate_audio,
     get_available_audio,
     get_voices,
+    get_audio_path,
+    plan_audio,
+    iter_progressive_audio,
+    TTSError,
     VOICES,
     DEFAULT_VOICE,
 )
 
 router = APIRouter()
 
+STREAM_BLOCK_SIZE = 64 * 1024
+
 
 class GenerateRequest(BaseModel):
     voice: str = DEFAULT_VOICE
@@ -33,6 +40,8 @@ class GenerateResponse(BaseModel):
     audio_path: str
     voice: str
     duration_estimate: Optional[int] = None
+    chunks: Optional[int] = None
+    chunks_synthesized: Optional[int] = None
     cached: bool
 
 
@@ -58,7 +67,8 @@ async def generate_report_audio(report_id: int, request: GenerateRequest):
     """
     Generate audio for a report using text-to-speech.
 
-    The audio is cached, so subsequent requests return quickly.
+    Audio is cached per text chunk, so subsequent requests return quickly
+    and edits only re-synthesize the chunks that changed.
     Set force_regenerate=true to regenerate even if cached.
     """
     result = await generate_audio(
@@ -74,6 +84,8 @@ async def generate_report_audio(report_id: int, request: GenerateRequest):
         audio_path=result["audio_path"],
         voice=result["voice"],
         duration_estimate=result.get("duration_estimate"),
+        chunks=result.get("chunks"),
+        chunks_synthesized=result.get("chunks_synthesized"),
         cached=result["cached"],
     )
 
@@ -85,17 +97,111 @@ async def get_report_audio(report_id: int):
     return {"report_id": report_id, "audio_versions": available}
 
 
+def parse_range_header(range_header: str, file_size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single "bytes=" range into inclusive (start, end).
+
+    Returns None for headers we don't handle (multiple ranges, other
+    units), in which case the whole file is sent. Raises HTTPException
+    416 for unsatisfiable ranges.
+    """
+    match = re.fullmatch(r"\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*", range_header)
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+
+    start_str, end_str = match.groups()
+    if start_str:
+        start = int(start_str)
+        end = min(int(end_str), file_size - 1) if end_str else file_size - 1
+    else:
+        # Suffix range: last N bytes
+        length = int(end_str)
+        start = max(file_size - length, 0)
+        end = file_size - 1
+        if length == 0:
+            start = file_size
+
+    if start >= file_size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"},
+        )
+    return start, end
+
+
+def iter_file_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    """Read bytes start..end (inclusive) of a file in blocks."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = f.read(min(STREAM_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def ranged_file_response(request: Request, path: Path, media_type: str, filename: str) -> Response:
+    """Serve a file with Range support (206 Partial Content) for seeking."""
+    file_size = path.stat().st_size
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'inline; filename="{filename}"',
+    }
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header and file_size > 0:
+        byte_range = parse_range_header(range_header, file_size)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(file_size)
+        return StreamingResponse(
+            iter_file_range(path, 0, file_size - 1), media_type=media_type, headers=headers
+        )
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_file_range(path, start, end), status_code=206, media_type=media_type, headers=headers
+    )
+
+
 @router.get("/{report_id}/stream/{voice}")
-async def stream_audio(report_id: int, voice: str):
+async def stream_audio(
+    report_id: int,
+    voice: str,
+    request: Request,
+    progressive: bool = Query(False, description="Start playback while audio is still being generated"),
+):
     """
     Stream the audio file for a report.
 
-    Returns the MP3 file directly for playback.
+    Supports Range requests (206 Partial Content) for seeking. With
+    progressive=true, audio that isn't generated yet (or is stale) is
+    streamed chunk by chunk as it's synthesized, and saved for later
+    requests once complete.
     """
     if voice not in VOICES:
         raise HTTPException(status_code=400, detail=f"Invalid voice: {voice}")
 
-    audio_path = PROJECT_ROOT / "audio" / f"report_{report_id}_{voice}.mp3"
+    audio_path = get_audio_path(report_id, voice)
+
+    if progressive:
+        try:
+            plan = await plan_audio(report_id, voice)
+        except TTSError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if not plan["current"]:
+            return StreamingResponse(
+                iter_progressive_audio(report_id, voice, plan["chunks"]),
+                media_type="audio/mpeg",
+                headers={"Cache-Control": "no-store"},
+            )
 
     if not audio_path.exists():
         raise HTTPException(
@@ -103,8 +209,9 @@ async def stream_audio(report_id: int, voice: str):
             detail="Audio not found. Generate it first using POST."
         )
 
-    return FileResponse(
-        path=audio_path,
+    return ranged_file_response(
+        request,
+        audio_path,
         media_type="audio/mpeg",
         filename=f"report_{report_id}_{voice}.mp3",
     )
@@ -0,0 +1,46 @@
+"""Usage router - Claude token usage, latency and cost rollups."""
+
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Query
+
+from database import get_llm_usage_totals, get_llm_usage_rollup
+
+router = APIRouter()
+
+
+def _since(days: int) -> str:
+    """First day (UTC, like the ledger timestamps) of a window of `days` days ending today."""
+    return (datetime.now(timezone.utc).date() - timedelta(days=days - 1)).isoformat()
+
+
+@router.get("")
+async def get_usage_summary(days: int = Query(30, ge=1, le=365)):
+    """
+    Get usage totals for the last N days.
+
+    Includes request count, input/output/cache tokens, cost in dollars and
+    average/max latency.
+    """
+    since = _since(days)
+    return {"since": since, "days": days, **await get_llm_usage_totals(since)}
+
+
+@router.get("/daily")
+async def get_daily_usage(days: int = Query(30, ge=1, le=365)):
+    """Get usage per day (UTC) for the last N days."""
+    since = _since(days)
+    return {"since": since, "days": await get_llm_usage_rollup("day", since)}
+
+
+@router.get("/models")
+async def get_usage_by_model(days: int = Query(30, ge=1, le=365)):
+    """Get usage per model for the last N days, most expensive first."""
+    since = _since(days)
+    return {"since": since, "models": await get_llm_usage_rollup("model", since)}
+
+
+@router.get("/services")
+async def get_usage_by_service(days: int = Query(30, ge=1, le=365)):
+    """Get usage per service (analysis, qa, concepts, ...) for the last N days, most expensive first."""
+    since = _since(days)
+    return {"since": since, "services": await get_llm_usage_rollup("service", since)}
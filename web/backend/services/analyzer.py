@@ -1,33 +1,164 @@
 """Content analysis service using Anthropic API."""
 
+import asyncio
+import os
 import re
 import logging
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Optional, AsyncGenerator
-
-from anthropic import Anthropic
+from typing import Optional, AsyncGenerator, Tuple
 
 from config import (
-    ANTHROPIC_API_KEY,
     MODELS,
-    DEFAULT_MODEL,
     PROMPTS_DIR,
     REPORTS_DIR,
-    LOGS_DIR,
     CONTENT_TYPES,
 )
-from database import update_job_status, update_job_progress
-from services.indexer import run_initial_index
+from database import (
+    create_job, update_job_status, update_job_progress, get_report_by_canonical_url
+)
+from services.content_fetcher import resolve_canonical_url
+from services.llm import LLMResult, complete, add_usage, estimate_cost, format_usage
+from services.model_router import route_model
+from services.token_budget import estimate_tokens, model_info_for_id
+from services.indexer import index_report_file, get_content_type_from_path
+from services.log_writer import log_writer
 
 logger = logging.getLogger(__name__)
 
+# Content longer than this (estimated tokens) is analyzed map-reduce style:
+# chunks are summarized into notes concurrently, then the prompt runs over the notes
+LONG_CONTENT_TOKENS = int(os.getenv("LONG_CONTENT_TOKENS", "100000"))
+CHUNK_TOKENS = int(os.getenv("ANALYSIS_CHUNK_TOKENS", "20000"))
+CHUNK_NOTES_MAX_TOKENS = 4096
+ANALYSIS_FANOUT = int(os.getenv("ANALYSIS_FANOUT", "4"))
+
+CHUNK_NOTES_PROMPT = """You are taking notes on one part of a long {kind} titled "{title}", split into {total} parts.
+These notes will replace the original text when the full {kind} is analyzed, so keep
+everything an analyst would need: the main arguments and how they develop, key claims
+and evidence, numbers, names, definitions, examples and notable quotes (verbatim).
+Follow the order of the text. Do not add commentary or an introduction."""
+
+
+async def find_existing_report(url: str) -> Tuple[str, Optional[dict]]:
+    """
+    Look up a report already generated for this source.
+
+    Returns (canonical_url, report or None).
+    """
+    canonical_url = await resolve_canonical_url(url)
+    return canonical_url, await get_report_by_canonical_url(canonical_url)
+
 
-def get_client() -> Anthropic:
-    """Get Anthropic client."""
-    if not ANTHROPIC_API_KEY:
-        raise ValueError("ANTHROPIC_API_KEY not set. Create web/backend/.env with your API key.")
-    return Anthropic(api_key=ANTHROPIC_API_KEY)
+async def create_existing_report_job(job_id: str, job_type: str, url: str, report: dict):
+    """
+    Record a job that resolved to an existing report without re-analyzing.
+
+    The job is created already completed and points at the existing file,
+    so clients polling or streaming it see the usual completion.
+    """
+    report_path = Path(report["filepath"])
+    rel_path = str(report_path.relative_to(report_path.parent.parent.parent))
+
+    await create_job(job_id, job_type, url)
+    await update_job_progress(job_id, f"Already analyzed: {report['title']}")
+    await update_job_status(job_id, "completed", result_filepath=rel_path)
+
+
+def split_content(content: str, max_tokens: int = CHUNK_TOKENS) -> list[str]:
+    """
+    Split content into chunks of at most ~max_tokens.
+
+    Breaks at paragraph boundaries, falling back to sentences and then
+    words for text without them (e.g. caption transcripts).
+    """
+    max_chars = max_tokens * 4
+
+    # (text, separator to put before it) - paragraphs are rejoined with a
+    # blank line, pieces of a split paragraph with a space
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", content):
+        if not paragraph.strip():
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append((paragraph, "\n\n"))
+            continue
+        separator = "\n\n"
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                pieces.append((sentence[:cut], separator))
+                sentence = sentence[cut:].lstrip()
+                separator = " "
+            if sentence:
+                pieces.append((sentence, separator))
+                separator = " "
+
+    chunks = []
+    current = ""
+    for piece, separator in pieces:
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def summarize_chunks(
+    model_id: str,
+    chunks: list[str],
+    title: str,
+    content_type: str,
+    fanout: int = ANALYSIS_FANOUT,
+    job_id: Optional[str] = None,
+) -> AsyncGenerator[tuple[int, LLMResult], None]:
+    """
+    Summarize chunks into notes, at most `fanout` requests at a time.
+
+    Yields (index, result) as each chunk finishes (in completion order). If
+    a chunk fails or the consumer stops early, chunks not yet sent are
+    never sent and the rest are cancelled.
+    """
+    kind = {"youtube": "video transcript", "arxiv": "paper", "paper": "paper"}.get(content_type, "article")
+    system = CHUNK_NOTES_PROMPT.format(total=len(chunks), kind=kind, title=title)
+    semaphore = asyncio.Semaphore(max(1, fanout))
+    stopped = asyncio.Event()
+
+    async def summarize(index: int, chunk: str):
+        if stopped.is_set():
+            raise asyncio.CancelledError
+        async with semaphore:
+            # Waiting for a slot can outlast the run
+            if stopped.is_set():
+                raise asyncio.CancelledError
+            try:
+                result = await complete(
+                    model_id,
+                    f"Part {index + 1} of {len(chunks)}:\n\n{chunk}",
+                    system=system,
+                    max_tokens=CHUNK_NOTES_MAX_TOKENS,
+                    service="analysis_chunk",
+                    job_id=job_id,
+                )
+            except Exception:
+                stopped.set()  # Before the slot is released to the next chunk
+                raise
+        return index, result
+
+    tasks = [asyncio.create_task(summarize(i, chunk)) for i, chunk in enumerate(chunks)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        stopped.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
 def load_prompt(content_type: str) -> str:
@@ -118,46 +249,33 @@ def format_report(
 """
 
 
-def update_activity_log(title: str, report_path: Path, content_type: str) -> None:
-    """Add entry to today's activity log."""
-    today = datetime.now().strftime("%Y-%m-%d")
-    now = datetime.now().strftime("%H:%M")
-    log_path = LOGS_DIR / f"{today}.md"
-
-    # Ensure logs directory exists
-    LOGS_DIR.mkdir(parents=True, exist_ok=True)
-
-    # Section headers by content type
-    section_map = {
-        "youtube": "## Videos Watched",
-        "article": "## Articles Read",
-        "arxiv": "## Papers Reviewed",
-        "paper": "## Papers Reviewed",
-        "other": "## Other Content",
-    }
-    section = section_map.get(content_type, "## Other Content")
+async def save_analysis(
+    job_id: str,
+    title: str,
+    source: str,
+    content_type: str,
+    analysis: str,
+) -> Path:
+    """
+    Write the report, add it to the activity log and index, and complete the job.
 
-    # Create relative path from logs to reports
-    rel_path = f"../reports/{report_path.parent.name}/{report_path.name}"
-    entry = f"- [{title}]({rel_path}) - {now}\n"
+    Returns the report path.
+    """
+    report = format_report(title, source, content_type, analysis)
+    report_path = get_report_path(content_type, title)
+    report_path.write_text(report, encoding="utf-8")
 
-    if log_path.exists():
-        content = log_path.read_text(encoding="utf-8")
+    # Update activity log
+    await log_writer.log_report(title, report_path, content_type)
 
-        if section in content:
-            # Add under existing section
-            content = content.replace(section, f"{section}\n{entry}", 1)
-        else:
-            # Add new section at end
-            content = content.rstrip() + f"\n\n{section}\n{entry}"
+    # Index the new report
+    await index_report_file(report_path, get_content_type_from_path(report_path) or "other")
 
-        log_path.write_text(content, encoding="utf-8")
-    else:
-        # Create new log file
-        log_content = f"# Activity Log - {today}\n\n{section}\n{entry}"
-        log_path.write_text(log_content, encoding="utf-8")
+    # Mark job as completed
+    rel_path = str(report_path.relative_to(report_path.parent.parent.parent))
+    await update_job_status(job_id, "completed", result_filepath=rel_path)
 
-    logger.info(f"Updated activity log: {log_path}")
+    return report_path
 
 
 async def analyze_content(
@@ -175,9 +293,7 @@ async def analyze_content(
     """
     try:
         # Validate model
-        if model_key not in MODELS:
-            model_key = DEFAULT_MODEL
-        model_info = MODELS[model_key]
+        model_info = MODELS[route_model("analysis", estimate_tokens(content), model_key)]
         model_id = model_info["id"]
 
         yield f"Using model: {model_info['name']}"
@@ -192,52 +308,75 @@ async def analyze_content(
         yield "Analyzing content with Claude..."
         await update_job_progress(job_id, "Analyzing with Claude...")
 
-        client = get_client()
+        usage = {}
+        total_cost = 0.0
 
-        # Combine prompt and content
-        full_prompt = f"{prompt}\n\n---\n\nContent to analyze:\n\n{content}"
+        if estimate_tokens(content) > LONG_CONTENT_TOKENS:
+            # Long content: condense chunks into notes first, then analyze the notes
+            chunks = split_content(content)
+            message = f"Long content: summarizing {len(chunks)} parts ({ANALYSIS_FANOUT} at a time)..."
+            yield message
+            await update_job_progress(job_id, message)
+
+            notes = [""] * len(chunks)
+            # Note-taking is routed on its own (Haiku by default)
+            chunk_model_id = MODELS[route_model("analysis_chunk", CHUNK_TOKENS)]["id"]
+            async for index, chunk_result in summarize_chunks(
+                chunk_model_id, chunks, title, content_type, job_id=job_id
+            ):
+                notes[index] = chunk_result.text
+                usage = add_usage(usage, chunk_result.usage)
+                total_cost += estimate_cost(
+                    chunk_result.usage, model_info_for_id(chunk_result.model) or model_info
+                )
+                done = sum(1 for n in notes if n)
+                message = f"Summarized part {index + 1} ({done}/{len(chunks)} done)"
+                yield message
+                await update_job_progress(job_id, message)
+
+            content = "\n\n".join(
+                f"### Part {i + 1} of {len(notes)}\n\n{n}" for i, n in enumerate(notes)
+            )
+            content_label = (
+                f"Content to analyze (detailed notes taken on the full text in "
+                f"{len(notes)} consecutive parts, in order):"
+            )
+            yield "Analyzing combined notes with Claude..."
+            await update_job_progress(job_id, "Analyzing combined notes...")
+        else:
+            content_label = "Content to analyze:"
 
-        response = client.messages.create(
-            model=model_id,
+        # The prompt template is the cached system block; only the content varies
+        result = await complete(
+            model_id,
+            f"{content_label}\n\n{content}",
+            system=prompt,
             max_tokens=8192,
-            messages=[{"role": "user", "content": full_prompt}]
+            service="analysis",
+            job_id=job_id,
         )
 
-        analysis = response.content[0].text
+        analysis = result.text
+        if result.model != model_id:
+            used = model_info_for_id(result.model)
+            yield f"Over the request cost limit: analyzed with {used['name']}"
+            await update_job_progress(job_id, f"Cost limit: used {used['name']}")
         yield "Analysis complete!"
 
         # Calculate approximate cost
-        input_tokens = response.usage.input_tokens
-        output_tokens = response.usage.output_tokens
-        input_cost = (input_tokens / 1_000_000) * model_info["input_cost"]
-        output_cost = (output_tokens / 1_000_000) * model_info["output_cost"]
-        total_cost = input_cost + output_cost
+        usage = add_usage(usage, result.usage)
+        total_cost += estimate_cost(result.usage, model_info_for_id(result.model) or model_info)
 
-        yield f"Tokens: {input_tokens} in, {output_tokens} out (${total_cost:.4f})"
-        await update_job_progress(job_id, f"Tokens: {input_tokens}+{output_tokens}")
+        yield f"Tokens: {format_usage(usage)} (${total_cost:.4f})"
+        await update_job_progress(job_id, f"Tokens: {format_usage(usage)}")
 
         # Format and save report
         yield "Saving report..."
         await update_job_progress(job_id, "Saving report...")
 
-        report = format_report(title, source, content_type, analysis)
-        report_path = get_report_path(content_type, title)
-        report_path.write_text(report, encoding="utf-8")
+        report_path = await save_analysis(job_id, title, source, content_type, analysis)
 
         yield f"Report saved: {report_path.name}"
-
-        # Update activity log
-        yield "Updating activity log..."
-        update_activity_log(title, report_path, content_type)
-
-        # Re-index database to include new report
-        yield "Updating database index..."
-        await run_initial_index()
-
-        # Mark job as completed
-        rel_path = str(report_path.relative_to(report_path.parent.parent.parent))
-        await update_job_status(job_id, "completed", result_filepath=rel_path)
-
         yield f"[COMPLETED] Analysis saved to {report_path.name}"
 
     except ValueError as e:
@@ -257,10 +396,13 @@ async def run_full_analysis(
     content_type: str,
     model_key: str,
     job_id: str,
+    force: bool = False,
 ) -> AsyncGenerator[str, None]:
     """
     Run complete analysis pipeline: fetch content, analyze, save.
 
+    With force, the content is refetched rather than read from the fetch cache.
+
     Yields progress messages for SSE streaming.
     """
     from services.content_fetcher import fetch_content
@@ -272,7 +414,9 @@ async def run_full_analysis(
         yield f"Fetching {content_type} content..."
         await update_job_progress(job_id, f"Fetching {content_type}...")
 
-        content, title, source = await fetch_content(url, content_type)
+        content, title, source = await fetch_content(
+            url, content_type, progress=partial(update_job_progress, job_id), use_cache=not force
+        )
         yield f"Fetched: {title}"
         yield f"Content length: {len(content)} characters"
 
@@ -0,0 +1,226 @@
+"""
+Caption normalization for SRT/VTT transcripts.
+
+YouTube auto-captions are "rolling": each cue repeats the previous cue's
+last line before adding new words, and short flash cues repeat whole
+lines, so naively joining cue text sends the same speech to Claude two or
+three times. normalize_captions merges the cues back into running text by
+dropping the words each cue shares with what came before it - only where
+cues actually roll (a cue overlaps the previous one in time, or starts
+with the previous cue's last line), so speech that merely repeats a
+phrase is kept - and can keep a coarse [mm:ss] marker every few minutes
+for reference.
+
+Run as a script to measure the reduction on caption files:
+
+    python -m services.captions bench path/to/video.en.srt [...]
+"""
+
+import html
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from services.token_budget import estimate_tokens
+
+# Longest repeated run (in words) looked for at a cue boundary
+MAX_OVERLAP_WORDS = 40
+
+# Single-word overlaps are only treated as repeats for cues this short,
+# otherwise genuine repetitions ("very very") would be lost
+SHORT_CUE_WORDS = 2
+
+TIMESTAMP_RE = re.compile(
+    r"(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{3})\s*-->\s*(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{3})"
+)
+
+
+@dataclass
+class Cue:
+    """One caption cue: start/end in seconds and its text lines."""
+    start: float
+    end: float
+    lines: List[str]
+
+
+def _seconds(hours: Optional[str], minutes: str, seconds: str, millis: str) -> float:
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(millis) / 1000
+
+
+def _clean_line(line: str) -> str:
+    """Strip markup (<c>, <i>, inline <00:00:01.000> timings) and entities from a caption line."""
+    line = re.sub(r"<[^>]*>", "", line)
+    line = html.unescape(line)
+    return re.sub(r"\s+", " ", line).strip()
+
+
+def parse_cues(content: str) -> List[Cue]:
+    """
+    Parse SRT or WebVTT content into cues.
+
+    Sequence numbers, VTT headers, NOTE/STYLE blocks and cue settings are
+    ignored; blank text lines are dropped.
+    """
+    cues = []
+    current: Optional[Cue] = None
+
+    for raw in content.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        match = TIMESTAMP_RE.search(raw)
+        if match:
+            g = match.groups()
+            current = Cue(_seconds(*g[0:4]), _seconds(*g[4:8]), [])
+            cues.append(current)
+            continue
+
+        if not raw.strip():
+            current = None  # Blank line ends the cue
+            continue
+
+        if current is None:
+            continue  # Sequence number, WEBVTT header, NOTE/STYLE block
+
+        line = _clean_line(raw)
+        if line:
+            current.lines.append(line)
+
+    return [cue for cue in cues if cue.lines]
+
+
+def _norm(word: str) -> str:
+    """Comparison form of a word: lowercase, without surrounding punctuation."""
+    return re.sub(r"^\W+|\W+$", "", word.lower())
+
+
+def _overlap(previous: List[str], words: List[str]) -> int:
+    """Number of leading words in `words` that repeat the tail of `previous`."""
+    limit = min(len(previous), len(words), MAX_OVERLAP_WORDS)
+    for size in range(limit, 0, -1):
+        if size == 1 and len(words) > SHORT_CUE_WORDS:
+            break
+        if previous[-size:] == words[:size]:
+            return size
+    return 0
+
+
+def _rolls_over(previous: Optional[Cue], cue: Cue) -> bool:
+    """Whether cue repeats part of previous: they overlap in time, or cue starts with previous's last line."""
+    if previous is None:
+        return False
+    if previous.end > cue.start:
+        return True
+    return [_norm(w) for w in cue.lines[0].split()] == [_norm(w) for w in previous.lines[-1].split()]
+
+
+def _format_timestamp(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def normalize_captions(content: str, timestamp_interval: int = 0) -> str:
+    """
+    Convert SRT/VTT captions into de-duplicated running text.
+
+    Args:
+        content: Raw SRT or WebVTT text
+        timestamp_interval: If > 0, start a new paragraph with a [mm:ss]
+            marker at the first cue after every this many seconds
+
+    Returns:
+        Transcript text with rolling-caption repeats removed
+    """
+    cues = parse_cues(content)
+
+    paragraphs: List[List[str]] = [[]]
+    emitted: List[str] = []  # Normalized recent words, for overlap checks
+    next_marker = 0.0
+    previous: Optional[Cue] = None
+
+    for cue in cues:
+        words = " ".join(cue.lines).split()
+        normalized = [_norm(w) for w in words]
+
+        skip = _overlap(emitted, normalized) if _rolls_over(previous, cue) else 0
+        previous = cue
+        if skip == len(words):
+            continue  # Nothing new in this cue
+
+        if timestamp_interval > 0 and cue.start >= next_marker:
+            if paragraphs[-1]:
+                paragraphs.append([])
+            paragraphs[-1].append(f"[{_format_timestamp(cue.start)}]")
+            next_marker = (cue.start // timestamp_interval + 1) * timestamp_interval
+
+        paragraphs[-1].extend(words[skip:])
+        emitted.extend(normalized[skip:])
+        del emitted[:-MAX_OVERLAP_WORDS]
+
+    return "\n\n".join(" ".join(p) for p in paragraphs if p)
+
+
+def naive_join(content: str) -> str:
+    """Join every cue's text as-is (the old behaviour), for comparison."""
+    return " ".join(line for cue in parse_cues(content) for line in cue.lines)
+
+
+def _srt_time(seconds: float) -> str:
+    millis = round(seconds * 1000)
+    return f"{millis // 3600000:02d}:{millis // 60000 % 60:02d}:{millis // 1000 % 60:02d},{millis % 1000:03d}"
+
+
+def _sample_rolling_captions() -> str:
+    """Synthetic YouTube-style rolling captions, used when no files are given."""
+    sentences = [
+        "so today we're going to talk about how transformers actually work",
+        "and why attention turned out to be such a big deal for language models",
+        "the key idea is that every token can look at every other token",
+        "which means the model can learn long range dependencies directly",
+        "instead of squeezing everything through a recurrent hidden state",
+    ] * 6
+    words = " ".join(sentences).split()
+
+    lines = [" ".join(words[i:i + 7]) for i in range(0, len(words), 7)]
+    blocks = []
+    t = 0.0
+    for i, line in enumerate(lines):
+        previous = lines[i - 1] if i else ""
+        # Rolling cue (previous line + new line), then a 10ms flash cue of the new line
+        for text, duration in (((previous + "\n" + line).strip(), 2.0), (line, 0.01)):
+            start, end = t, t + duration
+            blocks.append(f"{len(blocks) + 1}\n{_srt_time(start)} --> {_srt_time(end)}\n{text}\n")
+            t = end
+    return "\n".join(blocks)
+
+
+def benchmark(paths: List[Path]) -> List[dict]:
+    """Compare naive and normalized transcripts for each caption file."""
+    samples = [(p.name, p.read_text(encoding="utf-8", errors="replace")) for p in paths]
+    if not samples:
+        samples = [("synthetic rolling captions", _sample_rolling_captions())]
+
+    results = []
+    for name, content in samples:
+        before = estimate_tokens(naive_join(content))
+        after = estimate_tokens(normalize_captions(content))
+        results.append({
+            "name": name,
+            "tokens_before": before,
+            "tokens_after": after,
+            "reduction": 1 - after / before if before else 0.0,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "bench":
+        print("Usage: python -m services.captions bench [caption files...]")
+        sys.exit(1)
+
+    for row in benchmark([Path(p) for p in sys.argv[2:]]):
+        print(
+            f"{row['name']}: {row['tokens_before']} -> {row['tokens_after']} tokens "
+            f"({row['reduction']:.0%} smaller)"
+        )
@@ -7,13 +7,17 @@ Uses AI to identify similarities, differences, and unique insights.
 import logging
 from typing import Optional
 
-from anthropic import Anthropic
-
-from config import ANTHROPIC_API_KEY, MODELS
+from config import MODELS
 from database import get_report_by_id
+from services.llm import complete, estimate_cost
+from services.model_router import route_model
+from services.token_budget import fit_to_budget, model_info_for_id
 
 logger = logging.getLogger(__name__)
 
+# Token budget for both reports' content, shared between them
+COMPARISON_CONTENT_TOKENS = 6000
+
 COMPARISON_PROMPT = """You are an expert at comparative analysis. Compare the following two pieces of content and provide a comprehensive analysis.
 
 ## Content A: {title_a}
@@ -58,24 +62,10 @@ A brief conclusion about which piece might be more valuable for different purpos
 Keep the analysis focused and actionable. Use bullet points for clarity."""
 
 
-def get_client() -> Anthropic:
-    """Get Anthropic client."""
-    if not ANTHROPIC_API_KEY:
-        raise ValueError("ANTHROPIC_API_KEY not set")
-    return Anthropic(api_key=ANTHROPIC_API_KEY)
-
-
-def truncate_content(content: str, max_chars: int = 12000) -> str:
-    """Truncate content to fit within limits."""
-    if len(content) > max_chars:
-        return content[:max_chars] + "\n\n[Content truncated...]"
-    return content
-
-
 async def compare_reports(
     report_id_a: int,
     report_id_b: int,
-    model_key: str = "sonnet",
+    model_key: Optional[str] = None,
 ) -> dict:
     """
     Compare two reports and generate analysis.
@@ -83,7 +73,7 @@ async def compare_reports(
     Args:
         report_id_a: First report ID
         report_id_b: Second report ID
-        model_key: Which model to use
+        model_key: Which model to use (None: the comparison task's default)
 
     Returns:
         Dict with comparison results
@@ -104,9 +94,8 @@ async def compare_reports(
         if not content_a or not content_b:
             return {"error": "One or both reports have no content"}
 
-        # Truncate if needed
-        content_a = truncate_content(content_a)
-        content_b = truncate_content(content_b)
+        # Truncate if needed (a short report leaves more room for the other)
+        content_a, content_b = fit_to_budget([content_a, content_b], COMPARISON_CONTENT_TOKENS)
 
         # Build prompt
         prompt = COMPARISON_PROMPT.format(
@@ -117,22 +106,19 @@ async def compare_reports(
         )
 
         # Call Claude
-        client = get_client()
-        model_info = MODELS.get(model_key, MODELS["sonnet"])
+        model_info = MODELS[route_model("comparison", requested=model_key)]
 
-        response = client.messages.create(
-            model=model_info["id"],
-            max_tokens=4096,
-            messages=[{"role": "user", "content": prompt}]
+        result = await complete(
+            model_info["id"], prompt, max_tokens=4096,
+            service="comparison", report_id=report_id_a,
         )
+        model_info = model_info_for_id(result.model) or model_info  # May be downgraded by cost limit
 
-        comparison = response.content[0].text
-        tokens_used = response.usage.input_tokens + response.usage.output_tokens
+        comparison = result.text
+        tokens_used = result.usage["input_tokens"] + result.usage["output_tokens"]
 
         # Calculate cost
-        input_cost = (response.usage.input_tokens / 1_000_000) * model_info["input_cost"]
-        output_cost = (response.usage.output_tokens / 1_000_000) * model_info["output_cost"]
-        total_cost = input_cost + output_cost
+        total_cost = estimate_cost(result.usage, model_info)
 
         return {
             "comparison": comparison,
@@ -3,19 +3,37 @@ Concept extraction service for Knowledge Graph.
 
 Extracts key concepts, entities, and relationships from report content
 using Claude AI to build a connected knowledge graph.
+
+Library-wide extraction runs as a "concepts" job: it picks only reports
+without concepts or whose file changed since extraction, works through them
+CONCEPT_EXTRACTION_CONCURRENCY at a time, and checkpoints its progress in
+the job table so a job interrupted by a restart carries on where it stopped.
 """
 
+import asyncio
 import json
 import logging
+import os
 import re
+import time
 from typing import Optional
 
-from anthropic import Anthropic
-
-from config import ANTHROPIC_API_KEY, MODELS
+from config import MODELS
+from services.llm import complete
+from services.model_router import route_model
+from services.token_budget import truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
+# Content budget for an extraction request
+EXTRACTION_CONTENT_TOKENS = 4000
+
+# Reports extracted at once by a library-wide job
+CONCEPT_EXTRACTION_CONCURRENCY = int(os.getenv("CONCEPT_EXTRACTION_CONCURRENCY", "4"))
+
+# Progress is checkpointed after this many reports (and when the job ends)
+CHECKPOINT_EVERY = 5
+
 EXTRACTION_PROMPT = """Analyze the following content and extract key concepts for a knowledge graph.
 
 Return a JSON object with this structure:
@@ -42,17 +60,7 @@ Guidelines:
 - Include people, organizations, technologies, and abstract concepts
 - Create relationships that show how concepts connect
 - Use consistent naming (e.g., "Machine Learning" not "ML" or "machine learning")
-- Descriptions should be factual and brief
-
-Content to analyze:
-"""
-
-
-def get_client() -> Anthropic:
-    """Get Anthropic client."""
-    if not ANTHROPIC_API_KEY:
-        raise ValueError("ANTHROPIC_API_KEY not set")
-    return Anthropic(api_key=ANTHROPIC_API_KEY)
+- Descriptions should be factual and brief"""
 
 
 def clean_json_response(text: str) -> str:
@@ -70,66 +78,92 @@ def clean_json_response(text: str) -> str:
     return text
 
 
-async def extract_concepts(content: str, title: str = "") -> dict:
-    """
-    Extract concepts and relationships from content.
+def build_extraction_prompt(content: str, title: str = "") -> str:
+    """User message for concept extraction (the instructions go in the system block)."""
+    content = truncate_to_tokens(content, EXTRACTION_CONTENT_TOKENS)
 
-    Args:
-        content: The text content to analyze
-        title: Optional title for context
-
-    Returns:
-        Dict with 'concepts' and 'relationships' lists
-    """
-    try:
-        client = get_client()
+    prompt = "Content to analyze:\n"
+    if title:
+        prompt += f"\nTitle: {title}\n\n"
+    return prompt + content
 
-        # Use Haiku for cost-efficiency on extraction
-        model_info = MODELS["haiku"]
 
-        # Truncate content if too long (keep first 15000 chars)
-        if len(content) > 15000:
-            content = content[:15000] + "\n\n[Content truncated...]"
+def parse_extraction(response_text: str) -> dict:
+    """
+    Parse and validate an extraction response.
 
-        prompt = EXTRACTION_PROMPT
-        if title:
-            prompt += f"\nTitle: {title}\n\n"
-        prompt += content
+    Raises json.JSONDecodeError if the response has no valid JSON.
+    """
+    result = json.loads(clean_json_response(response_text))
+
+    # Validate structure
+    if "concepts" not in result:
+        result["concepts"] = []
+    if "relationships" not in result:
+        result["relationships"] = []
+
+    # Ensure all concepts have required fields
+    for concept in result["concepts"]:
+        if "name" not in concept:
+            continue
+        if "type" not in concept:
+            concept["type"] = "concept"
+        if "description" not in concept:
+            concept["description"] = ""
+
+    # Filter out invalid concepts
+    result["concepts"] = [
+        c for c in result["concepts"]
+        if c.get("name") and len(c["name"]) > 0
+    ]
+    return result
+
+
+async def request_extraction(
+    content: str,
+    title: str = "",
+    report_id: Optional[int] = None,
+    job_id: Optional[str] = None,
+) -> dict:
+    """
+    Ask Claude for a report's concepts and relationships.
 
-        response = client.messages.create(
-            model=model_info["id"],
-            max_tokens=2048,
-            messages=[{"role": "user", "content": prompt}]
-        )
+    Raises on API errors and unparseable responses; see extract_concepts.
+    """
+    # Haiku by default for cost-efficiency on extraction
+    model_info = MODELS[route_model("concepts")]
+
+    # Instructions are the cached system block; only the content varies
+    result = await complete(
+        model_info["id"],
+        build_extraction_prompt(content, title),
+        system=EXTRACTION_PROMPT,
+        max_tokens=2048,
+        service="concepts",
+        report_id=report_id,
+        job_id=job_id,
+    )
 
-        response_text = response.content[0].text
-        json_str = clean_json_response(response_text)
+    result = parse_extraction(result.text)
 
-        result = json.loads(json_str)
+    logger.info(f"Extracted {len(result['concepts'])} concepts and {len(result['relationships'])} relationships")
+    return result
 
-        # Validate structure
-        if "concepts" not in result:
-            result["concepts"] = []
-        if "relationships" not in result:
-            result["relationships"] = []
 
-        # Ensure all concepts have required fields
-        for concept in result["concepts"]:
-            if "name" not in concept:
-                continue
-            if "type" not in concept:
-                concept["type"] = "concept"
-            if "description" not in concept:
-                concept["description"] = ""
+async def extract_concepts(content: str, title: str = "", report_id: Optional[int] = None) -> dict:
+    """
+    Extract concepts and relationships from content.
 
-        # Filter out invalid concepts
-        result["concepts"] = [
-            c for c in result["concepts"]
-            if c.get("name") and len(c["name"]) > 0
-        ]
+    Args:
+        content: The text content to analyze
+        title: Optional title for context
+        report_id: Report the content comes from, for the usage ledger
 
-        logger.info(f"Extracted {len(result['concepts'])} concepts and {len(result['relationships'])} relationships")
-        return result
+    Returns:
+        Dict with 'concepts' and 'relationships' lists (empty if extraction failed)
+    """
+    try:
+        return await request_extraction(content, title, report_id)
 
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse concept extraction response: {e}")
@@ -155,59 +189,176 @@ async def extract_and_store_concepts(
     Returns:
         Dict with extraction results and stats
     """
-    from database import (
-        upsert_concept,
-        link_concept_to_report,
-        create_concept_relationship,
-    )
+    extraction = await extract_concepts(content, title, report_id=report_id)
+    return await store_extraction(report_id, extraction, title)
 
-    # Extract concepts
-    extraction = await extract_concepts(content, title)
-
-    concepts_created = 0
-    relationships_created = 0
-    concept_id_map = {}  # Map concept names to IDs
-
-    # Store concepts
-    for concept in extraction["concepts"]:
-        try:
-            concept_id = await upsert_concept(
-                name=concept["name"],
-                concept_type=concept.get("type", "concept"),
-                description=concept.get("description")
-            )
-            concept_id_map[concept["name"]] = concept_id
-
-            # Link to report
-            await link_concept_to_report(
-                report_id=report_id,
-                concept_id=concept_id,
-                relevance=1.0,
-                context=title
-            )
-            concepts_created += 1
-        except Exception as e:
-            logger.error(f"Failed to store concept '{concept.get('name')}': {e}")
-
-    # Store relationships
-    for rel in extraction["relationships"]:
-        try:
-            source_id = concept_id_map.get(rel["source"])
-            target_id = concept_id_map.get(rel["target"])
-
-            if source_id and target_id:
-                await create_concept_relationship(
-                    source_id=source_id,
-                    target_id=target_id,
-                    rel_type=rel.get("type", "related_to"),
-                    strength=1.0
-                )
-                relationships_created += 1
-        except Exception as e:
-            logger.error(f"Failed to store relationship: {e}")
+
+async def store_extraction(report_id: int, extraction: dict, title: str = "") -> dict:
+    """
+    Store extracted concepts and relationships and link them to a report.
+
+    A non-empty extraction replaces the report's earlier concept links and
+    marks its current content as extracted; it's written in one transaction.
+
+    Returns:
+        Dict with extraction results and stats
+    """
+    from database import ingest_concept_graph
+
+    stored = await ingest_concept_graph(
+        report_id,
+        extraction["concepts"],
+        extraction["relationships"],
+        context=title,
+    )
 
     return {
         "concepts_extracted": len(extraction["concepts"]),
-        "concepts_stored": concepts_created,
-        "relationships_stored": relationships_created
+        **stored,
     }
+
+
+def _format_duration(seconds: float) -> str:
+    """Format seconds as e.g. "45s", "12m 05s" or "2h 03m"."""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+async def run_extraction_job(job_id: str, limit: Optional[int] = None):
+    """
+    Extract concepts from every report that needs it, as job job_id.
+
+    The job's checkpoint holds the totals so far and the reports that failed
+    (skipped if the job is resumed); reports done are recognised by their
+    extraction mark, so resuming just selects what's left.
+
+    Args:
+        job_id: An existing "concepts" job (new, or unfinished to resume it)
+        limit: Max reports for the job to process (None for all)
+    """
+    from database import (
+        get_job,
+        get_report_by_id,
+        get_reports_needing_concepts,
+        update_job_checkpoint,
+        update_job_progress,
+        update_job_status,
+    )
+
+    job = await get_job(job_id)
+    if not job:
+        return
+    checkpoint = json.loads(job.get("checkpoint") or "{}")
+    done = checkpoint.get("done", 0)
+    failed = checkpoint.get("failed", [])
+    concepts = checkpoint.get("concepts", 0)
+    limit = checkpoint.get("limit", limit)
+
+    remaining = None if limit is None else max(0, limit - done - len(failed))
+    reports = await get_reports_needing_concepts(remaining, exclude=failed) if remaining != 0 else []
+    total = done + len(failed) + len(reports)
+
+    def save(message: Optional[str] = None):
+        state = {"limit": limit, "total": total, "done": done, "failed": failed, "concepts": concepts}
+        return update_job_checkpoint(job_id, state, message)
+
+    await update_job_status(job_id, "running")
+    await save(f"Extracting concepts from {len(reports)} reports"
+               + (f" ({done + len(failed)} done before resuming)" if done or failed else ""))
+
+    semaphore = asyncio.Semaphore(CONCEPT_EXTRACTION_CONCURRENCY)
+    started = time.monotonic()
+    processed = 0  # This run, for the rate
+
+    async def extract(report_id: int) -> int:
+        report = await get_report_by_id(report_id)
+        if not report or not report.get("content"):
+            raise ValueError("Report has no content")
+        extraction = await request_extraction(report["content"], report.get("title", ""), report_id, job_id)
+        result = await store_extraction(report_id, extraction, report.get("title", ""))
+        if not result["concepts_stored"]:
+            raise ValueError("No concepts extracted")
+        return result["concepts_stored"]
+
+    async def run(report_id: int):
+        nonlocal done, concepts, processed
+        async with semaphore:
+            try:
+                stored = await extract(report_id)
+                concepts += stored
+                done += 1
+            except Exception as e:
+                logger.warning(f"Concept extraction failed for report {report_id}: {e}")
+                failed.append(report_id)
+
+        # Counted as soon as the report is stored, so a checkpoint never misses one
+        processed += 1
+        rate = processed / max(time.monotonic() - started, 1e-6) * 60
+        left = len(reports) - processed
+        message = (
+            f"Extracted {done + len(failed)}/{total} reports"
+            + (f" ({len(failed)} failed)" if failed else "")
+            + f" - {rate:.1f} reports/min, ETA {_format_duration(left / rate * 60)}"
+        )
+        if processed % CHECKPOINT_EVERY == 0 or left == 0:
+            await save(message)
+        else:
+            await update_job_progress(job_id, message)
+
+    tasks = [asyncio.ensure_future(run(r["id"])) for r in reports]
+    try:
+        await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        # Shutting down: keep the job running so it resumes on the next start
+        for task in tasks:
+            task.cancel()
+        await asyncio.shield(save())
+        raise
+    except Exception as e:
+        logger.exception(f"Concept extraction job {job_id} failed")
+        for task in tasks:
+            task.cancel()
+        await save()
+        await update_job_status(job_id, "failed", error_message=str(e))
+        return
+
+    await save(
+        f"Extracted {concepts} concepts from {done} reports"
+        + (f"; {len(failed)} failed" if failed else "")
+    )
+    await update_job_status(job_id, "completed")
+    logger.info(f"Concept extraction job {job_id}: {done} reports, {len(failed)} failed")
+
+
+# Running extraction jobs, kept referenced until they finish
+_jobs: set = set()
+
+
+def start_extraction_job(job_id: str, limit: Optional[int] = None) -> asyncio.Task:
+    """Run an extraction job in the background."""
+    task = asyncio.create_task(run_extraction_job(job_id, limit))
+    _jobs.add(task)
+    task.add_done_callback(_jobs.discard)
+    return task
+
+
+async def resume_extraction_jobs():
+    """Restart extraction jobs that were interrupted (called at startup)."""
+    from database import get_unfinished_jobs
+
+    for job in await get_unfinished_jobs("concepts"):
+        logger.info(f"Resuming concept extraction job {job['id']}")
+        start_extraction_job(job["id"])
+
+
+async def stop_extraction_jobs():
+    """Cancel running jobs; their checkpoints let them resume on the next start."""
+    for task in list(_jobs):
+        task.cancel()
+    await asyncio.gather(*_jobs, return_exceptions=True)
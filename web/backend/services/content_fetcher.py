@@ -1,23 +1,291 @@
 """Content fetching service for YouTube, articles, and arXiv papers."""
 
 import asyncio
+import codecs
+import gzip
+import hashlib
+import json
 import subprocess
 import re
 import logging
 import os
+import shutil
+import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 import httpx
 
-from config import INBOX_DIR, PROJECT_ROOT
+from config import FETCH_CACHE_DIR, FETCH_CACHE_MAX_BYTES
+from services.captions import normalize_captions
+from services.html_extractor import ArticleExtractor, extract_article
 
 logger = logging.getLogger(__name__)
 
 # Check if audio transcription fallback is enabled
 ENABLE_AUDIO_FALLBACK = os.getenv("ENABLE_AUDIO_FALLBACK", "true").lower() == "true"
 
+# Seconds between [mm:ss] markers kept in caption transcripts (0 = no timestamps)
+TRANSCRIPT_TIMESTAMP_INTERVAL = int(os.getenv("TRANSCRIPT_TIMESTAMP_INTERVAL", "0"))
+
+# Articles are streamed in chunks and cut off past this size
+ARTICLE_MAX_BYTES = int(os.getenv("ARTICLE_MAX_BYTES", str(5 * 1024 * 1024)))
+ARTICLE_CHUNK_BYTES = 64 * 1024
+
+# Seconds before cached pages are refetched (None = kept until evicted).
+# Videos and podcast episodes don't change; articles get edited and arXiv
+# abstracts point at the latest version.
+FETCH_CACHE_MAX_AGE = {
+    "article": float(os.getenv("FETCH_CACHE_ARTICLE_MAX_AGE_HOURS", "24")) * 3600,
+    "arxiv": float(os.getenv("FETCH_CACHE_ARXIV_MAX_AGE_HOURS", "168")) * 3600,
+}
+
+# <meta charset> declarations are looked for in the first bytes of a page
+META_CHARSET_RE = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""",
+    re.IGNORECASE,
+)
+META_CHARSET_BYTES = 1024
+
+# Query parameters that never change what a URL points to
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref_src", "igshid"}
+
+# Parameters that are only tracking on some sites (elsewhere, e.g. GitHub's
+# ?ref=<branch>, they select content). Hosts match their subdomains too.
+HOST_TRACKING_PARAMS = {
+    "youtube.com": {"si", "feature"},
+    "youtu.be": {"si"},
+    "spotify.com": {"si"},
+    "medium.com": {"source"},
+    "substack.com": {"r", "ref"},
+    "producthunt.com": {"ref"},
+    "news.ycombinator.com": {"ref"},
+}
+
+# Link shorteners that are resolved before canonicalizing
+SHORT_LINK_HOSTS = {
+    "bit.ly", "buff.ly", "dlvr.it", "goo.gl", "is.gd", "lnkd.in", "ow.ly",
+    "t.co", "tinyurl.com", "trib.al", "rebrand.ly", "shorturl.at", "cutt.ly",
+}
+
+
+def extract_youtube_id(url: str) -> Optional[str]:
+    """Extract the 11-character video id from a YouTube URL."""
+    match = re.search(
+        r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|embed/|shorts/|live/|v/)|youtu\.be/)([A-Za-z0-9_-]{11})",
+        url,
+    )
+    return match.group(1) if match else None
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL for comparison.
+
+    Lowercases scheme and host, drops "www.", default ports, fragments,
+    trailing slashes and tracking parameters (utm_* and friends), and
+    sorts the remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and not (scheme == "http" and parts.port == 80) and not (scheme == "https" and parts.port == 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/") or ""
+    tracking = TRACKING_PARAMS.union(*(
+        params for site, params in HOST_TRACKING_PARAMS.items()
+        if host == site or host.endswith("." + site)
+    ))
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in tracking
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def canonical_source_id(url: str) -> str:
+    """
+    Canonical identifier for a source: 'youtube:<id>', 'arxiv:<id>' or 'url:<normalized url>'.
+
+    Different URLs for the same video or paper map to the same id. Other
+    URLs are normalized with normalize_url, with http treated as https.
+    Short links are not followed here; see resolve_canonical_url.
+    """
+    video_id = extract_youtube_id(url)
+    if video_id:
+        return f"youtube:{video_id}"
+
+    arxiv_id = extract_arxiv_id(url)
+    if arxiv_id:
+        return f"arxiv:{arxiv_id}"
+
+    normalized = normalize_url(url)
+    if normalized.startswith("http://"):
+        normalized = "https://" + normalized[len("http://"):]
+    return f"url:{normalized}"
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical URL used to recognize sources that were already analyzed.
+
+    The URL form of canonical_source_id: YouTube links become
+    https://www.youtube.com/watch?v=<id>, arXiv links
+    https://arxiv.org/abs/<id>, and anything else its normalized URL.
+    """
+    kind, value = canonical_source_id(url).split(":", 1)
+    if kind == "youtube":
+        return f"https://www.youtube.com/watch?v={value}"
+    if kind == "arxiv":
+        return f"https://arxiv.org/abs/{value}"
+    return value
+
+
+async def resolve_short_url(url: str) -> str:
+    """
+    Follow redirects for known link shorteners (bit.ly, t.co, ...).
+
+    Returns the final URL, or the input unchanged if it isn't a short link
+    or can't be resolved.
+    """
+    host = (urlsplit(url.strip()).hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host not in SHORT_LINK_HOSTS:
+        return url
+
+    try:
+        async with httpx.AsyncClient(follow_redirects=True, timeout=10.0) as client:
+            response = await client.head(url, headers={"User-Agent": "Mozilla/5.0"})
+            if response.status_code >= 400:
+                # Some shorteners reject HEAD
+                async with client.stream("GET", url, headers={"User-Agent": "Mozilla/5.0"}) as response:
+                    pass
+            return str(response.url)
+    except httpx.HTTPError as e:
+        logger.warning(f"Could not resolve short link {url}: {e}")
+        return url
+
+
+async def resolve_canonical_url(url: str) -> str:
+    """Canonical URL after following short links."""
+    return canonicalize_url(await resolve_short_url(url))
+
+
+class FetchCache:
+    """
+    On-disk cache of fetched text, one gzip'd JSON file per key.
+
+    Entries hold the extracted text plus metadata (title, source, when it
+    was fetched). Hits refresh the file's mtime, and once the cache grows
+    past max_bytes the least recently used entries are evicted. The total
+    size is scanned once and then tracked as entries are written.
+    """
 
-def _run_ytdlp_sync(url: str) -> Tuple[int, str, str]:
+    def __init__(self, cache_dir: Path = FETCH_CACHE_DIR, max_bytes: int = FETCH_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._total: Optional[int] = None  # Bytes on disk, once scanned
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.json.gz"
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Cached entry for key, or None if there isn't one or it's older than max_age seconds."""
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable fetch cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        if entry.get("key") != key:
+            return None
+        if max_age is not None and time.time() - entry.get("fetched_at", 0) > max_age:
+            return None
+        os.utime(path)  # Mark as recently used
+        return entry
+
+    def put(self, key: str, text: str, **metadata):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"key": key, "text": text, "fetched_at": time.time(), **metadata}
+
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        size = tmp_path.stat().st_size
+
+        with self._lock:
+            replaced = path.stat().st_size if path.exists() else 0
+            tmp_path.replace(path)
+            if self._total is None:
+                self._total = self._scan_size()
+            else:
+                self._total += size - replaced
+            if self._total > self.max_bytes:
+                self._total = self._evict()
+
+    def delete(self, key: str):
+        path = self._path(key)
+        with self._lock:
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                return
+            path.unlink(missing_ok=True)
+            if self._total is not None:
+                self._total -= size
+
+    def _scan_size(self) -> int:
+        total = 0
+        for path in self.cache_dir.glob("*/*.json.gz"):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                continue
+        return total
+
+    def _evict(self) -> int:
+        """Remove least recently used entries until the cache is under 90% of max_bytes. Returns the new size."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.json.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return total
+
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        logger.info(f"Fetch cache evicted down to {total / 1024 / 1024:.1f}MB")
+        return total
+
+
+fetch_cache = FetchCache()
+
+
+def _run_ytdlp_sync(url: str, workdir: Path) -> Tuple[int, str, str]:
     """Run yt-dlp synchronously (for use with asyncio.to_thread on Windows)."""
     result = subprocess.run(
         [
@@ -27,20 +295,42 @@ def _run_ytdlp_sync(url: str) -> Tuple[int, str, str]:
             "--sub-lang", "en",
             "--skip-download",
             "--convert-subs", "srt",
-            "-o", str(INBOX_DIR / "%(title)s"),
+            "--no-playlist",
+            "-o", str(workdir / "%(title)s"),
             url,
         ],
-        cwd=str(PROJECT_ROOT),
+        cwd=str(workdir),
         capture_output=True,
         text=True,
     )
     return result.returncode, result.stdout, result.stderr
 
 
-async def fetch_youtube_transcript(url: str) -> Tuple[str, str, str]:
+def find_subtitle_file(workdir: Path) -> Optional[Path]:
+    """
+    Locate the subtitle yt-dlp wrote into a per-fetch workspace.
+
+    Prefers the English track; the workspace only ever holds one video's
+    output, so the choice doesn't depend on timestamps or other jobs.
+    """
+    for pattern in ("*.en.srt", "*.en-*.srt", "*.srt"):
+        matches = sorted(workdir.glob(pattern))
+        if matches:
+            return matches[0]
+    return None
+
+
+async def fetch_youtube_transcript(
+    url: str,
+    progress: Optional[Callable[[str], Awaitable[None]]] = None,
+    use_cache: bool = True,
+) -> Tuple[str, str, str]:
     """
     Fetch YouTube transcript using yt-dlp.
 
+    progress receives transcription messages if the audio fallback is used,
+    and use_cache=False makes that fallback re-transcribe.
+
     Returns:
         Tuple of (transcript_text, video_title, source_url)
 
@@ -49,11 +339,26 @@ async def fetch_youtube_transcript(url: str) -> Tuple[str, str, str]:
     """
     logger.info(f"Fetching YouTube transcript: {url}")
 
-    # Ensure inbox directory exists
-    INBOX_DIR.mkdir(parents=True, exist_ok=True)
+    # Each fetch gets its own workspace so concurrent jobs never see each
+    # other's subtitles and nothing accumulates in the inbox
+    workdir = Path(tempfile.mkdtemp(prefix="yt-subs-"))
+    try:
+        # Run yt-dlp in thread pool (Windows doesn't support asyncio subprocesses well)
+        returncode, stdout, stderr = await asyncio.to_thread(_run_ytdlp_sync, url, workdir)
+
+        if returncode == 0:
+            srt_file = find_subtitle_file(workdir)
+            if not srt_file:
+                raise Exception("No transcript file found after download")
 
-    # Run yt-dlp in thread pool (Windows doesn't support asyncio subprocesses well)
-    returncode, stdout, stderr = await asyncio.to_thread(_run_ytdlp_sync, url)
+            # Extract title from filename
+            title = srt_file.name[: -len(".srt")]
+            title = re.sub(r"\.en(-[\w-]+)?$", "", title)
+
+            # Read and parse SRT content
+            transcript_text = await asyncio.to_thread(parse_srt_file, srt_file)
+    finally:
+        await asyncio.to_thread(shutil.rmtree, workdir, ignore_errors=True)
 
     if returncode != 0:
         if "yt-dlp" in stderr.lower() or "not found" in stderr.lower():
@@ -62,85 +367,81 @@ async def fetch_youtube_transcript(url: str) -> Tuple[str, str, str]:
             # Try audio transcription fallback
             if ENABLE_AUDIO_FALLBACK:
                 logger.info("No captions available, attempting audio transcription fallback...")
-                return await fetch_youtube_via_audio(url)
+                return await fetch_youtube_via_audio(url, progress, use_cache)
             raise Exception("No English captions available for this video")
         else:
             raise Exception(f"Failed to fetch transcript: {stderr[:200]}")
 
-    # Find the downloaded SRT file
-    srt_files = list(INBOX_DIR.glob("*.en.srt"))
-    if not srt_files:
-        # Try without language suffix
-        srt_files = list(INBOX_DIR.glob("*.srt"))
-
-    if not srt_files:
-        raise Exception("No transcript file found after download")
-
-    # Get the most recently modified file
-    srt_file = max(srt_files, key=lambda f: f.stat().st_mtime)
+    logger.info(f"Fetched transcript: {title} ({len(transcript_text)} chars)")
 
-    # Extract title from filename
-    title = srt_file.stem
-    if title.endswith(".en"):
-        title = title[:-3]
+    return transcript_text, title, url
 
-    # Read and parse SRT content
-    transcript_text = parse_srt_file(srt_file)
 
-    logger.info(f"Fetched transcript: {title} ({len(transcript_text)} chars)")
+def _page_encoding(response: httpx.Response, head: bytes) -> str:
+    """
+    Encoding to decode a page with.
 
-    return transcript_text, title, url
+    The Content-Type charset if it's one Python knows, else a <meta charset>
+    in the first bytes of the page, else response.encoding (httpx's utf-8
+    default).
+    """
+    if response.charset_encoding:
+        try:
+            return codecs.lookup(response.charset_encoding).name
+        except LookupError:
+            logger.warning(f"Unknown charset {response.charset_encoding!r} in Content-Type")
+    match = META_CHARSET_RE.search(head[:META_CHARSET_BYTES])
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return response.encoding or "utf-8"
 
 
 def parse_srt_file(srt_path: Path) -> str:
-    """Parse SRT file and extract plain text."""
+    """Parse an SRT/VTT file into plain text, merging rolling YouTube captions."""
     content = srt_path.read_text(encoding="utf-8", errors="replace")
-
-    # Remove SRT formatting:
-    # 1. Remove sequence numbers (lines with just digits)
-    # 2. Remove timestamps (00:00:00,000 --> 00:00:00,000)
-    # 3. Keep text lines
-
-    lines = []
-    for line in content.split("\n"):
-        line = line.strip()
-        # Skip empty lines
-        if not line:
-            continue
-        # Skip sequence numbers
-        if line.isdigit():
-            continue
-        # Skip timestamps
-        if re.match(r"\d{2}:\d{2}:\d{2},\d{3}\s*-->\s*\d{2}:\d{2}:\d{2},\d{3}", line):
-            continue
-        # Remove HTML-like tags
-        line = re.sub(r"<[^>]+>", "", line)
-        lines.append(line)
-
-    return " ".join(lines)
+    return normalize_captions(content, TRANSCRIPT_TIMESTAMP_INTERVAL)
 
 
 async def fetch_article(url: str) -> Tuple[str, str, str]:
     """
     Fetch article content from a URL.
 
+    The body is streamed (up to ARTICLE_MAX_BYTES) into an incremental
+    parser running in a worker thread, so large pages neither sit in
+    memory whole nor block the event loop.
+
     Returns:
         Tuple of (article_text, title, source_url)
     """
     logger.info(f"Fetching article: {url}")
 
+    extractor = ArticleExtractor()
+    received = 0
+
     async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-        response = await client.get(url, headers={
+        async with client.stream("GET", url, headers={
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        })
-        response.raise_for_status()
-        html = response.text
-
-    # Extract title from HTML
-    title = extract_title(html)
-
-    # Extract main content (simple extraction)
-    content = extract_article_content(html)
+        }) as response:
+            response.raise_for_status()
+            decoder = None
+
+            async for chunk in response.aiter_bytes(ARTICLE_CHUNK_BYTES):
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder(_page_encoding(response, chunk))(errors="replace")
+                received += len(chunk)
+                if received > ARTICLE_MAX_BYTES:
+                    chunk = chunk[: len(chunk) - (received - ARTICLE_MAX_BYTES)]
+                    logger.warning(f"Article exceeds {ARTICLE_MAX_BYTES} bytes, truncating: {url}")
+                await asyncio.to_thread(extractor.feed, decoder.decode(chunk))
+                if received > ARTICLE_MAX_BYTES:
+                    break
+
+    if decoder is not None:
+        await asyncio.to_thread(extractor.feed, decoder.decode(b"", final=True))
+    title, content = await asyncio.to_thread(extractor.result)
 
     if not content or len(content) < 100:
         raise Exception("Could not extract article content. The page may require JavaScript.")
@@ -152,58 +453,12 @@ async def fetch_article(url: str) -> Tuple[str, str, str]:
 
 def extract_title(html: str) -> str:
     """Extract title from HTML."""
-    # Try <title> tag
-    match = re.search(r"<title[^>]*>([^<]+)</title>", html, re.IGNORECASE)
-    if match:
-        title = match.group(1).strip()
-        # Clean up common suffixes
-        for suffix in [" | ", " - ", " :: ", " // "]:
-            if suffix in title:
-                title = title.split(suffix)[0]
-        return title
-
-    # Try <h1> tag
-    match = re.search(r"<h1[^>]*>([^<]+)</h1>", html, re.IGNORECASE)
-    if match:
-        return match.group(1).strip()
-
-    return "Untitled Article"
+    return extract_article(html)[0]
 
 
 def extract_article_content(html: str) -> str:
-    """Extract main article content from HTML (simple heuristic)."""
-    # Remove script and style tags
-    html = re.sub(r"<script[^>]*>.*?</script>", "", html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r"<style[^>]*>.*?</style>", "", html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r"<nav[^>]*>.*?</nav>", "", html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r"<header[^>]*>.*?</header>", "", html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r"<footer[^>]*>.*?</footer>", "", html, flags=re.DOTALL | re.IGNORECASE)
-
-    # Try to find article or main content
-    article_match = re.search(r"<article[^>]*>(.*?)</article>", html, flags=re.DOTALL | re.IGNORECASE)
-    if article_match:
-        html = article_match.group(1)
-    else:
-        main_match = re.search(r"<main[^>]*>(.*?)</main>", html, flags=re.DOTALL | re.IGNORECASE)
-        if main_match:
-            html = main_match.group(1)
-
-    # Remove all HTML tags
-    text = re.sub(r"<[^>]+>", " ", html)
-
-    # Clean up whitespace
-    text = re.sub(r"\s+", " ", text)
-    text = text.strip()
-
-    # Decode HTML entities
-    text = text.replace("&nbsp;", " ")
-    text = text.replace("&amp;", "&")
-    text = text.replace("&lt;", "<")
-    text = text.replace("&gt;", ">")
-    text = text.replace("&quot;", '"')
-    text = text.replace("&#39;", "'")
-
-    return text
+    """Extract main article content from HTML."""
+    return extract_article(html)[1]
 
 
 async def fetch_arxiv(url: str) -> Tuple[str, str, str]:
@@ -287,11 +542,16 @@ def extract_xml_authors(xml: str) -> str:
     return ", ".join(authors) if authors else "Unknown"
 
 
-async def fetch_youtube_via_audio(url: str) -> Tuple[str, str, str]:
+async def fetch_youtube_via_audio(
+    url: str,
+    progress: Optional[Callable[[str], Awaitable[None]]] = None,
+    use_cache: bool = True,
+) -> Tuple[str, str, str]:
     """
     Fetch YouTube transcript by downloading audio and transcribing with Whisper.
 
-    This is a fallback for videos without captions.
+    This is a fallback for videos without captions. use_cache=False
+    re-transcribes instead of using the cached transcript.
 
     Returns:
         Tuple of (transcript_text, video_title, source_url)
@@ -304,6 +564,8 @@ async def fetch_youtube_via_audio(url: str) -> Tuple[str, str, str]:
             url=url,
             use_api=True,  # Prefer API for speed
             keep_audio=False,
+            progress=progress,
+            use_cache=use_cache,
         )
 
         logger.info(f"Audio transcription complete: {title} ({len(transcript)} chars)")
@@ -313,12 +575,18 @@ async def fetch_youtube_via_audio(url: str) -> Tuple[str, str, str]:
         raise Exception(f"Audio transcription failed: {str(e)}")
 
 
-async def fetch_podcast_audio(url: str) -> Tuple[str, str, str]:
+async def fetch_podcast_audio(
+    url: str,
+    progress: Optional[Callable[[str], Awaitable[None]]] = None,
+    use_cache: bool = True,
+) -> Tuple[str, str, str]:
     """
     Fetch podcast content by downloading audio and transcribing.
 
     Args:
         url: URL to podcast episode (direct audio URL or podcast platform URL)
+        progress: Optional async callback for transcription progress messages
+        use_cache: Set False to re-transcribe instead of using the cached transcript
 
     Returns:
         Tuple of (transcript_text, episode_title, source_url)
@@ -332,6 +600,8 @@ async def fetch_podcast_audio(url: str) -> Tuple[str, str, str]:
             url=url,
             use_api=True,
             keep_audio=False,
+            progress=progress,
+            use_cache=use_cache,
         )
 
         logger.info(f"Podcast transcription complete: {title} ({len(transcript)} chars)")
@@ -341,24 +611,47 @@ async def fetch_podcast_audio(url: str) -> Tuple[str, str, str]:
         raise Exception(f"Podcast transcription failed: {str(e)}")
 
 
-async def fetch_content(url: str, content_type: str) -> Tuple[str, str, str]:
+async def fetch_content(
+    url: str,
+    content_type: str,
+    progress: Optional[Callable[[str], Awaitable[None]]] = None,
+    use_cache: bool = True,
+) -> Tuple[str, str, str]:
     """
     Fetch content based on type.
 
+    Results are cached by canonical source id, so re-analyzing the same
+    video, paper or article (with another model or prompt) skips the fetch.
+    Articles and papers are refetched once older than FETCH_CACHE_MAX_AGE.
+
     Args:
         url: The URL or file path
         content_type: One of 'youtube', 'article', 'arxiv', 'podcast'
+        progress: Optional async callback for long-running steps (audio transcription)
+        use_cache: Set False to refetch and overwrite the cached copy
 
     Returns:
         Tuple of (content_text, title, source_url)
     """
-    if content_type == "youtube":
-        return await fetch_youtube_transcript(url)
-    elif content_type == "article":
-        return await fetch_article(url)
-    elif content_type == "arxiv":
-        return await fetch_arxiv(url)
-    elif content_type == "podcast":
-        return await fetch_podcast_audio(url)
-    else:
+    fetchers = {
+        "youtube": lambda: fetch_youtube_transcript(url, progress, use_cache),
+        "article": lambda: fetch_article(url),
+        "arxiv": lambda: fetch_arxiv(url),
+        "podcast": lambda: fetch_podcast_audio(url, progress, use_cache),
+    }
+    if content_type not in fetchers:
         raise ValueError(f"Unknown content type: {content_type}")
+
+    cache_key = f"fetch:{content_type}:{canonical_source_id(url)}"
+    if use_cache:
+        cached = await asyncio.to_thread(fetch_cache.get, cache_key, FETCH_CACHE_MAX_AGE.get(content_type))
+        if cached:
+            logger.info(f"Fetch cache hit: {cache_key}")
+            return cached["text"], cached["title"], cached["source"]
+
+    content, title, source = await fetchers[content_type]()
+
+    await asyncio.to_thread(
+        fetch_cache.put, cache_key, content, title=title, source=source, content_type=content_type
+    )
+    return content, title, source
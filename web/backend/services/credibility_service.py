@@ -9,12 +9,16 @@ import re
 from typing import Optional
 from urllib.parse import urlparse
 
-from anthropic import Anthropic
-
-from config import ANTHROPIC_API_KEY, MODELS
+from config import MODELS
+from services.llm import complete
+from services.model_router import route_model
+from services.token_budget import truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
+# Content budget for a credibility request
+CREDIBILITY_CONTENT_TOKENS = 2500
+
 # Known source reliability indicators
 TRUSTED_DOMAINS = {
     'nature.com': 0.95,
@@ -39,32 +43,25 @@ CREDIBILITY_PROMPT = """Analyze the credibility of the following content. Consid
 5. **Fact Checkability**: Can claims be verified? Are they specific?
 6. **Logical Consistency**: Sound reasoning? Any logical fallacies?
 
-Content to analyze:
-Title: {title}
-Source: {source}
-Type: {content_type}
-
-Content:
-{content}
-
 Provide your analysis as JSON:
-{{
+{
   "overall_score": <1-100>,
-  "source_quality": {{"score": <1-100>, "notes": "..."}},
-  "evidence_quality": {{"score": <1-100>, "notes": "..."}},
-  "bias_level": {{"score": <1-100 where 100=unbiased>, "notes": "..."}},
-  "fact_checkability": {{"score": <1-100>, "notes": "..."}},
+  "source_quality": {"score": <1-100>, "notes": "..."},
+  "evidence_quality": {"score": <1-100>, "notes": "..."},
+  "bias_level": {"score": <1-100 where 100=unbiased>, "notes": "..."},
+  "fact_checkability": {"score": <1-100>, "notes": "..."},
   "red_flags": ["list", "of", "concerns"],
   "strengths": ["list", "of", "positives"],
   "recommendation": "brief recommendation for the reader"
-}}"""
+}"""
 
+CREDIBILITY_CONTENT = """Content to analyze:
+Title: {title}
+Source: {source}
+Type: {content_type}
 
-def get_client() -> Anthropic:
-    """Get Anthropic client."""
-    if not ANTHROPIC_API_KEY:
-        raise ValueError("ANTHROPIC_API_KEY not set")
-    return Anthropic(api_key=ANTHROPIC_API_KEY)
+Content:
+{content}"""
 
 
 def get_domain_score(url: str) -> float:
@@ -101,6 +98,7 @@ async def analyze_credibility(
     title: str,
     source_url: str,
     content_type: str,
+    report_id: Optional[int] = None,
 ) -> dict:
     """
     Analyze the credibility of content.
@@ -112,30 +110,31 @@ async def analyze_credibility(
         domain_score = get_domain_score(source_url)
 
         # Truncate content
-        if len(content) > 10000:
-            content = content[:10000] + "\n\n[Content truncated...]"
+        content = truncate_to_tokens(content, CREDIBILITY_CONTENT_TOKENS)
 
         # Build prompt
-        prompt = CREDIBILITY_PROMPT.format(
+        prompt = CREDIBILITY_CONTENT.format(
             title=title,
             source=source_url or "Unknown",
             content_type=content_type,
             content=content,
         )
 
-        # Call Claude
-        client = get_client()
-        model_info = MODELS["haiku"]  # Use Haiku for cost efficiency
+        # Call Claude (the criteria are the cached system block)
+        model_info = MODELS[route_model("credibility")]  # Haiku by default for cost efficiency
 
-        response = client.messages.create(
-            model=model_info["id"],
+        result = await complete(
+            model_info["id"],
+            prompt,
+            system=CREDIBILITY_PROMPT,
             max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}]
+            service="credibility",
+            report_id=report_id,
         )
 
         # Parse response
         import json
-        response_text = response.content[0].text
+        response_text = result.text
 
         # Extract JSON from response
         json_match = re.search(r'\{[\s\S]*\}', response_text)
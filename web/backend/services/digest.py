@@ -1,12 +1,21 @@
-"""Weekly digest generation service."""
+"""Weekly digest generation service.
 
+Digests are built from the reports index (one date-range query) rather than
+by scanning the reports directory, and are only rewritten when the set of
+reports in their period changes.
+"""
+
+import hashlib
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
-from config import PROJECT_ROOT, REPORTS_DIR, LOGS_DIR
+from config import PROJECT_ROOT, REPORTS_DIR
+from database import get_reports_in_date_range, get_digest, save_digest
+from services.parser import parse_key_takeaways
+from services.log_writer import log_writer
 
 logger = logging.getLogger(__name__)
 
@@ -30,105 +39,66 @@ class DigestStats:
     streak: int
 
 
-def get_reports_in_range(start_date: datetime, end_date: datetime) -> List[Path]:
-    """Get all report files within a date range."""
-    reports = []
-
-    for category_dir in REPORTS_DIR.iterdir():
-        if not category_dir.is_dir():
-            continue
+# Display names by report directory
+TYPE_DISPLAY_NAMES = {
+    "youtube": "Video",
+    "articles": "Article",
+    "papers": "Paper",
+    "podcasts": "Podcast",
+    "pdfs": "PDF",
+    "github": "GitHub",
+    "books": "Book",
+    "newsletters": "Newsletter",
+    "threads": "Thread",
+    "hackernews": "HN Post",
+    "other": "Other",
+}
 
-        for report_file in category_dir.glob("*.md"):
-            # Extract date from filename (YYYY-MM-DD_title.md)
-            try:
-                date_str = report_file.stem[:10]
-                report_date = datetime.strptime(date_str, "%Y-%m-%d")
 
-                if start_date <= report_date <= end_date:
-                    reports.append(report_file)
-            except ValueError:
-                continue
+def _report_dir_name(report: Dict[str, Any]) -> str:
+    return Path(report["filepath"]).parent.name
 
-    return sorted(reports, key=lambda p: p.stem, reverse=True)
 
+def build_digest_report(report: Dict[str, Any]) -> DigestReport:
+    """Build a digest entry from an indexed report row."""
+    report_type = _report_dir_name(report)
+    report_path = Path(report["filepath"])
 
-def extract_report_summary(report_path: Path) -> DigestReport:
-    """Extract key information from a report for the digest."""
-    content = report_path.read_text(encoding="utf-8", errors="replace")
-    lines = content.split("\n")
-
-    # Extract title (first H1)
-    title = "Untitled"
-    for line in lines:
-        if line.startswith("# "):
-            title = line[2:].strip()
-            break
+    takeaways = report["key_takeaways"]
+    if takeaways is None:
+        # Indexed before takeaways were stored; fall back to the file
+        try:
+            content = report_path.read_text(encoding="utf-8", errors="replace")
+            takeaways = parse_key_takeaways(content)
+        except OSError:
+            takeaways = []
 
-    # Detect type from path
-    report_type = report_path.parent.name
-    type_map = {
-        "youtube": "Video",
-        "articles": "Article",
-        "papers": "Paper",
-        "podcasts": "Podcast",
-        "pdfs": "PDF",
-        "github": "GitHub",
-        "books": "Book",
-        "newsletters": "Newsletter",
-        "threads": "Thread",
-        "hackernews": "HN Post",
-        "other": "Other",
-    }
-    display_type = type_map.get(report_type, report_type.title())
-
-    # Extract date
-    date_str = report_path.stem[:10]
-
-    # Extract key takeaways (look for numbered list after "Key Takeaways" header)
-    takeaways = []
-    in_takeaways = False
-
-    for line in lines:
-        if "key takeaway" in line.lower() or "main points" in line.lower():
-            in_takeaways = True
-            continue
-
-        if in_takeaways:
-            if line.startswith("## "):
-                break  # Next section
-            if line.strip().startswith(("1.", "2.", "3.", "4.", "5.", "-", "*")):
-                # Clean up the takeaway
-                takeaway = line.strip().lstrip("0123456789.-*) ").strip()
-                if takeaway and len(takeaway) > 10:
-                    takeaways.append(takeaway[:200])  # Limit length
-                    if len(takeaways) >= 3:
-                        break
+    try:
+        path = str(report_path.relative_to(PROJECT_ROOT))
+    except ValueError:
+        path = str(report_path)
 
     return DigestReport(
-        title=title,
-        type=display_type,
-        date=date_str,
-        path=str(report_path.relative_to(PROJECT_ROOT)),
+        title=report["title"] or "Untitled",
+        type=TYPE_DISPLAY_NAMES.get(report_type, report_type.title()),
+        date=report["created_at"][:10],
+        path=path,
         key_takeaways=takeaways[:3],
     )
 
 
-def calculate_stats(reports: List[Path], start_date: datetime, end_date: datetime) -> DigestStats:
+def calculate_stats(
+    reports: List[Dict[str, Any]],
+    start_date: datetime,
+    end_date: datetime,
+) -> DigestStats:
     """Calculate statistics for the digest period."""
     by_type: Dict[str, int] = {}
-
     for report in reports:
-        report_type = report.parent.name
+        report_type = _report_dir_name(report)
         by_type[report_type] = by_type.get(report_type, 0) + 1
 
-    # Calculate days active
-    active_dates = set()
-    for report in reports:
-        try:
-            date_str = report.stem[:10]
-            active_dates.add(date_str)
-        except:
-            pass
+    active_dates = {report["created_at"][:10] for report in reports}
 
     # Calculate streak (consecutive days ending at end_date)
     streak = 0
@@ -149,6 +119,57 @@ def calculate_stats(reports: List[Path], start_date: datetime, end_date: datetim
     )
 
 
+def digest_fingerprint(reports: List[Dict[str, Any]], end_date: datetime) -> str:
+    """Hash of the reports in a period; changes when any of them is added, edited, moved or removed."""
+    digest = hashlib.sha256(end_date.strftime("%Y-%m-%d").encode())
+    for report in sorted(reports, key=lambda r: r["id"]):
+        digest.update(f"|{report['id']}:{report['file_modified_at']}:{report['filepath']}".encode())
+    return digest.hexdigest()
+
+
+async def _build_digest(
+    period_key: str,
+    filename: str,
+    title: str,
+    start_date: datetime,
+    end_date: datetime,
+    empty_message: str,
+) -> tuple[Path, bool]:
+    """
+    Generate a digest file for a period, reusing the cached one if unchanged.
+
+    Returns (digest path, whether it was regenerated).
+    """
+    reports = await get_reports_in_date_range(start_date.isoformat(), end_date.isoformat())
+
+    if not reports:
+        raise ValueError(empty_message)
+
+    digest_path = REPORTS_DIR / "digests" / filename
+    fingerprint = digest_fingerprint(reports, end_date)
+
+    cached = await get_digest(period_key)
+    if (
+        cached
+        and cached["fingerprint"] == fingerprint
+        and cached["title"] == title
+        and cached["filepath"] == str(digest_path)
+        and digest_path.exists()
+    ):
+        logger.info(f"Digest {period_key} unchanged, reusing {digest_path}")
+        return digest_path, False
+
+    digest_reports = [build_digest_report(r) for r in reports]
+    stats = calculate_stats(reports, start_date, end_date)
+    content = generate_digest_content(digest_reports, stats, start_date, end_date, title)
+
+    digest_path.parent.mkdir(parents=True, exist_ok=True)
+    digest_path.write_text(content, encoding="utf-8")
+    await save_digest(period_key, title, str(digest_path), fingerprint, len(reports))
+
+    return digest_path, True
+
+
 def generate_digest_content(
     reports: List[DigestReport],
     stats: DigestStats,
@@ -269,43 +290,29 @@ async def generate_weekly_digest(
 
     logger.info(f"Generating digest for {start_date.date()} to {end_date.date()}")
 
-    # Get reports in range
-    report_paths = get_reports_in_range(start_date, end_date)
-
-    if not report_paths:
-        raise ValueError(f"No reports found for the period {start_date.date()} to {end_date.date()}")
-
-    # Extract summaries
-    reports = [extract_report_summary(p) for p in report_paths]
-
-    # Calculate stats
-    stats = calculate_stats(report_paths, start_date, end_date)
-
-    # Generate content
-    content = generate_digest_content(reports, stats, start_date, end_date, custom_title)
+    date_range = f"{start_date.strftime('%B %d')} - {end_date.strftime('%B %d, %Y')}"
+    filename = f"{start_date.strftime('%Y-%m-%d')}_weekly-digest.md"
 
-    # Save digest
-    digests_dir = REPORTS_DIR / "digests"
-    digests_dir.mkdir(parents=True, exist_ok=True)
+    digest_path, regenerated = await _build_digest(
+        period_key=f"weekly:{start_date.strftime('%Y-%m-%d')}",
+        filename=filename,
+        title=custom_title or f"Weekly Digest: {date_range}",
+        start_date=start_date,
+        end_date=end_date,
+        empty_message=f"No reports found for the period {start_date.date()} to {end_date.date()}",
+    )
 
-    filename = f"{start_date.strftime('%Y-%m-%d')}_weekly-digest.md"
-    digest_path = digests_dir / filename
+    if not regenerated:
+        return digest_path
 
-    digest_path.write_text(content, encoding="utf-8")
     logger.info(f"Saved digest to {digest_path}")
 
     # Update activity log
-    log_file = LOGS_DIR / f"{datetime.now().strftime('%Y-%m-%d')}.md"
-    LOGS_DIR.mkdir(parents=True, exist_ok=True)
-
-    log_entry = f"\n## Digests Generated\n\n- [Weekly Digest: {start_date.strftime('%b %d')} - {end_date.strftime('%b %d')}](../reports/digests/{filename}) - {datetime.now().strftime('%H:%M')}\n"
-
-    if log_file.exists():
-        existing = log_file.read_text()
-        if "## Digests Generated" not in existing:
-            log_file.write_text(existing + log_entry)
-    else:
-        log_file.write_text(f"# Activity Log - {datetime.now().strftime('%Y-%m-%d')}\n" + log_entry)
+    await log_writer.append(
+        "## Digests Generated",
+        f"Weekly Digest: {start_date.strftime('%b %d')} - {end_date.strftime('%b %d')}",
+        f"../reports/digests/{filename}",
+    )
 
     return digest_path
 
@@ -339,30 +346,16 @@ async def generate_monthly_digest(
 
     logger.info(f"Generating monthly digest for {start_date.date()} to {end_date.date()}")
 
-    # Get reports
-    report_paths = get_reports_in_range(start_date, end_date)
-
-    if not report_paths:
-        raise ValueError(f"No reports found for {start_date.strftime('%B %Y')}")
-
-    # Extract summaries
-    reports = [extract_report_summary(p) for p in report_paths]
-
-    # Calculate stats
-    stats = calculate_stats(report_paths, start_date, end_date)
-
-    # Generate content
-    title = custom_title or f"Monthly Digest: {start_date.strftime('%B %Y')}"
-    content = generate_digest_content(reports, stats, start_date, end_date, title)
-
-    # Save
-    digests_dir = REPORTS_DIR / "digests"
-    digests_dir.mkdir(parents=True, exist_ok=True)
-
-    filename = f"{start_date.strftime('%Y-%m')}_monthly-digest.md"
-    digest_path = digests_dir / filename
+    digest_path, regenerated = await _build_digest(
+        period_key=f"monthly:{start_date.strftime('%Y-%m')}",
+        filename=f"{start_date.strftime('%Y-%m')}_monthly-digest.md",
+        title=custom_title or f"Monthly Digest: {start_date.strftime('%B %Y')}",
+        start_date=start_date,
+        end_date=end_date,
+        empty_message=f"No reports found for {start_date.strftime('%B %Y')}",
+    )
 
-    digest_path.write_text(content, encoding="utf-8")
-    logger.info(f"Saved monthly digest to {digest_path}")
+    if regenerated:
+        logger.info(f"Saved monthly digest to {digest_path}")
 
     return digest_path
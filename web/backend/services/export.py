@@ -1,17 +1,26 @@
 """Export service for Obsidian and Notion."""
 
+import hashlib
 import logging
 import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Iterator
 import json
+import time
+import zipfile
 
-from config import PROJECT_ROOT, REPORTS_DIR
+from config import PROJECT_ROOT, REPORTS_DIR, EXPORT_WORKERS
 
 logger = logging.getLogger(__name__)
 
+# Written inside the vault to track what each report was exported as
+MANIFEST_NAME = ".export-manifest.json"
+MANIFEST_VERSION = 1
+INDEX_NOTE_NAME = "000 - Index.md"
+
 
 def sanitize_filename(name: str) -> str:
     """Sanitize a string for use as a filename."""
@@ -88,18 +97,159 @@ created: {datetime.now().isoformat()}
     return frontmatter + content
 
 
+def iter_all_reports() -> Iterator[Path]:
+    """Yield report files under REPORTS_DIR, one level of category directories deep."""
+    for category_dir in REPORTS_DIR.iterdir():
+        if category_dir.is_dir():
+            yield from category_dir.glob("*.md")
+
+
+def list_all_reports() -> List[Path]:
+    """All report files under REPORTS_DIR."""
+    return list(iter_all_reports())
+
+
+def extract_title(content: str) -> str:
+    """Return the first H1 of a report, or 'Untitled'."""
+    for line in content.split('\n'):
+        if line.startswith('# '):
+            return line[2:].strip()
+    return "Untitled"
+
+
+def load_export_manifest(output_dir: Path) -> Dict[str, Any]:
+    """Load the export manifest of a vault, or an empty one."""
+    manifest_path = output_dir / MANIFEST_NAME
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable export manifest {manifest_path}: {e}")
+    return {"version": MANIFEST_VERSION, "include_structure": None, "files": {}}
+
+
+def save_export_manifest(output_dir: Path, manifest: Dict[str, Any]):
+    """Write the manifest atomically so an interrupted export can't corrupt it."""
+    manifest_path = output_dir / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(manifest_path)
+
+
+def _source_key(report_path: Path) -> str:
+    try:
+        return report_path.relative_to(REPORTS_DIR).as_posix()
+    except ValueError:
+        return str(report_path)
+
+
+def _read_and_convert(report_path: Path, previous_hash: Optional[str]) -> Dict[str, Any]:
+    """Hash a report and convert it, skipping conversion if the hash is unchanged."""
+    raw = report_path.read_bytes()
+    content_hash = hashlib.sha256(raw).hexdigest()
+    if content_hash == previous_hash:
+        return {"hash": content_hash, "title": None, "content": None}
+
+    content = raw.decode("utf-8", errors="replace")
+    title = extract_title(content)
+    return {
+        "hash": content_hash,
+        "title": title,
+        "content": convert_to_obsidian(content, title, report_path),
+    }
+
+
+def _assign_target(
+    output_dir: Path,
+    report_path: Path,
+    title: str,
+    include_structure: bool,
+    claimed: set,
+    adopt_existing: bool = False,
+) -> str:
+    """Pick a vault-relative target path that no other exported report (or foreign file) uses."""
+    target_dir = Path(report_path.parent.name) if include_structure else Path()
+    safe_title = sanitize_filename(title) or report_path.stem
+
+    candidate = (target_dir / f"{safe_title}.md").as_posix()
+    counter = 1
+    while candidate in claimed or (not adopt_existing and (output_dir / candidate).exists()):
+        candidate = (target_dir / f"{safe_title}_{counter}.md").as_posix()
+        counter += 1
+    return candidate
+
+
+def _remove_target(output_dir: Path, target: str):
+    try:
+        (output_dir / target).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def build_obsidian_index(files: List[Path]) -> str:
+    """Build the '000 - Index.md' note listing exported reports by category."""
+    index_content = f"""---
+title: Personal OS Export
+date: {datetime.now().strftime('%Y-%m-%d')}
+type: index
+---
+
+# Personal OS Export
+
+Exported on {datetime.now().strftime('%B %d, %Y at %H:%M')}
+
+## Statistics
+
+- **Total Reports**: {len(files)}
+- **Categories**: {len(set(f.parent.name for f in files))}
+
+## Categories
+
+"""
+    # Group by category
+    by_category: Dict[str, List[str]] = {}
+    for file_path in files:
+        by_category.setdefault(file_path.parent.name or "reports", []).append(file_path.stem)
+
+    for category, names in sorted(by_category.items()):
+        index_content += f"\n### {category.title()}\n\n"
+        for filename in sorted(names)[:10]:  # Limit to 10 per category
+            index_content += f"- [[{filename}]]\n"
+        if len(names) > 10:
+            index_content += f"- ... and {len(names) - 10} more\n"
+
+    return index_content
+
+
+def write_obsidian_index(output_dir: Path, targets: List[str]):
+    """Write the index note for a vault directory."""
+    index_content = build_obsidian_index([output_dir / t for t in targets])
+    (output_dir / INDEX_NOTE_NAME).write_text(index_content, encoding="utf-8")
+
+
 def export_to_obsidian(
     output_dir: Path,
     reports: Optional[List[Path]] = None,
     include_structure: bool = True,
+    incremental: bool = True,
 ) -> Dict[str, Any]:
     """
     Export reports to Obsidian vault format.
 
+    The vault keeps a manifest (source path, content hash, target path).
+    Incremental exports only re-read reports whose size/mtime changed,
+    only rewrite those whose content hash changed, and delete targets of
+    reports that no longer exist. Each report keeps its target name across
+    runs, so re-exporting never creates "_1" copies.
+
     Args:
         output_dir: Target directory for Obsidian vault
-        reports: Specific reports to export (None = all)
+        reports: Specific reports to export (None = all, and prune removed ones)
         include_structure: Create folder structure matching original
+        incremental: False to rewrite every selected report
 
     Returns:
         Dict with export statistics
@@ -107,103 +257,143 @@ def export_to_obsidian(
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Get reports to export
+    full_export = reports is None
     if reports is None:
-        reports = []
-        for category_dir in REPORTS_DIR.iterdir():
-            if category_dir.is_dir():
-                reports.extend(category_dir.glob("*.md"))
+        reports = list_all_reports()
+
+    manifest = load_export_manifest(output_dir)
+    entries: Dict[str, Dict[str, Any]] = manifest["files"]
+    # Without a manifest, files in the vault are from a previous non-incremental
+    # export, so they're adopted rather than avoided
+    adopt_existing = manifest["include_structure"] is None
+    if manifest["include_structure"] not in (None, include_structure):
+        # Layout changed: every report needs a new target
+        incremental = False
+        for entry in entries.values():
+            _remove_target(output_dir, entry["target"])
+        entries.clear()
+    manifest["include_structure"] = include_structure
 
     stats = {
         "exported": 0,
+        "unchanged": 0,
+        "removed": 0,
         "failed": 0,
         "output_dir": str(output_dir),
         "files": [],
     }
+    manifest_changed = False
 
+    # Cheap pass: only reports whose stat changed (or whose target vanished) get read
+    sources: Dict[str, Path] = {}
+    pending = []
     for report_path in reports:
+        key = _source_key(report_path)
+        sources[key] = report_path
         try:
-            content = report_path.read_text(encoding="utf-8", errors="replace")
-
-            # Extract title
-            title = "Untitled"
-            for line in content.split('\n'):
-                if line.startswith('# '):
-                    title = line[2:].strip()
-                    break
-
-            # Convert to Obsidian format
-            obsidian_content = convert_to_obsidian(content, title, report_path)
-
-            # Determine output path
-            if include_structure:
-                category = report_path.parent.name
-                target_dir = output_dir / category
-                target_dir.mkdir(parents=True, exist_ok=True)
-            else:
-                target_dir = output_dir
-
-            # Use sanitized title as filename
-            safe_title = sanitize_filename(title)
-            if not safe_title:
-                safe_title = report_path.stem
-
-            target_path = target_dir / f"{safe_title}.md"
-
-            # Handle duplicates
-            counter = 1
-            while target_path.exists():
-                target_path = target_dir / f"{safe_title}_{counter}.md"
-                counter += 1
-
-            target_path.write_text(obsidian_content, encoding="utf-8")
-            stats["exported"] += 1
-            stats["files"].append(str(target_path))
-
-            logger.info(f"Exported: {report_path.name} -> {target_path.name}")
-
-        except Exception as e:
+            st = report_path.stat()
+        except OSError as e:
             logger.error(f"Failed to export {report_path}: {e}")
             stats["failed"] += 1
+            continue
+
+        entry = entries.get(key)
+        target_exists = entry is not None and (output_dir / entry["target"]).exists()
+        if incremental and target_exists and (entry["mtime_ns"], entry["size"]) == (st.st_mtime_ns, st.st_size):
+            stats["unchanged"] += 1
+            continue
+        previous_hash = entry["hash"] if incremental and target_exists else None
+        pending.append((key, report_path, st, previous_hash))
+
+    # Hash + convert in a worker pool
+    results = []
+    if pending:
+        with ThreadPoolExecutor(max_workers=EXPORT_WORKERS) as pool:
+            futures = {
+                pool.submit(_read_and_convert, report_path, previous_hash): (key, report_path, st)
+                for key, report_path, st, previous_hash in pending
+            }
+            for future in as_completed(futures):
+                key, report_path, st = futures[future]
+                try:
+                    results.append((key, report_path, st, future.result()))
+                except Exception as e:
+                    logger.error(f"Failed to export {report_path}: {e}")
+                    stats["failed"] += 1
+
+    # Assign targets sequentially so names stay unique, then write in the pool
+    claimed = {entry["target"] for entry in entries.values()}
+    writes = []
+    for key, report_path, st, result in sorted(results, key=lambda r: r[0]):
+        entry = entries.get(key)
+        if result["content"] is None:
+            # Touched but identical content
+            entry["mtime_ns"], entry["size"] = st.st_mtime_ns, st.st_size
+            stats["unchanged"] += 1
+            manifest_changed = True
+            continue
+
+        target = entry["target"] if entry and entry["title"] == result["title"] else None
+        if target is None:
+            if entry:
+                claimed.discard(entry["target"])
+                _remove_target(output_dir, entry["target"])
+            target = _assign_target(
+                output_dir, report_path, result["title"], include_structure, claimed, adopt_existing
+            )
+            claimed.add(target)
+
+        entries[key] = {
+            "hash": result["hash"],
+            "title": result["title"],
+            "target": target,
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+        }
+        writes.append((key, report_path, target, result["content"]))
+
+    def write_target(target: str, content: str):
+        target_path = output_dir / target
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        target_path.write_text(content, encoding="utf-8")
+
+    if writes:
+        with ThreadPoolExecutor(max_workers=EXPORT_WORKERS) as pool:
+            futures = {
+                pool.submit(write_target, target, content): (key, report_path, target)
+                for key, report_path, target, content in writes
+            }
+            for future in as_completed(futures):
+                key, report_path, target = futures[future]
+                try:
+                    future.result()
+                    stats["exported"] += 1
+                    stats["files"].append(str(output_dir / target))
+                    logger.info(f"Exported: {report_path.name} -> {Path(target).name}")
+                except Exception as e:
+                    logger.error(f"Failed to export {report_path}: {e}")
+                    stats["failed"] += 1
+                    entries.pop(key, None)
+        manifest_changed = True
+
+    # Drop targets for reports that were deleted from the vault
+    if full_export:
+        for key in [k for k in entries if k not in sources]:
+            _remove_target(output_dir, entries.pop(key)["target"])
+            stats["removed"] += 1
+            manifest_changed = True
+
+    if manifest_changed or not (output_dir / MANIFEST_NAME).exists():
+        save_export_manifest(output_dir, manifest)
 
     # Create index note
-    if stats["exported"] > 0:
-        index_content = f"""---
-title: Personal OS Export
-date: {datetime.now().strftime('%Y-%m-%d')}
-type: index
----
+    if entries and (stats["exported"] or stats["removed"] or not (output_dir / INDEX_NOTE_NAME).exists()):
+        write_obsidian_index(output_dir, [entry["target"] for entry in entries.values()])
 
-# Personal OS Export
-
-Exported on {datetime.now().strftime('%B %d, %Y at %H:%M')}
-
-## Statistics
-
-- **Total Reports**: {stats['exported']}
-- **Categories**: {len(set(Path(f).parent.name for f in stats['files']))}
-
-## Categories
-
-"""
-        # Group by category
-        by_category: Dict[str, List[str]] = {}
-        for file_path in stats["files"]:
-            category = Path(file_path).parent.name
-            if category not in by_category:
-                by_category[category] = []
-            by_category[category].append(Path(file_path).stem)
-
-        for category, files in sorted(by_category.items()):
-            index_content += f"\n### {category.title()}\n\n"
-            for filename in sorted(files)[:10]:  # Limit to 10 per category
-                index_content += f"- [[{filename}]]\n"
-            if len(files) > 10:
-                index_content += f"- ... and {len(files) - 10} more\n"
-
-        (output_dir / "000 - Index.md").write_text(index_content, encoding="utf-8")
-
-    logger.info(f"Export complete: {stats['exported']} files to {output_dir}")
+    logger.info(
+        f"Export complete: {stats['exported']} written, {stats['unchanged']} unchanged, "
+        f"{stats['removed']} removed in {output_dir}"
+    )
     return stats
 
 
@@ -290,42 +480,136 @@ def export_single_report_for_notion(report_path: Path) -> Dict[str, Any]:
     }
 
 
-def export_for_notion(output_file: Path, reports: Optional[List[Path]] = None) -> Dict[str, Any]:
-    """
-    Export reports to a JSON file suitable for Notion import.
-
-    The JSON can be used with Notion API or import tools.
-    """
+def iter_notion_records(
+    reports: Optional[Iterable[Path]] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield Notion records one report at a time, counting successes/failures in stats."""
     if reports is None:
-        reports = []
-        for category_dir in REPORTS_DIR.iterdir():
-            if category_dir.is_dir():
-                reports.extend(category_dir.glob("*.md"))
-
-    exports = []
-    stats = {"exported": 0, "failed": 0}
+        reports = iter_all_reports()
+    if stats is None:
+        stats = {}
+    stats.setdefault("exported", 0)
+    stats.setdefault("failed", 0)
 
     for report_path in reports:
         try:
             data = export_single_report_for_notion(report_path)
-            exports.append(data)
-            stats["exported"] += 1
         except Exception as e:
             logger.error(f"Failed to process {report_path}: {e}")
             stats["failed"] += 1
+            continue
+        stats["exported"] += 1
+        yield data
+
+
+def iter_notion_ndjson(reports: Optional[Iterable[Path]] = None) -> Iterator[str]:
+    """Stream reports as newline-delimited JSON, one Notion record per line."""
+    for record in iter_notion_records(reports):
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def iter_notion_json(
+    reports: Optional[Iterable[Path]] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Iterator[str]:
+    """
+    Stream the Notion export document in chunks.
+
+    Produces the same document as a single json.dump, except total_reports
+    comes after the reports list since it's only known at the end.
+    """
+    yield '{\n  "exported_at": ' + json.dumps(datetime.now().isoformat()) + ',\n  "reports": ['
+
+    count = 0
+    for record in iter_notion_records(reports, stats):
+        body = json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+        yield ("," if count else "") + "\n    " + body
+        count += 1
+
+    yield ("\n  " if count else "") + f'],\n  "total_reports": {count}\n}}\n'
+
+
+def export_for_notion(output_file: Path, reports: Optional[List[Path]] = None) -> Dict[str, Any]:
+    """
+    Export reports to a JSON file suitable for Notion import.
+
+    The JSON can be used with Notion API or import tools. Reports are
+    written as they're converted, so memory use doesn't grow with the vault.
+    """
+    stats = {"exported": 0, "failed": 0}
 
-    # Save to JSON
     output_file = Path(output_file)
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
     with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            "exported_at": datetime.now().isoformat(),
-            "total_reports": len(exports),
-            "reports": exports,
-        }, f, indent=2, ensure_ascii=False)
+        for chunk in iter_notion_json(reports, stats):
+            f.write(chunk)
 
     stats["output_file"] = str(output_file)
     logger.info(f"Notion export complete: {stats['exported']} reports to {output_file}")
 
     return stats
+
+
+class _ZipStreamBuffer:
+    """Write-only file object that collects zipfile output for a generator to hand off."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_obsidian_zip(
+    reports: Optional[Iterable[Path]] = None,
+    include_structure: bool = True,
+) -> Iterator[bytes]:
+    """
+    Stream an Obsidian vault as a ZIP archive.
+
+    Each report is converted, compressed and yielded before the next one is
+    read, so only one report is held in memory at a time. The buffer has no
+    seek/tell, which makes zipfile write data descriptors instead of
+    rewinding to patch local headers.
+    """
+    if reports is None:
+        reports = iter_all_reports()
+
+    buffer = _ZipStreamBuffer()
+    claimed: set = set()
+
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for report_path in reports:
+            try:
+                content = report_path.read_text(encoding="utf-8", errors="replace")
+                title = extract_title(content)
+                target = _assign_target(
+                    Path(), report_path, title, include_structure, claimed, adopt_existing=True
+                )
+
+                info = zipfile.ZipInfo(target, date_time=time.localtime(report_path.stat().st_mtime)[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                zf.writestr(info, convert_to_obsidian(content, title, report_path))
+                claimed.add(target)
+            except Exception as e:
+                logger.error(f"Failed to export {report_path}: {e}")
+                continue
+
+            yield buffer.drain()
+
+        if claimed:
+            zf.writestr(INDEX_NOTE_NAME, build_obsidian_index([Path(t) for t in sorted(claimed)]))
+
+    yield buffer.drain()
+    logger.info(f"Streamed Obsidian ZIP export: {len(claimed)} reports")
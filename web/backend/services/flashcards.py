@@ -1,19 +1,33 @@
 """Anki flashcard generation service."""
 
+import hashlib
+import json
 import logging
 import re
 import csv
 import io
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
 from config import PROJECT_ROOT, REPORTS_DIR
+from database import get_flashcards
 
 logger = logging.getLogger(__name__)
 
 
+def stable_id(text: str) -> int:
+    """
+    Deterministic 52-bit id from a string.
+
+    Unlike hash(), this is the same in every process, so re-exports reuse
+    ids and Anki updates cards instead of duplicating them. 52 bits keeps
+    ids exact in JavaScript clients.
+    """
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:13], 16)
+
+
 @dataclass
 class Flashcard:
     """A single flashcard."""
@@ -22,6 +36,31 @@ class Flashcard:
     tags: List[str]
     source: str
     deck: str = "Personal OS"
+    card_type: str = ""
+    key: str = ""  # Identity within the vault; the id stays stable while this does
+
+    @property
+    def id(self) -> int:
+        return stable_id(self.key or f"{self.front}\n{self.back}")
+
+    @property
+    def content_hash(self) -> str:
+        data = json.dumps([self.front, self.back, self.tags, self.deck], ensure_ascii=False)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def to_record(self) -> Dict[str, Any]:
+        """Row for the flashcards table."""
+        return {
+            "id": self.id,
+            "card_key": self.key,
+            "card_type": self.card_type,
+            "front": self.front,
+            "back": self.back,
+            "tags": self.tags,
+            "deck": self.deck,
+            "source": self.source,
+            "content_hash": self.content_hash,
+        }
 
 
 def extract_key_takeaways(content: str) -> List[Dict[str, str]]:
@@ -109,18 +148,20 @@ def extract_quotes(content: str) -> List[Dict[str, str]]:
     return cards
 
 
-def extract_qa_from_report(report_path: Path) -> List[Flashcard]:
+def extract_flashcards(content: str, report_path: Path) -> List[Flashcard]:
     """
-    Extract flashcards from a report.
+    Extract flashcards from report content.
 
     Looks for:
     - Key takeaways
     - Definitions
     - Notable quotes
-    - Action items
-    """
-    content = report_path.read_text(encoding="utf-8", errors="replace")
 
+    Card keys combine the report's path under reports/ with the term
+    (definitions) or the answer text (takeaways, quotes), so editing a
+    definition updates the same card, and reports with the same filename in
+    different categories get different cards.
+    """
     # Get metadata
     title = "Untitled"
     for line in content.split('\n'):
@@ -129,7 +170,14 @@ def extract_qa_from_report(report_path: Path) -> List[Flashcard]:
             break
 
     report_type = report_path.parent.name
-    source = str(report_path.relative_to(PROJECT_ROOT))
+    try:
+        source = str(report_path.relative_to(PROJECT_ROOT))
+    except ValueError:
+        source = str(report_path)
+    try:
+        report_key = report_path.relative_to(REPORTS_DIR).as_posix()
+    except ValueError:
+        report_key = report_path.as_posix()
 
     # Extract cards
     all_cards = []
@@ -137,9 +185,16 @@ def extract_qa_from_report(report_path: Path) -> List[Flashcard]:
     all_cards.extend(extract_definitions(content))
     all_cards.extend(extract_quotes(content))
 
-    # Convert to Flashcard objects
+    # Convert to Flashcard objects, dropping repeats of the same card
     flashcards = []
+    seen = set()
     for card in all_cards:
+        identity = card["front"] if card["type"] == "definition" else card["back"]
+        key = f"{report_key}|{card['type']}|{identity}"
+        if key in seen:
+            continue
+        seen.add(key)
+
         # Add context to front
         front = f"{card['front']}\n\n(From: {title})"
 
@@ -148,25 +203,34 @@ def extract_qa_from_report(report_path: Path) -> List[Flashcard]:
             back=card["back"],
             tags=[report_type, card["type"]],
             source=source,
-            deck=f"Personal OS::{report_type.title()}"
+            deck=f"Personal OS::{report_type.title()}",
+            card_type=card["type"],
+            key=key,
         ))
 
     return flashcards
 
 
+def extract_qa_from_report(report_path: Path) -> List[Flashcard]:
+    """Extract flashcards from a report file."""
+    content = report_path.read_text(encoding="utf-8", errors="replace")
+    return extract_flashcards(content, report_path)
+
+
 def generate_anki_csv(flashcards: List[Flashcard]) -> str:
     """
-    Generate CSV content for Anki import.
+    Generate tab-separated text for Anki import.
 
-    Format: front, back, tags
+    Format: guid, front, back, tags. The header lines tell Anki (2.1.55+)
+    to match notes on the stable guid, so re-importing updates cards.
     """
     output = io.StringIO()
+    output.write("#separator:tab\n#html:false\n#guid column:1\n#tags column:4\n")
     writer = csv.writer(output, delimiter='\t')
 
-    # Anki CSV format: front, back, tags
     for card in flashcards:
         tags = ' '.join(card.tags)
-        writer.writerow([card.front, card.back, tags])
+        writer.writerow([card.id, card.front, card.back, tags])
 
     return output.getvalue()
 
@@ -179,11 +243,11 @@ def generate_anki_deck(flashcards: List[Flashcard], deck_name: str = "Personal O
     """
     return {
         "deck_name": deck_name,
-        "deck_id": hash(deck_name) % (10 ** 9),
+        "deck_id": stable_id(f"deck|{deck_name}"),
         "created": datetime.now().isoformat(),
         "cards": [
             {
-                "id": hash(f"{card.front}{card.back}") % (10 ** 9),
+                "id": card.id,
                 "front": card.front,
                 "back": card.back,
                 "tags": card.tags,
@@ -234,40 +298,55 @@ async def generate_flashcards_for_report(
     }
 
 
+def _to_utc_timestamp(value: datetime) -> str:
+    """Format a datetime like SQLite's CURRENT_TIMESTAMP (naive values are taken as UTC)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
 async def generate_flashcards_batch(
     reports: Optional[List[Path]] = None,
     output_file: Optional[Path] = None,
-    output_format: str = "csv"
+    output_format: str = "csv",
+    since: Optional[datetime] = None,
 ) -> Dict[str, Any]:
     """
-    Generate flashcards for multiple reports.
+    Export flashcards stored at index time.
 
     Args:
         reports: List of report paths (None = all reports)
         output_file: Where to save the output
         output_format: "csv" or "json"
+        since: Only include cards added or changed since this time (UTC if naive)
 
     Returns:
-        Dict with statistics and output path
+        Dict with statistics, output path, and synced_at to pass as the next since
     """
-    if reports is None:
-        reports = []
-        for category_dir in REPORTS_DIR.iterdir():
-            if category_dir.is_dir():
-                reports.extend(category_dir.glob("*.md"))
-
-    all_flashcards = []
-    stats = {"processed": 0, "cards": 0, "failed": 0}
-
-    for report_path in reports:
-        try:
-            cards = extract_qa_from_report(report_path)
-            all_flashcards.extend(cards)
-            stats["processed"] += 1
-            stats["cards"] += len(cards)
-        except Exception as e:
-            logger.error(f"Failed to process {report_path}: {e}")
-            stats["failed"] += 1
+    synced_at = _to_utc_timestamp(datetime.now(timezone.utc))
+    rows = await get_flashcards(
+        since=_to_utc_timestamp(since) if since else None,
+        filepaths=[str(p) for p in reports] if reports is not None else None,
+    )
+
+    all_flashcards = [
+        Flashcard(
+            front=row["front"],
+            back=row["back"],
+            tags=row["tags"],
+            source=row["source"],
+            deck=row["deck"],
+            card_type=row["card_type"],
+            key=row["card_key"],
+        )
+        for row in rows
+    ]
+    stats = {
+        "processed": len({row["report_id"] for row in rows}),
+        "cards": len(all_flashcards),
+        "failed": 0,
+        "synced_at": synced_at,
+    }
 
     if not all_flashcards:
         return {
@@ -281,7 +360,6 @@ async def generate_flashcards_batch(
         output_content = generate_anki_csv(all_flashcards)
         suffix = ".txt"  # Anki prefers .txt for tab-separated
     else:
-        import json
         deck = generate_anki_deck(all_flashcards)
         output_content = json.dumps(deck, indent=2, ensure_ascii=False)
         suffix = ".json"
@@ -297,6 +375,6 @@ async def generate_flashcards_batch(
     output_file.write_text(output_content, encoding="utf-8")
 
     stats["output_file"] = str(output_file)
-    logger.info(f"Generated {stats['cards']} flashcards from {stats['processed']} reports")
+    logger.info(f"Exported {stats['cards']} flashcards from {stats['processed']} reports")
 
     return stats
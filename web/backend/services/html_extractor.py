@@ -0,0 +1,368 @@
+"""
+Streaming main-content extraction for HTML articles.
+
+ArticleExtractor is an incremental html.parser.HTMLParser: feed it chunks
+as they arrive and call result() at the end. While parsing it drops
+boilerplate subtrees (scripts, navigation, sidebars, comment sections),
+splits the page into text blocks, and scores each block's ancestors the
+way Readability does - longer, comma-rich paragraphs add to their parent
+and grandparent, class/id names nudge scores up or down, and link-heavy
+containers are penalized. The best container (plus strong siblings) is
+returned as paragraphs.
+
+The work is a single pass over the document, so it stays linear on
+multi-megabyte pages.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+# Subtrees that never contain article text
+SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "math", "canvas",
+    "iframe", "object", "embed", "select", "button", "textarea",
+    "nav", "header", "footer", "aside", "menu", "dialog",
+}
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+
+# Elements whose text forms its own paragraph
+BLOCK_TAGS = {
+    "address", "article", "blockquote", "body", "dd", "details", "div",
+    "dl", "dt", "figcaption", "figure", "h1", "h2", "h3", "h4", "h5", "h6",
+    "html", "li", "main", "ol", "p", "pre", "section", "summary", "table",
+    "td", "th", "tr", "ul",
+}
+
+# Tags that implicitly close an open element of the same kind
+SELF_NESTING_CLOSES = {"p", "li", "dt", "dd", "tr", "td", "th", "option"}
+
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+UNLIKELY_RE = re.compile(
+    r"banner|breadcrumb|combx|comment|community|cookie|disqus|extra|foot|"
+    r"header|legends|menu|modal|related|remark|replies|rss|share|shoutbox|"
+    r"sidebar|skyscraper|social|sponsor|ad-break|agegate|pagination|pager|"
+    r"popup|newsletter|subscribe|promo",
+    re.IGNORECASE,
+)
+MAYBE_RE = re.compile(r"and|article|body|column|content|main|shadow", re.IGNORECASE)
+POSITIVE_RE = re.compile(
+    r"article|body|content|entry|hentry|h-entry|main|page|pagination|post|text|blog|story",
+    re.IGNORECASE,
+)
+NEGATIVE_RE = re.compile(
+    r"-ad-|hidden|^hid$| hid$| hid |^hid |banner|combx|comment|com-|contact|"
+    r"foot|footer|footnote|masthead|media|meta|outbrain|promo|related|scroll|"
+    r"share|shoutbox|sidebar|skyscraper|sponsor|shopping|tags|tool|widget",
+    re.IGNORECASE,
+)
+
+TAG_SCORES = {
+    "div": 5, "article": 10, "main": 5, "section": 3,
+    "pre": 3, "td": 3, "blockquote": 3,
+    "address": -3, "ol": -3, "ul": -3, "dl": -3, "dd": -3, "dt": -3, "li": -3,
+    "h1": -5, "h2": -5, "h3": -5, "h4": -5, "h5": -5, "h6": -5, "th": -5,
+}
+
+MIN_BLOCK_CHARS = 25
+MAX_LINK_DENSITY = 0.5
+
+
+class _Node:
+    """An open or closed element that can hold scored text."""
+
+    __slots__ = ("tag", "parent", "weight", "score", "text_chars", "link_chars")
+
+    def __init__(self, tag: str, parent: Optional["_Node"], weight: int):
+        self.tag = tag
+        self.parent = parent
+        self.weight = weight
+        self.score: Optional[float] = None
+        self.text_chars = 0
+        self.link_chars = 0
+
+    def link_density(self) -> float:
+        return self.link_chars / self.text_chars if self.text_chars else 0.0
+
+    def is_within(self, ancestor: "_Node") -> bool:
+        node = self
+        while node is not None:
+            if node is ancestor:
+                return True
+            node = node.parent
+        return False
+
+
+class _Block:
+    __slots__ = ("node", "text", "link_chars", "heading")
+
+    def __init__(self, node: _Node, text: str, link_chars: int, heading: bool):
+        self.node = node
+        self.text = text
+        self.link_chars = link_chars
+        self.heading = heading
+
+
+def _class_weight(attrs: List[Tuple[str, Optional[str]]]) -> Tuple[int, str]:
+    """Readability's class/id weight, plus the combined class/id string."""
+    names = " ".join(v for k, v in attrs if k in ("class", "id") and v)
+    weight = 0
+    if names:
+        if NEGATIVE_RE.search(names):
+            weight -= 25
+        if POSITIVE_RE.search(names):
+            weight += 25
+    return weight, names
+
+
+def _is_hidden(attrs: List[Tuple[str, Optional[str]]]) -> bool:
+    for key, value in attrs:
+        if key == "hidden" or (key == "aria-hidden" and value == "true"):
+            return True
+        if key == "style" and value and re.search(r"display\s*:\s*none", value, re.IGNORECASE):
+            return True
+    return False
+
+
+class ArticleExtractor(HTMLParser):
+    """Incremental parser that extracts the title and main text of a page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.og_title = ""
+        self.first_h1 = ""
+        self._stack: List[Tuple[str, _Node]] = []  # Open elements as (tag, node)
+        self._skip_tag: Optional[str] = None
+        self._skip_depth = 0
+        self._link_depth = 0
+        self._in_title = False
+        self._in_h1 = False
+        self._pre_depth = 0
+        self._parts: List[str] = []
+        self._part_links = 0
+        self._blocks: List[_Block] = []
+        self._root = _Node("#root", None, 0)
+
+    def _current_node(self) -> _Node:
+        return self._stack[-1][1] if self._stack else self._root
+
+    def _block_owner(self) -> _Node:
+        """Innermost open block-level element - the paragraph that text belongs to."""
+        for tag, node in reversed(self._stack):
+            if tag in BLOCK_TAGS:
+                return node
+        return self._root
+
+    # -- parsing -----------------------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta":
+            attr = dict(attrs)
+            if attr.get("property") == "og:title" and attr.get("content"):
+                self.og_title = attr["content"].strip()
+            return
+        if tag == "title":
+            self._in_title = True
+            return
+
+        if self._skip_depth:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+
+        if tag == "br":
+            self._parts.append("\n" if self._pre_depth else " ")
+            return
+        if tag in VOID_TAGS:
+            return
+
+        if tag in SELF_NESTING_CLOSES and self._stack and self._stack[-1][0] == tag:
+            self.handle_endtag(tag)
+
+        weight, names = _class_weight(attrs)
+        unlikely = (
+            names
+            and UNLIKELY_RE.search(names)
+            and not MAYBE_RE.search(names)
+            and tag not in ("body", "html", "article", "main")
+        )
+        if tag in SKIP_TAGS or unlikely or _is_hidden(attrs):
+            # Skip until this element closes, counting nested elements of the
+            # same tag only, so unclosed <p>/<li> inside don't matter
+            self._skip_tag = tag
+            self._skip_depth = 1
+            return
+
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag == "a":
+            self._link_depth += 1
+        if tag == "pre":
+            self._pre_depth += 1
+        if tag == "h1" and not self.first_h1:
+            self._in_h1 = True
+
+        self._stack.append((tag, _Node(tag, self._current_node(), weight)))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+            return
+
+        if self._skip_depth:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+            return
+
+        # Close up to the matching element; stray end tags are ignored
+        if not any(open_tag == tag for open_tag, _ in self._stack):
+            return
+        while self._stack:
+            open_tag, _ = self._stack[-1]
+            if open_tag in BLOCK_TAGS:
+                self._flush()
+            self._stack.pop()
+            if open_tag == "a":
+                self._link_depth -= 1
+            elif open_tag == "pre":
+                self._pre_depth -= 1
+            elif open_tag == "h1":
+                self._in_h1 = False
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip_depth:
+            return
+        if self._in_h1:
+            self.first_h1 += data
+        self._parts.append(data)
+        if self._link_depth:
+            self._part_links += len(data.strip())
+
+    def _flush(self):
+        """Close the current run of text as a block owned by the innermost block element."""
+        if not self._parts:
+            return
+        raw = "".join(self._parts)
+        self._parts = []
+        link_chars, self._part_links = self._part_links, 0
+
+        if self._pre_depth:
+            text = raw.strip("\n")
+        else:
+            text = " ".join(raw.split())
+        if not text:
+            return
+
+        owner = self._block_owner()
+        self._blocks.append(_Block(owner, text, link_chars, owner.tag in HEADING_TAGS))
+
+        node = owner
+        while node is not None:
+            node.text_chars += len(text)
+            node.link_chars += link_chars
+            node = node.parent
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    # -- scoring -----------------------------------------------------------
+
+    def _score_blocks(self) -> List[_Node]:
+        candidates = []
+        for block in self._blocks:
+            if block.heading or len(block.text) < MIN_BLOCK_CHARS:
+                continue
+            score = 1 + block.text.count(",") + min(len(block.text) // 100, 3)
+
+            # Text directly inside a div counts as that div's paragraph
+            paragraph = block.node
+            for level, ancestor in enumerate((paragraph.parent, paragraph.parent and paragraph.parent.parent)):
+                if ancestor is None or ancestor is self._root:
+                    break
+                if ancestor.score is None:
+                    ancestor.score = TAG_SCORES.get(ancestor.tag, 0) + ancestor.weight
+                    candidates.append(ancestor)
+                ancestor.score += score if level == 0 else score / 2
+
+        for node in candidates:
+            node.score *= 1 - node.link_density()
+        return candidates
+
+    def _select_nodes(self) -> List[_Node]:
+        """Top candidate plus siblings that look like part of the same article."""
+        candidates = self._score_blocks()
+        if not candidates:
+            return []
+
+        top = max(candidates, key=lambda n: n.score)
+        threshold = max(10.0, top.score * 0.2)
+        selected = [top]
+        for node in candidates:
+            if node is not top and node.parent is top.parent and node.score >= threshold:
+                selected.append(node)
+        return selected
+
+    def result(self) -> Tuple[str, str]:
+        """
+        Finish parsing and return (title, content).
+
+        Content is the main text as blank-line separated paragraphs.
+        """
+        self.close()
+        selected = self._select_nodes()
+
+        paragraphs = []
+        for block in self._blocks:
+            if selected and not any(block.node.is_within(node) for node in selected):
+                continue
+            if block.link_chars / len(block.text) > MAX_LINK_DENSITY:
+                continue
+            paragraphs.append(block.text)
+        content = "\n\n".join(paragraphs)
+
+        # Nothing scored well enough (very short or unusual pages): keep all text
+        if len(content) < 100:
+            content = "\n\n".join(
+                b.text for b in self._blocks
+                if b.link_chars / len(b.text) <= MAX_LINK_DENSITY
+            )
+
+        return self._clean_title(), content
+
+    def _clean_title(self) -> str:
+        title = re.sub(r"\s+", " ", self.title).strip()
+        if title:
+            # Drop site names ("Article | Site")
+            for separator in [" | ", " - ", " :: ", " // ", " — "]:
+                if separator in title:
+                    title = title.split(separator)[0]
+            return title.strip()
+        for fallback in (self.og_title, self.first_h1):
+            fallback = re.sub(r"\s+", " ", fallback).strip()
+            if fallback:
+                return fallback
+        return "Untitled Article"
+
+
+def extract_article(html: str) -> Tuple[str, str]:
+    """Extract (title, content) from a complete HTML document."""
+    extractor = ArticleExtractor()
+    extractor.feed(html)
+    return extractor.result()
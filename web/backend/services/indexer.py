@@ -1,18 +1,34 @@
 """Filesystem indexer - syncs reports and logs with SQLite database."""
 
 import asyncio
+import re
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 import logging
 
 from config import REPORTS_DIR, LOGS_DIR, CONTENT_TYPES
-from database import upsert_report, init_db
-from services.parser import parse_report_markdown, parse_date_from_filename
+from database import (
+    upsert_report, init_db, upsert_activity_log, delete_activity_log, get_activity_logs
+)
+from services.parser import (
+    parse_report_markdown, parse_report_sections, parse_key_takeaways,
+    parse_date_from_filename, parse_activity_log
+)
+from services.flashcards import extract_flashcards
+from services.content_fetcher import canonicalize_url
 
 logger = logging.getLogger(__name__)
 
 
+def source_canonical_url(source: Optional[str]) -> Optional[str]:
+    """Canonical URL for a report's **Source** field, if it contains a URL."""
+    if not source:
+        return None
+    match = re.search(r"https?://[^\s)\]>]+", source)
+    return canonicalize_url(match.group(0)) if match else None
+
+
 async def index_report_file(filepath: Path, content_type: str) -> bool:
     """
     Parse and index a single report file.
@@ -40,12 +56,16 @@ async def index_report_file(filepath: Path, content_type: str) -> bool:
             "filepath": str(filepath),
             "title": parsed["title"] or filepath.stem,
             "source_url": parsed.get("source"),
+            "canonical_url": source_canonical_url(parsed.get("source")),
             "content_type": content_type,
             "created_at": created_at,
             "file_modified_at": datetime.fromtimestamp(stat.st_mtime),
             "summary": parsed.get("summary"),
             "word_count": len(content.split()),
             "content_text": parsed.get("text_content", ""),
+            "sections": parse_report_sections(content),
+            "key_takeaways": parse_key_takeaways(content),
+            "flashcards": [card.to_record() for card in extract_flashcards(content, filepath)],
         })
 
         logger.info(f"Indexed: {filepath.name}")
@@ -56,6 +76,65 @@ async def index_report_file(filepath: Path, content_type: str) -> bool:
         return False
 
 
+LOG_SECTIONS = ("videos", "articles", "papers", "other")
+
+
+async def index_log_file(filepath: Path) -> bool:
+    """
+    Parse and index a single activity log file (logs/YYYY-MM-DD.md).
+
+    Returns True if indexed successfully, False otherwise.
+    """
+    try:
+        try:
+            log_date = datetime.strptime(filepath.stem, "%Y-%m-%d").date().isoformat()
+        except ValueError:
+            logger.debug(f"Skipping non-log file: {filepath.name}")
+            return False
+
+        stat = filepath.stat()
+        parsed = parse_activity_log(filepath.read_text(encoding="utf-8"))
+
+        entries = [
+            {"section": section, **entry}
+            for section in LOG_SECTIONS
+            for entry in parsed[section]
+        ]
+
+        updated = await upsert_activity_log({
+            "log_date": log_date,
+            "filepath": str(filepath),
+            "file_modified_at": datetime.fromtimestamp(stat.st_mtime),
+            "entries": entries,
+        })
+
+        if updated:
+            logger.info(f"Indexed log: {filepath.name} ({len(entries)} entries)")
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to index log {filepath}: {e}")
+        return False
+
+
+async def index_logs():
+    """Sync logs/ with the activity_logs tables, dropping logs whose files are gone."""
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+
+    indexed = 0
+    for filepath in LOGS_DIR.glob("*.md"):
+        if filepath.name.startswith("."):
+            continue
+        if await index_log_file(filepath):
+            indexed += 1
+
+    for log in await get_activity_logs(limit=-1):  # -1 = no LIMIT in SQLite
+        if not Path(log["filepath"]).exists():
+            await delete_activity_log(log["log_date"])
+
+    return indexed
+
+
 async def run_initial_index():
     """
     Scan filesystem and sync with SQLite.
@@ -85,7 +164,9 @@ async def run_initial_index():
             else:
                 error_count += 1
 
-    logger.info(f"Indexing complete: {indexed_count} reports, {error_count} errors")
+    log_count = await index_logs()
+
+    logger.info(f"Indexing complete: {indexed_count} reports, {log_count} logs, {error_count} errors")
 
 
 def get_content_type_from_path(filepath: Path) -> Optional[str]:
@@ -149,11 +230,31 @@ class FileWatcher:
                         )
                         logger.debug(f"Re-indexing modified file: {filepath.name}")
 
+            class LogHandler(FileSystemEventHandler):
+                def _schedule(self, coro):
+                    if watcher._loop:
+                        asyncio.run_coroutine_threadsafe(coro, watcher._loop)
+
+                def on_created(self, event):
+                    if event.is_directory or not event.src_path.endswith('.md'):
+                        return
+                    self._schedule(index_log_file(Path(event.src_path)))
+
+                def on_modified(self, event):
+                    self.on_created(event)
+
+                def on_deleted(self, event):
+                    if event.is_directory or not event.src_path.endswith('.md'):
+                        return
+                    self._schedule(delete_activity_log(Path(event.src_path).stem))
+
             self._observer = Observer()
             handler = ReportHandler()
             self._observer.schedule(handler, str(REPORTS_DIR), recursive=True)
+            LOGS_DIR.mkdir(parents=True, exist_ok=True)
+            self._observer.schedule(LogHandler(), str(LOGS_DIR), recursive=False)
             self._observer.start()
-            logger.info(f"File watcher started for: {REPORTS_DIR}")
+            logger.info(f"File watcher started for: {REPORTS_DIR}, {LOGS_DIR}")
 
         except ImportError:
             logger.warning("watchdog not installed - run: pip install watchdog")
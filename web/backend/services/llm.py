@@ -0,0 +1,191 @@
+"""
+Shared Claude call path.
+
+Every service sends its static instructions (the prompts/*.md template or
+the service's built-in prompt) as a system block marked with
+cache_control, and only the variable content in the user message. Repeated
+calls with the same template - a batch of YouTube analyses, a run of Q&A
+questions - then read the template from Anthropic's prompt cache instead
+of paying for it again. Templates shorter than the model's minimum
+cacheable length (1024 tokens, 2048 for Haiku) are sent the same way but
+simply aren't cached.
+
+complete() returns the text plus a usage dict that includes cache write
+and read tokens, and cost accounts for cache pricing. Requests are checked
+against the per-request cost limit first (see services.token_budget), so
+the model that actually ran is returned too - which can also differ when
+the model is overloaded and the request is retried on its fallback (see
+services.model_router). Every request is recorded in the llm_usage ledger
+with its service, tokens, latency and cost.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from anthropic import Anthropic, APIStatusError
+
+from config import ANTHROPIC_API_KEY
+from database import record_llm_usage
+from services.model_router import fallback_model_id
+from services.token_budget import (
+    BudgetExceededError, estimate_tokens, check_request_cost, model_info_for_id
+)
+
+logger = logging.getLogger(__name__)
+
+# Prompt cache pricing relative to the model's base input price
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.10
+
+# Message Batches are billed at half the usual price
+BATCH_PRICE_MULTIPLIER = 0.5
+
+# Status code of overloaded_error responses
+OVERLOADED_STATUS = 529
+
+
+def get_client() -> Anthropic:
+    """Get Anthropic client."""
+    if not ANTHROPIC_API_KEY:
+        raise ValueError("ANTHROPIC_API_KEY not set. Create web/backend/.env with your API key.")
+    return Anthropic(api_key=ANTHROPIC_API_KEY)
+
+
+def cached_system(text: str) -> list[dict]:
+    """System prompt as a single text block marked for prompt caching."""
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+@dataclass
+class LLMResult:
+    """Text of a completion, its token usage and the model id used."""
+    text: str
+    usage: dict = field(default_factory=dict)
+    model: str = ""
+
+
+def usage_dict(usage) -> dict:
+    """Normalize an API usage object (cache fields may be missing or None)."""
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+    }
+
+
+def add_usage(total: dict, usage: dict) -> dict:
+    """Sum two usage dicts (returns a new dict)."""
+    keys = set(total) | set(usage)
+    return {key: total.get(key, 0) + usage.get(key, 0) for key in keys}
+
+
+def estimate_cost(usage: dict, model_info: dict) -> float:
+    """Dollar cost of a usage dict at the model's per-million-token prices."""
+    input_price = model_info["input_cost"] / 1_000_000
+    output_price = model_info["output_cost"] / 1_000_000
+    return (
+        usage.get("input_tokens", 0) * input_price
+        + usage.get("cache_creation_input_tokens", 0) * input_price * CACHE_WRITE_MULTIPLIER
+        + usage.get("cache_read_input_tokens", 0) * input_price * CACHE_READ_MULTIPLIER
+        + usage.get("output_tokens", 0) * output_price
+    )
+
+
+def format_usage(usage: dict) -> str:
+    """Short usage summary for job progress, e.g. '1200 in, 800 out, cache 0 written/3000 read'."""
+    return (
+        f"{usage.get('input_tokens', 0)} in, {usage.get('output_tokens', 0)} out, "
+        f"cache {usage.get('cache_creation_input_tokens', 0)} written/"
+        f"{usage.get('cache_read_input_tokens', 0)} read"
+    )
+
+
+async def record_usage(
+    service: str,
+    model_id: str,
+    usage: dict,
+    latency_ms: Optional[int] = None,
+    report_id: Optional[int] = None,
+    job_id: Optional[str] = None,
+    batch: bool = False,
+):
+    """Add a request to the usage ledger; failures are logged, never raised."""
+    model_info = model_info_for_id(model_id)
+    cost = estimate_cost(usage, model_info) if model_info else 0.0
+    if batch:
+        cost *= BATCH_PRICE_MULTIPLIER
+    try:
+        await record_llm_usage(service, model_id, usage, cost, latency_ms, report_id, job_id)
+    except Exception as e:
+        logger.error(f"Failed to record LLM usage for {service}: {e}")
+
+
+async def complete(
+    model_id: str,
+    user: str,
+    system: Optional[str] = None,
+    max_tokens: int = 1024,
+    client: Optional[Anthropic] = None,
+    service: str = "other",
+    report_id: Optional[int] = None,
+    job_id: Optional[str] = None,
+) -> LLMResult:
+    """
+    Run one Claude request in a worker thread.
+
+    Args:
+        model_id: API model id
+        user: The variable part of the request (content, question, ...)
+        system: Static instructions; sent as a cached system block
+        max_tokens: Output limit
+        client: Client to use (defaults to get_client())
+        service: Name the request is recorded under in the usage ledger
+        report_id: Report the request is about, if any
+        job_id: Analysis job the request belongs to, if any
+
+    Returns:
+        LLMResult with the response text and usage
+
+    Raises:
+        BudgetExceededError: If the request is over the cost limit
+    """
+    input_tokens = estimate_tokens(user) + estimate_tokens(system or "")
+    model_id = check_request_cost(model_id, input_tokens, max_tokens)
+    client = client or get_client()
+
+    kwargs = {
+        "model": model_id,
+        "max_tokens": max_tokens,
+        "messages": [{"role": "user", "content": user}],
+    }
+    if system:
+        kwargs["system"] = cached_system(system)
+
+    started = time.monotonic()
+    try:
+        response = await asyncio.to_thread(client.messages.create, **kwargs)
+    except APIStatusError as e:
+        # The SDK has already retried; try once more on another model
+        fallback = fallback_model_id(model_id) if e.status_code == OVERLOADED_STATUS else None
+        if not fallback:
+            raise
+        try:
+            fallback = check_request_cost(fallback, input_tokens, max_tokens)
+        except BudgetExceededError:
+            raise e
+        logger.warning(f"{model_id} overloaded; retrying {service} request on {fallback}")
+        model_id = kwargs["model"] = fallback
+        response = await asyncio.to_thread(client.messages.create, **kwargs)
+    latency_ms = round((time.monotonic() - started) * 1000)
+    usage = usage_dict(response.usage)
+
+    await record_usage(service, model_id, usage, latency_ms, report_id, job_id)
+
+    if usage["cache_read_input_tokens"] or usage["cache_creation_input_tokens"]:
+        logger.debug(f"Prompt cache: {format_usage(usage)}")
+
+    return LLMResult(text=response.content[0].text, usage=usage, model=model_id)
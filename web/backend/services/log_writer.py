@@ -0,0 +1,232 @@
+"""
+Activity log writer - serialized, append-only writes to logs/YYYY-MM-DD.md.
+
+All writers (analyses, digests) enqueue entries on a single asyncio queue.
+One consumer drains the queue in batches, appends each batch to the day's
+log with one fsync per file, and updates the activity log index in place,
+so concurrent analyses can't lose each other's entries.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from config import LOGS_DIR
+from database import append_activity_log_entries
+from services.indexer import index_log_file
+
+logger = logging.getLogger(__name__)
+
+# Section headers by content type
+SECTION_HEADERS = {
+    "youtube": "## Videos Watched",
+    "article": "## Articles Read",
+    "arxiv": "## Papers Reviewed",
+    "paper": "## Papers Reviewed",
+    "other": "## Other Content",
+}
+
+# Section header -> activity_log_entries.section (headers not listed aren't indexed)
+INDEXED_SECTIONS = {
+    "## Videos Watched": "videos",
+    "## Articles Read": "articles",
+    "## Papers Reviewed": "papers",
+    "## Other Content": "other",
+}
+
+MAX_BATCH_SIZE = 100
+
+
+class ActivityLogWriter:
+    """Single-consumer queue that appends entries to daily activity logs."""
+
+    def __init__(self, logs_dir: Path = LOGS_DIR):
+        self.logs_dir = logs_dir
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # log path -> (file size, last "## " header) as of our last write
+        self._last_section: dict[Path, tuple[int, Optional[str]]] = {}
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def append(
+        self,
+        section: str,
+        title: str,
+        link: str,
+        when: Optional[datetime] = None,
+    ):
+        """
+        Append "- [title](link) - HH:MM" under a section of the day's log.
+
+        Returns once the entry is written and fsynced.
+        """
+        when = when or datetime.now()
+        self._ensure_started()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put({
+            "date": when.strftime("%Y-%m-%d"),
+            "section": section,
+            "title": title,
+            "link": link,
+            "time": when.strftime("%H:%M"),
+            "future": future,
+        })
+        await future
+
+    async def log_report(self, title: str, report_path: Path, content_type: str):
+        """Add a report to today's activity log."""
+        section = SECTION_HEADERS.get(content_type, SECTION_HEADERS["other"])
+        # Create relative path from logs to reports
+        rel_path = f"../reports/{report_path.parent.name}/{report_path.name}"
+        await self.append(section, title, rel_path)
+
+    async def close(self):
+        """Flush pending entries and stop the consumer."""
+        if self._task and not self._task.done():
+            await self._queue.put(None)
+            await self._task
+        self._task = None
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            stop = False
+            while len(batch) < MAX_BATCH_SIZE and not self._queue.empty():
+                next_item = self._queue.get_nowait()
+                if next_item is None:
+                    stop = True
+                    break
+                batch.append(next_item)
+
+            try:
+                await self._write_batch(batch)
+                for entry in batch:
+                    if not entry["future"].done():
+                        entry["future"].set_result(None)
+            except Exception as e:
+                logger.exception("Failed to write activity log batch")
+                for entry in batch:
+                    if not entry["future"].done():
+                        entry["future"].set_exception(e)
+
+            if stop:
+                return
+
+    async def _write_batch(self, batch: list[dict]):
+        by_date: dict[str, list[dict]] = {}
+        for entry in batch:
+            by_date.setdefault(entry["date"], []).append(entry)
+
+        for log_date, entries in by_date.items():
+            log_path = self.logs_dir / f"{log_date}.md"
+            previous_mtime, mtime = await asyncio.to_thread(
+                self._append_to_file, log_path, log_date, entries
+            )
+            await self._update_index(log_path, log_date, entries, previous_mtime, mtime)
+
+        logger.info(f"Appended {len(batch)} activity log entries")
+
+    def _append_to_file(
+        self,
+        log_path: Path,
+        log_date: str,
+        entries: list[dict],
+    ) -> tuple[Optional[datetime], datetime]:
+        """Append entries with a single write + fsync. Returns (mtime before, mtime after)."""
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+
+        if log_path.exists():
+            stat = log_path.stat()
+            previous_mtime = datetime.fromtimestamp(stat.st_mtime)
+            current_section = self._read_last_section(log_path, stat.st_size)
+            text = "" if self._ends_with_newline(log_path, stat.st_size) else "\n"
+        else:
+            previous_mtime = None
+            current_section = None
+            text = f"# Activity Log - {log_date}\n"
+
+        # Group the batch by section, continuing the file's trailing section
+        # first, so interleaved writers don't produce a header per entry
+        order = {current_section: -1}
+        for entry in entries:
+            order.setdefault(entry["section"], len(order))
+        entries = sorted(entries, key=lambda e: order[e["section"]])
+
+        for entry in entries:
+            if entry["section"] != current_section:
+                text += f"\n{entry['section']}\n"
+                current_section = entry["section"]
+            text += f"- [{entry['title']}]({entry['link']}) - {entry['time']}\n"
+
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+
+        stat = log_path.stat()
+        self._last_section[log_path] = (stat.st_size, current_section)
+        return previous_mtime, datetime.fromtimestamp(stat.st_mtime)
+
+    @staticmethod
+    def _ends_with_newline(log_path: Path, size: int) -> bool:
+        if size == 0:
+            return True
+        with open(log_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _read_last_section(self, log_path: Path, size: int) -> Optional[str]:
+        """Last "## " header in the file, cached until someone else changes it."""
+        cached = self._last_section.get(log_path)
+        if cached and cached[0] == size:
+            return cached[1]
+
+        last = None
+        for line in log_path.read_text(encoding="utf-8").splitlines():
+            if line.startswith("## "):
+                last = line.strip()
+        return last
+
+    async def _update_index(
+        self,
+        log_path: Path,
+        log_date: str,
+        entries: list[dict],
+        previous_mtime: Optional[datetime],
+        mtime: datetime,
+    ):
+        indexed = [
+            {
+                "section": INDEXED_SECTIONS[e["section"]],
+                "title": e["title"],
+                "report_path": e["link"],
+                "time": e["time"],
+            }
+            for e in entries
+            if e["section"] in INDEXED_SECTIONS
+        ]
+
+        try:
+            in_sync = await append_activity_log_entries(
+                log_date, str(log_path), previous_mtime, mtime, indexed
+            )
+            if not in_sync:
+                await index_log_file(log_path)
+        except Exception as e:
+            logger.error(f"Failed to update log index for {log_path.name}: {e}")
+
+
+# Shared writer used by all services
+log_writer = ActivityLogWriter()
@@ -0,0 +1,318 @@
+"""
+Bulk Claude work through the Message Batches API.
+
+Bulk jobs - knowledge-graph extract-all, batch URL submissions and the RSS
+backlog - don't need answers within seconds, so instead of one request per
+item they're submitted as Message Batches, which cost half as much and
+don't count against the interactive rate limits. Each batch and the
+destination of every request in it (a report for concepts, a job for
+analyses) is stored in the database; BatchPoller checks in-progress
+batches every BATCH_POLL_INTERVAL seconds - resuming after a restart - and
+when a batch ends fans its results out to reports, concepts and jobs.
+"""
+
+import asyncio
+import logging
+import os
+from typing import List, Optional
+
+from config import MODELS
+from database import (
+    create_llm_batch,
+    get_unfinished_llm_batches,
+    get_pending_llm_batch_items,
+    set_llm_batch_item_status,
+    finish_llm_batch,
+    get_report_by_id,
+    update_job_status,
+    update_job_progress,
+)
+from services.llm import get_client, cached_system, usage_dict, format_usage, record_usage
+from services.model_router import route_model
+from services.token_budget import BudgetExceededError, estimate_tokens, check_request_cost
+
+logger = logging.getLogger(__name__)
+
+BATCH_POLL_INTERVAL = float(os.getenv("BATCH_POLL_INTERVAL", "60"))
+
+# Requests per submitted batch (the API allows up to 100,000 / 256 MB)
+BATCH_MAX_REQUESTS = 10000
+
+# Sources fetched at once while preparing an analysis batch
+BATCH_FETCH_CONCURRENCY = int(os.getenv("BATCH_FETCH_CONCURRENCY", "4"))
+
+
+async def _submit(kind: str, requests: List[dict], payloads: dict) -> List[str]:
+    """Create batches for the requests, record them and start polling. Returns batch ids."""
+    client = get_client()
+    batch_ids = []
+
+    for start in range(0, len(requests), BATCH_MAX_REQUESTS):
+        chunk = requests[start:start + BATCH_MAX_REQUESTS]
+        batch = await asyncio.to_thread(client.messages.batches.create, requests=chunk)
+        await create_llm_batch(
+            batch.id, kind, [(r["custom_id"], payloads[r["custom_id"]]) for r in chunk]
+        )
+        batch_ids.append(batch.id)
+        logger.info(f"Submitted {kind} message batch {batch.id} ({len(chunk)} requests)")
+
+    batch_poller.start()
+    return batch_ids
+
+
+async def submit_concept_batch(report_ids: List[int]) -> List[str]:
+    """
+    Extract concepts from reports in a message batch.
+
+    Args:
+        report_ids: Reports to extract from (ones without content are skipped)
+
+    Returns:
+        Submitted batch ids
+    """
+    from services.concept_extractor import EXTRACTION_PROMPT, build_extraction_prompt
+
+    model_id = MODELS[route_model("concepts")]["id"]
+    requests = []
+    payloads = {}
+    for report_id in report_ids:
+        report = await get_report_by_id(report_id)
+        if not report or not report.get("content"):
+            continue
+
+        custom_id = f"report-{report_id}"
+        title = report.get("title", "")
+        requests.append({
+            "custom_id": custom_id,
+            "params": {
+                "model": model_id,
+                "max_tokens": 2048,
+                "system": cached_system(EXTRACTION_PROMPT),
+                "messages": [{"role": "user", "content": build_extraction_prompt(report["content"], title)}],
+            },
+        })
+        payloads[custom_id] = {"report_id": report_id, "title": title, "model": model_id}
+
+    if not requests:
+        return []
+    return await _submit("concepts", requests, payloads)
+
+
+async def submit_analysis_batch(items: List[dict]) -> List[str]:
+    """
+    Fetch sources and analyze them in a message batch.
+
+    Each item is a dict with job_id, url, content_type, model (a MODELS key)
+    and optionally rss_item_id (marked processed once the report is saved)
+    and force (refetch instead of using the fetch cache).
+    Jobs must already exist; they stay running until the batch ends. Items
+    that fail to fetch fail their job, and content too long for a single
+    request is analyzed directly (map-reduce) instead.
+
+    Returns:
+        Submitted batch ids
+    """
+    from services.analyzer import LONG_CONTENT_TOKENS, load_prompt, analyze_content
+    from services.content_fetcher import fetch_content
+
+    semaphore = asyncio.Semaphore(BATCH_FETCH_CONCURRENCY)
+
+    async def fetch(item: dict):
+        async with semaphore:
+            job_id = item["job_id"]
+            try:
+                await update_job_status(job_id, "running")
+                await update_job_progress(job_id, f"Fetching {item['content_type']}...")
+                return item, await fetch_content(item["url"], item["content_type"], use_cache=not item.get("force"))
+            except Exception as e:
+                logger.error(f"Batch fetch failed for {item['url']}: {e}")
+                await update_job_status(job_id, "failed", error_message=f"Error: {e}")
+                return item, None
+
+    requests = []
+    payloads = {}
+    long_items = []
+    for item, fetched in await asyncio.gather(*(fetch(item) for item in items)):
+        if fetched is None:
+            continue
+        content, title, source = fetched
+        model_key = route_model("analysis", estimate_tokens(content), item.get("model"))
+
+        if estimate_tokens(content) > LONG_CONTENT_TOKENS:
+            long_items.append((item, content, title, source, model_key))
+            continue
+
+        job_id = item["job_id"]
+        system = load_prompt(item["content_type"])
+        user = f"Content to analyze:\n\n{content}"
+        try:
+            model_id = check_request_cost(
+                MODELS[model_key]["id"], estimate_tokens(system) + estimate_tokens(user), 8192
+            )
+        except BudgetExceededError as e:
+            await update_job_status(job_id, "failed", error_message=str(e))
+            continue
+
+        requests.append({
+            "custom_id": job_id,
+            "params": {
+                "model": model_id,
+                "max_tokens": 8192,
+                "system": cached_system(system),
+                "messages": [{"role": "user", "content": user}],
+            },
+        })
+        payloads[job_id] = {
+            "job_id": job_id,
+            "title": title,
+            "source": source,
+            "content_type": item["content_type"],
+            "rss_item_id": item.get("rss_item_id"),
+            "model": model_id,
+        }
+
+    batch_ids = []
+    if requests:
+        try:
+            batch_ids = await _submit("analysis", requests, payloads)
+        except Exception as e:
+            logger.exception("Failed to submit analysis batch")
+            for job_id in payloads:
+                await update_job_status(job_id, "failed", error_message=f"Batch submission failed: {e}")
+        else:
+            for job_id in payloads:
+                await update_job_progress(job_id, f"Queued in message batch {', '.join(batch_ids)}")
+
+    for item, content, title, source, model_key in long_items:
+        async for _ in analyze_content(content, title, source, item["content_type"], model_key, item["job_id"]):
+            pass
+        if item.get("rss_item_id"):
+            _mark_rss_processed(item["rss_item_id"])
+
+    return batch_ids
+
+
+def _mark_rss_processed(item_id: str):
+    from services.rss import mark_item_processed
+    mark_item_processed(item_id)
+
+
+async def _apply_result(kind: str, payload: dict, result) -> Optional[str]:
+    """
+    Send one batch result where it belongs.
+
+    Returns an error message if the request didn't succeed.
+    """
+    from services.analyzer import save_analysis
+    from services.concept_extractor import parse_extraction, store_extraction
+
+    if result.type != "succeeded":
+        error = getattr(getattr(result, "error", None), "error", None)
+        return getattr(error, "message", None) or f"Batch request {result.type}"
+
+    message = result.message
+    text = message.content[0].text
+    usage = usage_dict(message.usage)
+
+    await record_usage(
+        "concepts" if kind == "concepts" else "analysis", payload.get("model", message.model), usage,
+        report_id=payload.get("report_id"), job_id=payload.get("job_id"), batch=True,
+    )
+
+    if kind == "concepts":
+        extraction = parse_extraction(text)
+        await store_extraction(payload["report_id"], extraction, payload.get("title", ""))
+        logger.info(f"Stored {len(extraction['concepts'])} concepts for report {payload['report_id']}")
+    else:
+        job_id = payload["job_id"]
+        await update_job_progress(job_id, f"Tokens: {format_usage(usage)} (batch)")
+        await save_analysis(job_id, payload["title"], payload["source"], payload["content_type"], text)
+        if payload.get("rss_item_id"):
+            _mark_rss_processed(payload["rss_item_id"])
+    return None
+
+
+class BatchPoller:
+    """Polls unfinished message batches and applies their results when they end."""
+
+    def __init__(self, interval: float = BATCH_POLL_INTERVAL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._rescan = False
+
+    def start(self):
+        """Start polling, or make a running poller pick up newly submitted batches."""
+        self._rescan = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop polling; unfinished batches resume on the next start."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            self._rescan = False
+            batches = await get_unfinished_llm_batches()
+            if not batches:
+                if self._rescan:
+                    continue
+                return
+
+            for batch in batches:
+                try:
+                    await self.poll(batch)
+                except Exception as e:
+                    logger.error(f"Failed to poll message batch {batch['id']}: {e}")
+
+            await asyncio.sleep(self.interval)
+
+    async def poll(self, batch: dict) -> bool:
+        """Check one batch; if it has ended, apply its results. Returns whether it ended."""
+        client = get_client()
+        remote = await asyncio.to_thread(client.messages.batches.retrieve, batch["id"])
+        if remote.processing_status != "ended":
+            return False
+
+        batch_id, kind = batch["id"], batch["kind"]
+        pending = await get_pending_llm_batch_items(batch_id)
+
+        # Results are streamed as JSONL; read them one at a time off the event loop
+        results = iter(await asyncio.to_thread(client.messages.batches.results, batch_id))
+        while pending:
+            entry = await asyncio.to_thread(next, results, None)
+            if entry is None:
+                break
+            payload = pending.pop(entry.custom_id, None)
+            if payload is None:
+                continue  # Applied before a restart
+
+            try:
+                error = await _apply_result(kind, payload, entry.result)
+            except Exception as e:
+                logger.exception(f"Failed to apply result {entry.custom_id} of batch {batch_id}")
+                error = f"Failed to apply batch result: {e}"
+
+            if error and kind == "analysis":
+                await update_job_status(payload["job_id"], "failed", error_message=error)
+            await set_llm_batch_item_status(batch_id, entry.custom_id, "failed" if error else "succeeded")
+
+        # Requests without a result
+        for custom_id, payload in pending.items():
+            if kind == "analysis":
+                await update_job_status(payload["job_id"], "failed", error_message="No result in message batch")
+            await set_llm_batch_item_status(batch_id, custom_id, "failed")
+
+        await finish_llm_batch(batch_id, "processed")
+        logger.info(f"Message batch {batch_id} ended; results applied")
+        return True
+
+
+# Shared poller, started with the app and whenever a batch is submitted
+batch_poller = BatchPoller()
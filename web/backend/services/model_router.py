@@ -0,0 +1,95 @@
+"""
+Task-aware model selection.
+
+Each kind of Claude request (the `service` name it's recorded under in the
+usage ledger) has a default model: small structured tasks - concept JSON,
+credibility scores, follow-up suggestions, translation, chunk notes - run
+on Haiku, and tasks that synthesize across sources move up to a larger
+model once their input passes a size threshold. A model the user picked
+explicitly always wins.
+
+Defaults can be overridden per task with MODEL_OVERRIDES, e.g.
+"concepts=sonnet,qa=opus". When a model is overloaded, requests are retried
+once on its fallback (MODEL_FALLBACKS, default opus->sonnet, sonnet->haiku,
+haiku->sonnet).
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from config import MODELS, DEFAULT_MODEL
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TaskRoute:
+    """Model for a task, and optionally a larger one for inputs above large_input_tokens."""
+    model: str
+    large_model: Optional[str] = None
+    large_input_tokens: int = 0
+
+
+TASK_ROUTES = {
+    "analysis": TaskRoute(DEFAULT_MODEL),
+    "analysis_chunk": TaskRoute("haiku"),
+    "qa": TaskRoute("haiku", large_model="sonnet", large_input_tokens=3000),
+    "qa_followup": TaskRoute("haiku"),
+    "comparison": TaskRoute("sonnet"),
+    "concepts": TaskRoute("haiku"),
+    "credibility": TaskRoute("haiku"),
+    "translation": TaskRoute("haiku"),
+}
+
+
+def _parse_pairs(value: str) -> dict[str, str]:
+    """Parse "a=b,c=d" into a dict, ignoring entries naming unknown models."""
+    pairs = {}
+    for entry in value.split(","):
+        key, _, model = entry.partition("=")
+        key, model = key.strip(), model.strip()
+        if not key or not model:
+            continue
+        if model not in MODELS:
+            logger.warning(f"Ignoring model route {entry.strip()!r}: unknown model {model!r}")
+            continue
+        pairs[key] = model
+    return pairs
+
+
+MODEL_OVERRIDES = _parse_pairs(os.getenv("MODEL_OVERRIDES", ""))
+MODEL_FALLBACKS = _parse_pairs(os.getenv("MODEL_FALLBACKS", "opus=sonnet,sonnet=haiku,haiku=sonnet"))
+
+
+def route_model(task: str, input_tokens: int = 0, requested: Optional[str] = None) -> str:
+    """
+    Pick the model for a request.
+
+    Args:
+        task: Task name (a TASK_ROUTES key)
+        input_tokens: Estimated prompt size
+        requested: Model key the user chose, if any
+
+    Returns:
+        A MODELS key
+    """
+    if requested in MODELS:
+        return requested
+    if task in MODEL_OVERRIDES:
+        return MODEL_OVERRIDES[task]
+
+    route = TASK_ROUTES.get(task, TaskRoute(DEFAULT_MODEL))
+    if route.large_model and input_tokens > route.large_input_tokens:
+        return route.large_model
+    return route.model
+
+
+def fallback_model_id(model_id: str) -> Optional[str]:
+    """API model id to retry on when model_id is overloaded (None if there isn't one)."""
+    for key, info in MODELS.items():
+        if info["id"] == model_id:
+            fallback = MODEL_FALLBACKS.get(key)
+            return MODELS[fallback]["id"] if fallback and fallback != key else None
+    return None
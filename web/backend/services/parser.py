@@ -80,6 +80,102 @@ def parse_report_markdown(content: str) -> dict:
     return result
 
 
+def slugify_heading(heading: str) -> str:
+    """Convert a heading to a GitHub-style anchor ('## 1. Summary' -> '1-summary')."""
+    slug = heading.strip().lower()
+    slug = re.sub(r"[^\w\s-]", "", slug)
+    slug = re.sub(r"\s", "-", slug)
+    return slug
+
+
+def parse_report_sections(content: str) -> list[dict]:
+    """
+    Split a report into its H1/H2 sections.
+
+    Each section covers its heading line up to the next H1/H2 heading, so
+    H3 subsections stay inside their parent. Headings inside fenced code
+    blocks are ignored. Text before the first heading becomes a section
+    with an empty heading.
+
+    Returns list of dicts with: ordinal, heading, level, anchor, text,
+    char_start, char_end (offsets into the original content).
+    """
+    sections = []
+    anchor_counts: dict[str, int] = {}
+
+    def close_section(heading: str, level: int, start: int, body_start: int, end: int):
+        text = content[body_start:end].strip()
+        if not heading and not text:
+            return
+
+        anchor = slugify_heading(heading)
+        if anchor in anchor_counts:
+            anchor_counts[anchor] += 1
+            anchor = f"{anchor}-{anchor_counts[anchor]}"
+        else:
+            anchor_counts[anchor] = 0
+
+        sections.append({
+            "ordinal": len(sections),
+            "heading": heading,
+            "level": level,
+            "anchor": anchor,
+            "text": text,
+            "char_start": start,
+            "char_end": end,
+        })
+
+    heading, level, start, body_start = "", 0, 0, 0
+    in_code_block = False
+    offset = 0
+
+    for line in content.splitlines(keepends=True):
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_code_block = not in_code_block
+        elif not in_code_block:
+            match = re.match(r"(#{1,2})\s+(.+?)\s*#*\s*$", line)
+            if match:
+                close_section(heading, level, start, body_start, offset)
+                heading = match.group(2).strip()
+                level = len(match.group(1))
+                start = offset
+                body_start = offset + len(line)
+        offset += len(line)
+
+    close_section(heading, level, start, body_start, len(content))
+
+    return sections
+
+
+def parse_key_takeaways(content: str, limit: int = 3) -> list[str]:
+    """
+    Extract the first few list items under a "Key Takeaways"/"Main Points" header.
+
+    Each takeaway is stripped of list markers and capped at 200 characters.
+    """
+    takeaways = []
+    in_takeaways = False
+
+    for line in content.split("\n"):
+        if "key takeaway" in line.lower() or "main points" in line.lower():
+            in_takeaways = True
+            continue
+
+        if in_takeaways:
+            if line.startswith("## "):
+                break  # Next section
+            if line.strip().startswith(("1.", "2.", "3.", "4.", "5.", "-", "*")):
+                # Clean up the takeaway
+                takeaway = line.strip().lstrip("0123456789.-*) ").strip()
+                if takeaway and len(takeaway) > 10:
+                    takeaways.append(takeaway[:200])  # Limit length
+                    if len(takeaways) >= limit:
+                        break
+
+    return takeaways
+
+
 def parse_date_from_filename(filename: str) -> Optional[datetime]:
     """
     Extract date from filename like '2025-12-23_title.md'.
@@ -108,6 +204,8 @@ def parse_activity_log(content: str) -> dict:
     ## Articles Read
     ...
 
+    Sections may repeat; entries from every occurrence are collected.
+
     Returns dict with: date, videos, articles, papers, other
     """
     result = {
@@ -128,15 +226,15 @@ def parse_activity_log(content: str) -> dict:
         "Videos Watched": "videos",
         "Articles Read": "articles",
         "Papers Reviewed": "papers",
+        "Other Content": "other",
         "Other": "other",
     }
 
     for section_name, key in sections.items():
         # Find section content
-        pattern = rf"##\s*{re.escape(section_name)}\s*\n(.*?)(?=\n##|\Z)"
-        match = re.search(pattern, content, re.DOTALL)
-
-        if match:
+        pattern = rf"##\s*{re.escape(section_name)}[ \t]*\n(.*?)(?=\n##|\Z)"
+        # A section can appear more than once in append-only logs
+        for match in re.finditer(pattern, content, re.DOTALL):
             section_content = match.group(1)
             # Parse entries: - [Title](path) - HH:MM
             entry_pattern = r"-\s*\[([^\]]+)\]\(([^)]+)\)\s*-\s*(\d{1,2}:\d{2})"
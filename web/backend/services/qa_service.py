@@ -7,13 +7,17 @@ Searches relevant reports and uses Claude to generate answers with citations.
 import logging
 from typing import Optional
 
-from anthropic import Anthropic
-
-from config import ANTHROPIC_API_KEY, MODELS
-from database import search_reports, get_report_by_id
+from config import MODELS
+from database import search_reports, search_report_sections, get_report_by_id
+from services.llm import complete, estimate_cost
+from services.model_router import route_model
+from services.token_budget import estimate_tokens, fit_to_budget, model_info_for_id, truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
+# Token budget for the sources included with a question
+QA_CONTEXT_TOKENS = 8000
+
 QA_SYSTEM_PROMPT = """You are a helpful assistant that answers questions based on the user's personal knowledge base.
 
 You will be given:
@@ -34,17 +38,13 @@ If the question cannot be answered from the sources, respond:
 """
 
 
-def get_client() -> Anthropic:
-    """Get Anthropic client."""
-    if not ANTHROPIC_API_KEY:
-        raise ValueError("ANTHROPIC_API_KEY not set")
-    return Anthropic(api_key=ANTHROPIC_API_KEY)
-
-
 async def find_relevant_reports(question: str, limit: int = 5) -> list[dict]:
     """
     Find reports relevant to the question using keyword search.
 
+    Uses section-level search so only the matching sections of each report
+    are included; falls back to whole reports if no sections match.
+
     Args:
         question: The user's question
         limit: Maximum number of reports to return
@@ -52,6 +52,35 @@ async def find_relevant_reports(question: str, limit: int = 5) -> list[dict]:
     Returns:
         List of report dicts with content
     """
+    section_hits = await search_report_sections(question, limit=limit * 4)
+
+    if section_hits:
+        by_report: dict[int, dict] = {}
+        for hit in section_hits:
+            report = by_report.get(hit["report_id"])
+            if report is None:
+                if len(by_report) >= limit:
+                    continue
+                report = by_report[hit["report_id"]] = {
+                    "id": hit["report_id"],
+                    "title": hit["title"],
+                    "content_type": hit["content_type"],
+                    "source_url": hit.get("source_url"),
+                    "sections": [],
+                }
+            report["sections"].append(hit)
+
+        relevant_reports = []
+        for report in by_report.values():
+            sections = sorted(report.pop("sections"), key=lambda s: s["ordinal"])
+            report["content"] = "\n\n".join(
+                f"## {s['heading']}\n{s['text']}" if s["heading"] else s["text"]
+                for s in sections
+            )
+            relevant_reports.append(report)
+
+        return relevant_reports
+
     # Search for relevant reports
     search_results = await search_reports(question, limit=limit)
 
@@ -71,46 +100,37 @@ async def find_relevant_reports(question: str, limit: int = 5) -> list[dict]:
     return relevant_reports
 
 
-def build_context(reports: list[dict], max_chars: int = 30000) -> str:
+def build_context(reports: list[dict], max_tokens: int = QA_CONTEXT_TOKENS) -> str:
     """
     Build context string from reports, respecting token limits.
 
+    The budget is shared across reports: short ones are included whole and
+    longer ones are cut back on section or sentence boundaries.
+
     Args:
         reports: List of report dicts
-        max_chars: Maximum characters for context
+        max_tokens: Token budget for the whole context
 
     Returns:
         Formatted context string
     """
-    context_parts = []
-    total_chars = 0
+    headers = [
+        f"\n--- SOURCE: {report['title']} ({report['content_type']}) ---\n\n"
+        for report in reports
+    ]
+    footer = "\n\n---\n"
+    overhead = sum(estimate_tokens(h) + estimate_tokens(footer) for h in headers)
 
-    for report in reports:
-        content = report["content"]
+    contents = fit_to_budget([r["content"] for r in reports], max_tokens - overhead)
 
-        # Truncate individual report if too long
-        if len(content) > 8000:
-            content = content[:8000] + "\n\n[Content truncated...]"
-
-        section = f"""
---- SOURCE: {report['title']} ({report['content_type']}) ---
-
-{content}
-
----
-"""
-        if total_chars + len(section) > max_chars:
-            break
-
-        context_parts.append(section)
-        total_chars += len(section)
-
-    return "\n".join(context_parts)
+    return "\n".join(
+        f"{header}{content}{footer}" for header, content in zip(headers, contents)
+    )
 
 
 async def answer_question(
     question: str,
-    model_key: str = "sonnet",
+    model_key: Optional[str] = None,
     max_reports: int = 5,
 ) -> dict:
     """
@@ -118,7 +138,7 @@ async def answer_question(
 
     Args:
         question: The user's question
-        model_key: Which model to use (haiku, sonnet, opus)
+        model_key: Which model to use (haiku, sonnet, opus); None picks by context size
         max_reports: Maximum reports to include in context
 
     Returns:
@@ -149,24 +169,27 @@ USER QUESTION:
 
 Please provide a comprehensive answer with citations to the sources."""
 
-        # Call Claude
-        client = get_client()
-        model_info = MODELS.get(model_key, MODELS["sonnet"])
+        # Call Claude (the system prompt is cached across questions)
+        model_info = MODELS[route_model("qa", estimate_tokens(context), model_key)]
 
-        response = client.messages.create(
-            model=model_info["id"],
-            max_tokens=2048,
+        result = await complete(
+            model_info["id"],
+            user_prompt,
             system=QA_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_prompt}]
+            max_tokens=2048,
+            service="qa",
         )
 
-        answer = response.content[0].text
-        tokens_used = response.usage.input_tokens + response.usage.output_tokens
+        answer = result.text
+        usage = result.usage
+        model_info = model_info_for_id(result.model) or model_info  # May be downgraded by cost limit
+        tokens_used = (
+            usage["input_tokens"] + usage["cache_creation_input_tokens"]
+            + usage["cache_read_input_tokens"] + usage["output_tokens"]
+        )
 
         # Calculate cost
-        input_cost = (response.usage.input_tokens / 1_000_000) * model_info["input_cost"]
-        output_cost = (response.usage.output_tokens / 1_000_000) * model_info["output_cost"]
-        total_cost = input_cost + output_cost
+        total_cost = estimate_cost(usage, model_info)
 
         # Build sources list
         sources = [
@@ -183,6 +206,8 @@ Please provide a comprehensive answer with citations to the sources."""
             "answer": answer,
             "sources": sources,
             "tokens_used": tokens_used,
+            "cache_creation_tokens": usage["cache_creation_input_tokens"],
+            "cache_read_tokens": usage["cache_read_input_tokens"],
             "cost": round(total_cost, 4),
             "model": model_info["name"],
         }
@@ -209,26 +234,21 @@ async def get_followup_suggestions(question: str, answer: str) -> list[str]:
         List of suggested follow-up questions
     """
     try:
-        client = get_client()
-        model_info = MODELS["haiku"]  # Use Haiku for cost efficiency
+        model_info = MODELS[route_model("qa_followup")]  # Haiku by default for cost efficiency
 
         prompt = f"""Based on this Q&A, suggest 3 brief follow-up questions the user might want to ask.
 
 Question: {question}
 
-Answer: {answer[:500]}...
+Answer: {truncate_to_tokens(answer, 125, marker="...")}
 
 Return ONLY a JSON array of 3 question strings, nothing else. Example:
 ["Question 1?", "Question 2?", "Question 3?"]"""
 
-        response = client.messages.create(
-            model=model_info["id"],
-            max_tokens=256,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        result = await complete(model_info["id"], prompt, max_tokens=256, service="qa_followup")
 
         import json
-        suggestions = json.loads(response.content[0].text)
+        suggestions = json.loads(result.text)
         return suggestions[:3]
 
     except Exception as e:
@@ -213,10 +213,12 @@ async def fetch_feed(url: str) -> Dict[str, Any]:
     }
 
 
-async def check_feed(feed: RSSFeed) -> List[RSSItem]:
+async def check_feed(feed: RSSFeed, force: bool = False) -> List[RSSItem]:
     """
     Check a feed for new items.
 
+    force queues items even if their URL already has a report.
+
     Returns list of new items found.
     """
     feed_data = await fetch_feed(feed.url)
@@ -253,12 +255,12 @@ async def check_feed(feed: RSSFeed) -> List[RSSItem]:
 
         # Auto-queue if enabled
         if feed.auto_queue:
-            await queue_items(new_items, feed.category)
+            await queue_items(new_items, feed.category, force=force)
 
     return new_items
 
 
-async def check_all_feeds() -> Dict[str, List[RSSItem]]:
+async def check_all_feeds(force: bool = False) -> Dict[str, List[RSSItem]]:
     """
     Check all enabled feeds for new items.
 
@@ -272,7 +274,7 @@ async def check_all_feeds() -> Dict[str, List[RSSItem]]:
             continue
 
         try:
-            new_items = await check_feed(feed)
+            new_items = await check_feed(feed, force=force)
             if new_items:
                 results[feed.id] = new_items
                 logger.info(f"Found {len(new_items)} new items in {feed.title}")
@@ -282,8 +284,17 @@ async def check_all_feeds() -> Dict[str, List[RSSItem]]:
     return results
 
 
-async def queue_items(items: List[RSSItem], category: str):
-    """Add items to the processing queue."""
+async def queue_items(items: List[RSSItem], category: str, force: bool = False):
+    """
+    Add items to the processing queue.
+
+    Items are matched by canonical URL: ones already queued are skipped,
+    and ones that already have a report are marked processed instead of
+    queued (unless force is set).
+    """
+    from services.analyzer import find_existing_report
+    from services.content_fetcher import canonicalize_url
+
     queue_file = INBOX_DIR / "queue.txt"
     INBOX_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -294,27 +305,43 @@ async def queue_items(items: List[RSSItem], category: str):
             if line.strip() and not line.startswith("#"):
                 parts = line.split(" | ")
                 if parts:
-                    existing.add(parts[0].strip())
+                    existing.add(canonicalize_url(parts[0].strip()))
 
     # Add new items
     new_entries = []
+    queued_ids = set()
+    processed_ids = set()
     for item in items:
-        if item.url and item.url not in existing:
-            timestamp = datetime.now().isoformat()
-            new_entries.append(f"{item.url} | {category} | {timestamp}")
-            item.queued = True
+        if not item.url:
+            continue
+        canonical_url, report = await find_existing_report(item.url)
+        if canonical_url in existing:
+            continue
+        if report and not force:
+            logger.info(f"Skipping already analyzed item: {item.title}")
+            item.processed = True
+            processed_ids.add(item.id)
+            continue
+
+        timestamp = datetime.now().isoformat()
+        new_entries.append(f"{item.url} | {category} | {timestamp}")
+        existing.add(canonical_url)
+        item.queued = True
+        queued_ids.add(item.id)
 
     if new_entries:
         with open(queue_file, "a") as f:
             for entry in new_entries:
                 f.write(entry + "\n")
 
+    if queued_ids or processed_ids:
         # Update items
         all_items = _load_items()
-        item_ids = {i.id for i in items}
         for i in all_items:
-            if i.id in item_ids:
+            if i.id in queued_ids:
                 i.queued = True
+            elif i.id in processed_ids:
+                i.processed = True
         _save_items(all_items)
 
 
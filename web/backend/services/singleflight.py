@@ -0,0 +1,81 @@
+"""
+Coalescing of identical concurrent requests.
+
+When two browser tabs, or the extension and the UI, ask for the same
+translation, comparison, credibility check or concept extraction at the
+same time, only the first call runs; later callers with the same key wait
+for it and get the same result (or exception). Keys are tuples of
+(task, report id, parameters...).
+
+The shared call keeps running while anyone is waiting for it: a caller
+that disconnects just stops waiting, and the call is cancelled only when
+every caller has gone. Results are shared objects, so callers must not
+modify them.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its outcome."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+
+    def in_flight(self, key: Hashable) -> int:
+        """Number of callers waiting on the call for key (0 if none is running)."""
+        call = self._calls.get(key)
+        return call.waiters if call else 0
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await fn(), or the call already in flight for key.
+
+        Args:
+            key: Identifies identical requests, e.g. ("translation", report_id, "es")
+            fn: Starts the call; only invoked if nothing is in flight for key
+
+        Returns:
+            The shared call's result
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, key=key, call=call: self._forget(key, call))
+        else:
+            logger.debug(f"Joining in-flight request {key!r}")
+
+        call.waiters += 1
+        try:
+            # Shielded so one caller being cancelled doesn't cancel the others' call
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Everyone stopped waiting
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+# Shared across routers
+singleflight = SingleFlight()
+
@@ -0,0 +1,166 @@
+"""
+Token budgets for Claude requests.
+
+Services size their prompts in tokens rather than characters: content is
+estimated locally (no API call), cut back on section, paragraph or sentence
+boundaries instead of mid-word, and a budget shared by several inputs (Q&A
+sources, the two sides of a comparison) is split so short inputs are kept
+whole and the rest goes to the longer ones.
+
+Every request sent through services.llm.complete is also checked against
+MAX_REQUEST_COST (dollars, worst case: estimated input plus max_tokens of
+output). Over the limit it is downgraded to the most capable cheaper model
+that fits, or rejected when COST_POLICY=reject or nothing fits.
+"""
+
+import logging
+import os
+import re
+from typing import List, Optional
+
+from config import MODELS
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUEST_COST = float(os.getenv("MAX_REQUEST_COST", "2.00"))  # <= 0 disables the check
+COST_POLICY = os.getenv("COST_POLICY", "downgrade")  # downgrade or reject
+
+TRUNCATION_MARKER = "\n\n[Content truncated...]"
+
+# Headings left dangling at the end of truncated text
+_TRAILING_HEADINGS = re.compile(r"(?:\n#{1,6} [^\n]*\s*)+$")
+
+# Cut points, best first, with the share of the budget each must keep to be used
+_BOUNDARIES = [
+    (re.compile(r"\n(?=#{1,6} )"), 0.85),  # Before a markdown heading
+    (re.compile(r"\n\s*\n"), 0.85),  # Paragraph break
+    (re.compile(r"(?<=[.!?])[\"')\]]*\s"), 0.5),  # Sentence end
+    (re.compile(r"\s"), 0.0),  # Word break
+]
+
+
+class BudgetExceededError(ValueError):
+    """A request's estimated cost is over MAX_REQUEST_COST."""
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local token estimate.
+
+    ~4 characters per token for ASCII text; other characters (CJK, accented
+    letters, symbols) are counted as a token each, which errs on the high side.
+    """
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def _prefix_within(text: str, max_tokens: int) -> int:
+    """Length of the longest prefix of text estimated at no more than max_tokens."""
+    # Every character costs at least a quarter token, so the answer is below this
+    low, high = 0, min(len(text), max_tokens * 4 + 3)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = TRUNCATION_MARKER) -> str:
+    """
+    Fit text into max_tokens (marker included), cutting at the best boundary.
+
+    Prefers cutting before a heading, then at a paragraph, sentence or word
+    break, as long as the cut keeps enough of the budget.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    end = _prefix_within(text, max(0, max_tokens - estimate_tokens(marker)))
+    window = text[:end]
+    cut = end
+    for pattern, min_keep in _BOUNDARIES:
+        last = None
+        for last in pattern.finditer(window):
+            pass
+        if last and last.start() >= end * min_keep:
+            cut = last.start()
+            break
+
+    return _TRAILING_HEADINGS.sub("", text[:cut]).rstrip() + marker
+
+
+def allocate_budget(sizes: List[int], total_tokens: int) -> List[int]:
+    """
+    Split total_tokens across inputs of the given sizes (in tokens).
+
+    Inputs smaller than an even share get all they need; what they leave
+    is shared evenly by the larger ones.
+    """
+    allocations = [0] * len(sizes)
+    remaining = max(0, total_tokens)
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    for position, index in enumerate(order):
+        share = remaining // (len(sizes) - position)
+        allocations[index] = min(sizes[index], share)
+        remaining -= allocations[index]
+    return allocations
+
+
+def fit_to_budget(texts: List[str], total_tokens: int, marker: str = TRUNCATION_MARKER) -> List[str]:
+    """Truncate texts so together they fit total_tokens, using allocate_budget."""
+    allocations = allocate_budget([estimate_tokens(t) for t in texts], total_tokens)
+    return [truncate_to_tokens(t, budget, marker) for t, budget in zip(texts, allocations)]
+
+
+def model_info_for_id(model_id: str) -> Optional[dict]:
+    """MODELS entry for an API model id (None if it isn't configured)."""
+    return next((info for info in MODELS.values() if info["id"] == model_id), None)
+
+
+def max_request_cost(model_info: dict, input_tokens: int, max_output_tokens: int) -> float:
+    """Worst-case dollar cost of a request (full output, no cache discount)."""
+    return (
+        input_tokens * model_info["input_cost"] + max_output_tokens * model_info["output_cost"]
+    ) / 1_000_000
+
+
+def check_request_cost(model_id: str, input_tokens: int, max_output_tokens: int) -> str:
+    """
+    Apply the cost limit to a request.
+
+    Returns the model id to use - the requested one, or a cheaper one if it
+    was over MAX_REQUEST_COST and COST_POLICY allows downgrading.
+
+    Raises:
+        BudgetExceededError: If no allowed model fits under the limit
+    """
+    model_info = model_info_for_id(model_id)
+    if MAX_REQUEST_COST <= 0 or model_info is None:
+        return model_id
+
+    cost = max_request_cost(model_info, input_tokens, max_output_tokens)
+    if cost <= MAX_REQUEST_COST:
+        return model_id
+
+    if COST_POLICY != "reject":
+        cheaper = sorted(
+            (info for info in MODELS.values() if info["input_cost"] < model_info["input_cost"]),
+            key=lambda info: info["input_cost"],
+            reverse=True,
+        )
+        for info in cheaper:
+            if max_request_cost(info, input_tokens, max_output_tokens) <= MAX_REQUEST_COST:
+                logger.warning(
+                    f"Request estimated at ${cost:.2f} on {model_info['name']} "
+                    f"(limit ${MAX_REQUEST_COST:.2f}); using {info['name']}"
+                )
+                return info["id"]
+
+    raise BudgetExceededError(
+        f"Request estimated at ${cost:.2f} (~{input_tokens} input tokens on "
+        f"{model_info['name']}) exceeds the ${MAX_REQUEST_COST:.2f} limit"
+    )
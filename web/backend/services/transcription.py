@@ -1,15 +1,19 @@
 """Audio transcription service using Whisper (API or local)."""
 
 import asyncio
+import re
 import subprocess
 import logging
+import math
 import os
 import tempfile
+from functools import partial
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Awaitable, Callable, List, Optional, Tuple
 import httpx
 
 from config import INBOX_DIR, PROJECT_ROOT
+from services.whisper_pool import whisper_pool
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +24,24 @@ OPENAI_API_URL = "https://api.openai.com/v1/audio/transcriptions"
 # Supported audio formats
 AUDIO_FORMATS = {".mp3", ".mp4", ".mpeg", ".mpga", ".m4a", ".wav", ".webm", ".ogg", ".flac"}
 
+# OpenAI API upload limit
+API_MAX_BYTES = 25 * 1024 * 1024
+
+# Long audio is split into overlapping segments that are transcribed in parallel
+SEGMENT_SECONDS = int(os.getenv("TRANSCRIPTION_SEGMENT_SECONDS", "600"))
+SEGMENT_OVERLAP_SECONDS = 5
+TRANSCRIPTION_WORKERS = int(os.getenv("TRANSCRIPTION_WORKERS", "4"))
+
+# Removing the overlap at each segment boundary: the words compared on
+# each side cover the overlap at a fast speaking rate, and a match must be
+# at least STITCH_MIN_MATCH_WORDS long and within STITCH_EDGE_SLACK_WORDS of
+# the boundary (Whisper often garbles words cut off at a segment edge)
+STITCH_MAX_WORDS_PER_SECOND = 4
+STITCH_MIN_MATCH_WORDS = 3
+STITCH_EDGE_SLACK_WORDS = 4
+
+ProgressCallback = Callable[[str], Awaitable[None]]
+
 
 class TranscriptionError(Exception):
     """Error during transcription process."""
@@ -108,7 +130,7 @@ async def transcribe_with_openai_api(audio_path: Path) -> str:
 
     # Check file size (OpenAI limit is 25MB)
     file_size = audio_path.stat().st_size
-    if file_size > 25 * 1024 * 1024:
+    if file_size > API_MAX_BYTES:
         raise TranscriptionError(
             f"Audio file too large ({file_size / 1024 / 1024:.1f}MB). "
             "OpenAI API limit is 25MB. Consider splitting the audio."
@@ -165,6 +187,9 @@ async def transcribe_with_local_whisper(
     """
     Transcribe audio using local Whisper installation.
 
+    Uses the warm worker pool when the openai-whisper package is installed,
+    otherwise runs the whisper CLI (which reloads the model every call).
+
     Args:
         audio_path: Path to audio file
         model: Whisper model size (tiny, base, small, medium, large)
@@ -177,6 +202,14 @@ async def transcribe_with_local_whisper(
     """
     logger.info(f"Transcribing with local Whisper ({model}): {audio_path.name}")
 
+    if whisper_pool.available():
+        try:
+            transcript = await whisper_pool.transcribe(audio_path, model)
+        except RuntimeError as e:
+            raise TranscriptionError(f"Local Whisper failed: {str(e)[:200]}")
+        logger.info(f"Transcription complete: {len(transcript)} characters")
+        return transcript
+
     returncode, stdout, stderr = await asyncio.to_thread(
         _run_local_whisper_sync, audio_path, model
     )
@@ -199,18 +232,222 @@ async def transcribe_with_local_whisper(
     return transcript
 
 
+def _probe_duration_sync(audio_path: Path) -> Tuple[int, str, str]:
+    """Get audio duration with ffprobe (sync for thread pool)."""
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            str(audio_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    return result.returncode, result.stdout, result.stderr
+
+
+async def probe_duration(audio_path: Path) -> Optional[float]:
+    """Audio duration in seconds, or None if ffprobe is unavailable or fails."""
+    try:
+        returncode, stdout, stderr = await asyncio.to_thread(_probe_duration_sync, audio_path)
+    except FileNotFoundError:
+        logger.warning("ffprobe not found; long audio will be transcribed in one piece")
+        return None
+
+    if returncode != 0:
+        logger.warning(f"ffprobe failed for {audio_path.name}: {stderr[:200]}")
+        return None
+
+    try:
+        return float(stdout.strip())
+    except ValueError:
+        return None
+
+
+def plan_segments(
+    duration: float,
+    segment_seconds: float = SEGMENT_SECONDS,
+    overlap_seconds: float = SEGMENT_OVERLAP_SECONDS,
+) -> List[Tuple[float, float]]:
+    """
+    Split a duration into overlapping (start, length) segments.
+
+    Consecutive segments share overlap_seconds of audio so words cut at a
+    boundary appear whole in one of them. A short tail is folded into the
+    last segment instead of becoming its own request.
+    """
+    segments = []
+    start = 0.0
+    step = segment_seconds - overlap_seconds
+    while start < duration:
+        end = start + segment_seconds
+        if duration - end < max(overlap_seconds * 2, segment_seconds / 10):
+            end = duration
+        segments.append((start, end - start))
+        if end >= duration:
+            break
+        start += step
+    return segments
+
+
+def _extract_segment_sync(audio_path: Path, start: float, length: float, output_path: Path) -> Tuple[int, str, str]:
+    """Cut one segment as 16kHz mono MP3 with ffmpeg (sync for thread pool)."""
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-nostdin", "-y",
+            "-loglevel", "error",
+            "-ss", f"{start:.3f}",
+            "-t", f"{length:.3f}",
+            "-i", str(audio_path),
+            "-vn",
+            "-ac", "1",
+            "-ar", "16000",
+            "-b:a", "64k",  # ~4.8MB per 10 minutes, well under the API limit
+            str(output_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    return result.returncode, result.stdout, result.stderr
+
+
+def _stitch_key(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _find_overlap(tail: List[str], head: List[str], min_words: int, slack: int) -> Optional[Tuple[int, int]]:
+    """
+    Longest run shared by the end of tail and the start of head.
+
+    The run must end within slack words of the end of tail and start
+    within slack words of the start of head. Returns (start in tail,
+    start in head), or None if there's no run of at least min_words.
+    """
+    for size in range(min(len(tail), len(head)), min_words - 1, -1):
+        for tail_end in range(len(tail), max(size, len(tail) - slack) - 1, -1):
+            run = tail[tail_end - size:tail_end]
+            for head_start in range(0, min(slack, len(head) - size) + 1):
+                if head[head_start:head_start + size] == run:
+                    return tail_end - size, head_start
+    return None
+
+
+def stitch_transcripts(
+    parts: List[str],
+    overlap_seconds: float = SEGMENT_OVERLAP_SECONDS,
+    min_match_words: int = STITCH_MIN_MATCH_WORDS,
+    edge_slack_words: int = STITCH_EDGE_SLACK_WORDS,
+) -> str:
+    """
+    Join segment transcripts, removing text repeated in the overlaps.
+
+    At each boundary, the longest run of matching words (ignoring case and
+    punctuation) that ends at the end of the text so far and starts at the
+    start of the next segment (give or take edge_slack_words) is treated as
+    the overlap; the next segment's version is kept. Without such a match
+    the segments are simply concatenated.
+    """
+    window = math.ceil(overlap_seconds * STITCH_MAX_WORDS_PER_SECOND) + edge_slack_words
+
+    words: List[str] = []
+    for part in parts:
+        next_words = part.split()
+        if not words:
+            words = next_words
+            continue
+
+        tail = words[-window:]
+        head = next_words[:window]
+        match = _find_overlap(
+            [_stitch_key(w) for w in tail], [_stitch_key(w) for w in head], min_match_words, edge_slack_words
+        )
+
+        if match:
+            tail_start, head_start = match
+            words = words[:len(words) - len(tail) + tail_start] + next_words[head_start:]
+        else:
+            words = words + next_words
+
+    return " ".join(words)
+
+
+async def transcribe_segmented(
+    audio_path: Path,
+    duration: float,
+    transcribe: Callable[[Path], Awaitable[str]],
+    workers: int = TRANSCRIPTION_WORKERS,
+    progress: Optional[ProgressCallback] = None,
+) -> str:
+    """
+    Transcribe long audio as overlapping segments in parallel.
+
+    Each worker cuts its segment with ffmpeg and transcribes it, with at
+    most `workers` segments in flight. Transcripts are stitched in order.
+    """
+    segments = plan_segments(duration)
+    total = len(segments)
+    semaphore = asyncio.Semaphore(max(1, workers))
+    done = 0
+
+    logger.info(f"Transcribing {audio_path.name} in {total} segments ({workers} workers)")
+    if progress:
+        await progress(f"Transcribing {total} segments...")
+
+    with tempfile.TemporaryDirectory(prefix="transcribe-") as tmp_dir:
+        async def run_segment(index: int, start: float, length: float) -> str:
+            nonlocal done
+            async with semaphore:
+                segment_path = Path(tmp_dir) / f"segment_{index:04d}.mp3"
+                returncode, _, stderr = await asyncio.to_thread(
+                    _extract_segment_sync, audio_path, start, length, segment_path
+                )
+                if returncode != 0:
+                    raise TranscriptionError(f"ffmpeg failed on segment {index + 1}: {stderr[:200]}")
+
+                text = await transcribe(segment_path)
+
+            done += 1
+            logger.info(f"Transcribed segment {index + 1}/{total} ({len(text)} chars)")
+            if progress:
+                await progress(f"Transcribed segment {done}/{total}")
+            return text
+
+        tasks = [
+            asyncio.create_task(run_segment(i, start, length))
+            for i, (start, length) in enumerate(segments)
+        ]
+        try:
+            parts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    return stitch_transcripts(parts)
+
+
 async def transcribe_audio(
     audio_path: Path,
     use_api: bool = True,
-    local_model: str = "base"
+    local_model: str = "base",
+    progress: Optional[ProgressCallback] = None,
 ) -> str:
     """
     Transcribe audio file using Whisper (API or local).
 
+    Audio longer than one segment is split into overlapping segments that
+    are transcribed in parallel (requires ffmpeg/ffprobe); shorter audio,
+    or audio whose duration can't be probed, is sent in one piece.
+
     Args:
         audio_path: Path to audio file
         use_api: If True, use OpenAI API; if False, use local Whisper
         local_model: Model size for local Whisper
+        progress: Optional async callback for per-segment progress messages
 
     Returns:
         Transcribed text
@@ -225,36 +462,61 @@ async def transcribe_audio(
         )
 
     if use_api and OPENAI_API_KEY:
-        return await transcribe_with_openai_api(audio_path)
+        transcribe = transcribe_with_openai_api
     else:
-        return await transcribe_with_local_whisper(audio_path, local_model)
+        transcribe = partial(transcribe_with_local_whisper, model=local_model)
+
+    duration = await probe_duration(audio_path)
+    if duration is not None and duration > SEGMENT_SECONDS + SEGMENT_OVERLAP_SECONDS:
+        return await transcribe_segmented(audio_path, duration, transcribe, progress=progress)
+
+    return await transcribe(audio_path)
 
 
 async def transcribe_url(
     url: str,
     use_api: bool = True,
     local_model: str = "base",
-    keep_audio: bool = False
+    keep_audio: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    use_cache: bool = True,
 ) -> Tuple[str, str]:
     """
     Download and transcribe audio from a URL.
 
+    Transcripts are cached by canonical source id and transcription backend
+    (API or local model), so transcribing the same video or episode again
+    the same way skips both the download and Whisper.
+
     Args:
         url: URL to audio/video content
         use_api: If True, use OpenAI API; if False, use local Whisper
         local_model: Model size for local Whisper
         keep_audio: If True, don't delete the downloaded audio file
+        progress: Optional async callback for per-segment progress messages
+        use_cache: Set False to re-transcribe and overwrite the cached transcript
 
     Returns:
         Tuple of (transcript_text, audio_title)
     """
+    from services.content_fetcher import canonical_source_id, fetch_cache
+
+    backend = "api" if use_api and OPENAI_API_KEY else f"local-{local_model}"
+    cache_key = f"transcript:{backend}:{canonical_source_id(url)}"
+    if use_cache and not keep_audio:
+        cached = await asyncio.to_thread(fetch_cache.get, cache_key)
+        if cached:
+            logger.info(f"Transcript cache hit: {cache_key}")
+            return cached["text"], cached["title"]
+
     # Download audio
     audio_path = await download_audio(url)
     title = audio_path.stem
 
     try:
         # Transcribe
-        transcript = await transcribe_audio(audio_path, use_api, local_model)
+        transcript = await transcribe_audio(audio_path, use_api, local_model, progress)
+        await asyncio.to_thread(fetch_cache.put, cache_key, transcript, title=title, source=url)
         return transcript, title
     finally:
         # Clean up audio file unless requested to keep
@@ -279,7 +541,11 @@ async def check_whisper_availability() -> dict:
     if OPENAI_API_KEY:
         result["api"] = True
 
-    # Check local Whisper
+    # Check local Whisper (Python package for the worker pool, or the CLI)
+    if whisper_pool.available():
+        result["local"] = True
+        return result
+
     try:
         proc = await asyncio.to_thread(
             subprocess.run,
@@ -1,19 +1,26 @@
 """
 Text-to-Speech Service - Generate audio versions of reports.
 
-Uses OpenAI's TTS API to convert report summaries to audio.
+Uses OpenAI's TTS API to convert report summaries to audio. Speech text is
+split into paragraph/sentence-aligned chunks that are synthesized
+concurrently and cached by content hash, so editing a report only
+re-synthesizes the chunks that changed.
 """
 
+import asyncio
+import json
 import os
 import logging
 import hashlib
+import re
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 import httpx
 
 from config import PROJECT_ROOT
-from database import get_report_by_id
+from database import get_report_by_id, get_report_sections
+from services.parser import parse_report_sections
 
 logger = logging.getLogger(__name__)
 
@@ -37,39 +44,131 @@ VOICES = {
 
 DEFAULT_VOICE = "nova"
 
+TTS_MODEL = "tts-1"
+
+# Chunking: the API accepts up to 4096 characters per request
+CHUNK_MAX_CHARS = 1200
+CHUNK_MIN_CHARS = 300
+CHUNK_BOUNDARY_MODULUS = 3  # ~1 in 3 paragraphs may end a chunk once it's past the minimum
+
+# Concurrent requests per generation, and retries on 429/5xx
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+TTS_MAX_RETRIES = 3
+
+# Chunk audio cache, keyed by content hash
+CHUNKS_DIR = AUDIO_DIR / "chunks"
+
+
+class TTSError(Exception):
+    """Error during speech synthesis."""
+    pass
+
 
 def get_audio_path(report_id: int, voice: str) -> Path:
     """Get the audio file path for a report."""
     return AUDIO_DIR / f"report_{report_id}_{voice}.mp3"
 
 
-def extract_summary_text(content: str, max_chars: int = 4000) -> str:
+def get_manifest_path(report_id: int, voice: str) -> Path:
+    """Chunk list the report's audio file was built from."""
+    return AUDIO_DIR / f"report_{report_id}_{voice}.json"
+
+
+def chunk_hash(text: str, voice: str) -> str:
+    """Cache key for one synthesized chunk."""
+    return hashlib.sha256(f"{TTS_MODEL}|{voice}|{text}".encode("utf-8")).hexdigest()
+
+
+def get_chunk_path(digest: str) -> Path:
+    return CHUNKS_DIR / digest[:2] / f"{digest}.mp3"
+
+
+def _split_long_paragraph(paragraph: str, max_chars: int) -> list[str]:
+    """Pack the sentences of an oversized paragraph into pieces of at most max_chars."""
+    pieces = []
+    current = ""
+    for sentence in re.split(r'(?<=[.!?])\s+', paragraph):
+        # A single sentence longer than the limit is split on whitespace
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+
+    if current:
+        pieces.append(current)
+    return [p for p in pieces if p]
+
+
+def split_into_chunks(
+    text: str,
+    max_chars: int = CHUNK_MAX_CHARS,
+    min_chars: int = CHUNK_MIN_CHARS,
+) -> list[str]:
     """
-    Extract the most important parts of a report for TTS.
+    Split speech text into paragraph/sentence-aligned chunks.
 
-    Prioritizes: title, executive summary, key takeaways.
+    Paragraphs are grouped into chunks of at most max_chars. Once a chunk
+    has min_chars, it ends after any paragraph whose hash marks a boundary,
+    so boundaries depend on nearby content rather than on everything
+    before it: an edit only changes the chunks around it and the rest
+    stay cached.
     """
-    lines = content.split('\n')
-    sections = []
-    current_section = []
-    current_header = ""
-
-    for line in lines:
-        if line.startswith('# '):
-            if current_section:
-                sections.append((current_header, '\n'.join(current_section)))
-            current_header = line[2:].strip()
-            current_section = []
-        elif line.startswith('## '):
-            if current_section:
-                sections.append((current_header, '\n'.join(current_section)))
-            current_header = line[3:].strip()
-            current_section = []
+    units = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) > max_chars:
+            units.extend(_split_long_paragraph(paragraph, max_chars))
         else:
-            current_section.append(line)
+            units.append(paragraph)
+
+    chunks = []
+    current = ""
+    for unit in units:
+        if current and len(current) + 2 + len(unit) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{unit}" if current else unit
+
+        boundary = int(hashlib.md5(unit.encode("utf-8")).hexdigest()[:8], 16) % CHUNK_BOUNDARY_MODULUS == 0
+        if len(current) >= min_chars and boundary:
+            chunks.append(current)
+            current = ""
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def extract_summary_text(
+    content: str,
+    max_chars: Optional[int] = None,
+    sections: Optional[list[dict]] = None,
+) -> str:
+    """
+    Extract the most important parts of a report for TTS.
 
-    if current_section:
-        sections.append((current_header, '\n'.join(current_section)))
+    Prioritizes: title, executive summary, key takeaways. Without
+    max_chars the whole report is read, priority sections first.
+    Uses precomputed sections when given, otherwise parses content.
+    """
+    if max_chars is None:
+        max_chars = float("inf")
+
+    if sections is None:
+        sections = parse_report_sections(content)
+    sections = [(s["heading"], s["text"]) for s in sections]
 
     # Prioritize sections
     priority_keywords = [
@@ -119,8 +218,6 @@ def extract_summary_text(content: str, max_chars: int = 4000) -> str:
 
 def clean_for_speech(text: str) -> str:
     """Clean text for better TTS output."""
-    import re
-
     # Remove markdown formatting
     text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)  # Bold
     text = re.sub(r'\*([^*]+)\*', r'\1', text)  # Italic
@@ -141,6 +238,115 @@ def clean_for_speech(text: str) -> str:
     return text
 
 
+async def _synthesize(client: httpx.AsyncClient, text: str, voice: str) -> bytes:
+    """Call the TTS API for one chunk, backing off on rate limits and server errors."""
+    for attempt in range(TTS_MAX_RETRIES + 1):
+        response = await client.post(
+            TTS_API_URL,
+            headers={
+                "Authorization": f"Bearer {OPENAI_API_KEY}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": TTS_MODEL,
+                "input": text,
+                "voice": voice,
+                "response_format": "mp3",
+            },
+            timeout=60.0,
+        )
+
+        if response.status_code == 200:
+            return response.content
+
+        if (response.status_code == 429 or response.status_code >= 500) and attempt < TTS_MAX_RETRIES:
+            try:
+                delay = float(response.headers.get("retry-after", 2 ** attempt))
+            except ValueError:
+                delay = 2 ** attempt
+            logger.warning(f"TTS API {response.status_code}, retrying in {delay}s")
+            await asyncio.sleep(delay)
+            continue
+
+        logger.error(f"TTS API error: {response.status_code} - {response.text}")
+        raise TTSError(f"TTS API error: {response.status_code}")
+
+
+async def synthesize_chunk(
+    client: httpx.AsyncClient,
+    text: str,
+    voice: str,
+    semaphore: asyncio.Semaphore,
+) -> tuple[Path, bool]:
+    """
+    Return the cached audio for a chunk, synthesizing it if needed.
+
+    Returns (chunk path, whether it was synthesized now).
+    """
+    chunk_path = get_chunk_path(chunk_hash(text, voice))
+    if chunk_path.exists():
+        return chunk_path, False
+
+    async with semaphore:
+        audio = await _synthesize(client, text, voice)
+
+    chunk_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = chunk_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(audio)
+    tmp_path.replace(chunk_path)
+    return chunk_path, True
+
+
+async def get_speech_chunks(report_id: int) -> list[str]:
+    """
+    Build the speech text for a report and split it into chunks.
+
+    Raises TTSError if the report is missing or too short.
+    """
+    # Prefer sections stored at index time; fall back to reading the file
+    sections = await get_report_sections(report_id)
+    content = ""
+    if not sections:
+        report = await get_report_by_id(report_id)
+        if not report:
+            raise TTSError(f"Report {report_id} not found")
+
+        content = report.get("content", "")
+        if not content:
+            raise TTSError("Report has no content")
+
+    # Extract and clean text
+    summary = extract_summary_text(content, sections=sections or None)
+    speech_text = clean_for_speech(summary)
+
+    if len(speech_text) < 50:
+        raise TTSError("Not enough content to generate audio")
+
+    return split_into_chunks(speech_text)
+
+
+def _load_manifest(report_id: int, voice: str) -> Optional[dict]:
+    try:
+        return json.loads(get_manifest_path(report_id, voice).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_report_audio(report_id: int, voice: str, chunk_paths: list[Path], hashes: list[str]):
+    """Concatenate chunk MP3s into the report's audio file and record its manifest."""
+    audio_path = get_audio_path(report_id, voice)
+    tmp_path = audio_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as out:
+        for chunk_path in chunk_paths:
+            out.write(chunk_path.read_bytes())
+    tmp_path.replace(audio_path)
+
+    get_manifest_path(report_id, voice).write_text(
+        json.dumps({"model": TTS_MODEL, "voice": voice, "chunks": hashes}),
+        encoding="utf-8",
+    )
+
+
 async def generate_audio(
     report_id: int,
     voice: str = DEFAULT_VOICE,
@@ -149,10 +355,13 @@ async def generate_audio(
     """
     Generate audio for a report.
 
+    The report file is rebuilt whenever its speech chunks change; only
+    chunks missing from the cache are sent to the API.
+
     Args:
         report_id: The report ID
         voice: TTS voice to use
-        force_regenerate: Regenerate even if cached
+        force_regenerate: Re-synthesize every chunk, ignoring caches
 
     Returns:
         Dict with audio file path and metadata
@@ -165,67 +374,116 @@ async def generate_audio(
 
     audio_path = get_audio_path(report_id, voice)
 
-    # Check cache
-    if audio_path.exists() and not force_regenerate:
+    try:
+        chunks = await get_speech_chunks(report_id)
+    except TTSError as e:
+        return {"error": str(e)}
+
+    hashes = [chunk_hash(text, voice) for text in chunks]
+    duration_estimate = sum(len(text) for text in chunks) // 15  # Rough estimate: 15 chars/sec
+
+    # Check cache: the file is current if it was built from the same chunks
+    manifest = _load_manifest(report_id, voice)
+    if audio_path.exists() and not force_regenerate and manifest and manifest.get("chunks") == hashes:
         return {
             "audio_path": str(audio_path.relative_to(PROJECT_ROOT)),
             "voice": voice,
+            "duration_estimate": duration_estimate,
+            "chunks": len(chunks),
             "cached": True,
         }
 
-    # Get report
-    report = await get_report_by_id(report_id)
-    if not report:
-        return {"error": f"Report {report_id} not found"}
-
-    content = report.get("content", "")
-    if not content:
-        return {"error": "Report has no content"}
-
-    # Extract and clean text
-    summary = extract_summary_text(content)
-    speech_text = clean_for_speech(summary)
-
-    if len(speech_text) < 50:
-        return {"error": "Not enough content to generate audio"}
+    if force_regenerate:
+        for digest in hashes:
+            get_chunk_path(digest).unlink(missing_ok=True)
 
     try:
-        # Call OpenAI TTS API
+        semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
         async with httpx.AsyncClient() as client:
-            response = await client.post(
-                TTS_API_URL,
-                headers={
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "tts-1",
-                    "input": speech_text,
-                    "voice": voice,
-                    "response_format": "mp3",
-                },
-                timeout=60.0,
-            )
-
-            if response.status_code != 200:
-                logger.error(f"TTS API error: {response.status_code} - {response.text}")
-                return {"error": f"TTS API error: {response.status_code}"}
-
-            # Save audio file
-            audio_path.write_bytes(response.content)
-
-            return {
-                "audio_path": str(audio_path.relative_to(PROJECT_ROOT)),
-                "voice": voice,
-                "duration_estimate": len(speech_text) // 15,  # Rough estimate: 15 chars/sec
-                "cached": False,
-            }
+            results = await asyncio.gather(*[
+                synthesize_chunk(client, text, voice, semaphore) for text in chunks
+            ])
+
+        chunk_paths = [path for path, _ in results]
+        synthesized = sum(1 for _, created in results if created)
+        await asyncio.to_thread(_write_report_audio, report_id, voice, chunk_paths, hashes)
+
+        logger.info(
+            f"Generated audio for report {report_id} ({voice}): "
+            f"{synthesized}/{len(chunks)} chunks synthesized"
+        )
+        return {
+            "audio_path": str(audio_path.relative_to(PROJECT_ROOT)),
+            "voice": voice,
+            "duration_estimate": duration_estimate,
+            "chunks": len(chunks),
+            "chunks_synthesized": synthesized,
+            "cached": False,
+        }
 
     except Exception as e:
         logger.exception(f"TTS generation failed: {e}")
         return {"error": str(e)}
 
 
+async def plan_audio(report_id: int, voice: str) -> dict:
+    """
+    Work out what playing a report's audio needs.
+
+    Returns dict with voice, chunks, and whether the audio file on disk is
+    current. Raises TTSError if audio can't be produced.
+    """
+    if voice not in VOICES:
+        raise TTSError(f"Invalid voice: {voice}")
+
+    chunks = await get_speech_chunks(report_id)
+    hashes = [chunk_hash(text, voice) for text in chunks]
+    manifest = _load_manifest(report_id, voice)
+    current = (
+        get_audio_path(report_id, voice).exists()
+        and manifest is not None
+        and manifest.get("chunks") == hashes
+    )
+
+    if not current and not OPENAI_API_KEY:
+        raise TTSError("OPENAI_API_KEY not set. Add it to web/backend/.env")
+
+    return {"voice": voice, "chunks": chunks, "hashes": hashes, "current": current}
+
+
+async def iter_progressive_audio(report_id: int, voice: str, chunks: list[str]) -> AsyncIterator[bytes]:
+    """
+    Stream a report's audio chunk by chunk while later chunks are still synthesizing.
+
+    All chunks are scheduled up front (bounded by TTS_CONCURRENCY, in order),
+    and each is yielded as soon as it and every chunk before it is ready.
+    When the stream completes, the full file is written like generate_audio.
+    If the client disconnects, pending synthesis is cancelled; finished
+    chunks stay cached.
+    """
+    hashes = [chunk_hash(text, voice) for text in chunks]
+    semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
+
+    async with httpx.AsyncClient() as client:
+        tasks = [
+            asyncio.create_task(synthesize_chunk(client, text, voice, semaphore))
+            for text in chunks
+        ]
+        try:
+            chunk_paths = []
+            for task in tasks:
+                chunk_path, _ = await task
+                chunk_paths.append(chunk_path)
+                yield await asyncio.to_thread(chunk_path.read_bytes)
+
+            await asyncio.to_thread(_write_report_audio, report_id, voice, chunk_paths, hashes)
+            logger.info(f"Streamed and saved audio for report {report_id} ({voice})")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
 async def get_available_audio(report_id: int) -> list[dict]:
     """Get all available audio versions for a report."""
     available = []
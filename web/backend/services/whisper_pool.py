@@ -0,0 +1,244 @@
+"""
+Warm local Whisper worker pool.
+
+Loading Whisper weights takes longer than transcribing a short clip, so
+instead of running the whisper CLI per file, a few worker processes load
+the model once and take jobs from a shared queue. Workers are started on
+the first job and shut down after WHISPER_IDLE_TIMEOUT seconds without
+work, which frees the model's memory between batches.
+
+Requires the openai-whisper package in this environment; without it,
+transcription falls back to the whisper CLI.
+"""
+
+import asyncio
+import importlib.util
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+CPU_COUNT = os.cpu_count() or 1
+
+# Each worker holds its own copy of the model; by default use one worker
+# per 4 cores and split the cores between them for torch's own threading
+LOCAL_WHISPER_WORKERS = int(os.getenv("LOCAL_WHISPER_WORKERS", str(max(1, CPU_COUNT // 4))))
+WHISPER_IDLE_TIMEOUT = float(os.getenv("WHISPER_IDLE_TIMEOUT", "300"))
+
+
+def _worker_main(job_queue, result_queue, num_threads: int):
+    """Worker process: keep the last used model loaded and transcribe jobs until told to stop."""
+    try:
+        import whisper
+    except ImportError as e:
+        whisper = None
+        import_error = str(e)
+
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+    models = {}
+    while True:
+        job = job_queue.get()
+        if job is None:
+            break
+
+        job_id, audio_path, model_name, language = job
+        try:
+            if whisper is None:
+                raise RuntimeError(f"openai-whisper not importable: {import_error}")
+            if model_name not in models:
+                models.clear()  # Keep at most one model in memory
+                models[model_name] = whisper.load_model(model_name)
+            result = models[model_name].transcribe(audio_path, language=language, fp16=False)
+            result_queue.put((job_id, True, result["text"].strip()))
+        except Exception as e:
+            result_queue.put((job_id, False, f"{type(e).__name__}: {e}"))
+
+
+class LocalWhisperPool:
+    """Pool of long-lived Whisper processes fed from one job queue."""
+
+    def __init__(self, workers: int = LOCAL_WHISPER_WORKERS, idle_timeout: float = WHISPER_IDLE_TIMEOUT):
+        self.workers = max(1, workers)
+        self.idle_timeout = idle_timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._processes: list = []
+        self._job_queue = None
+        self._result_queue = None
+        self._reader: Optional[threading.Thread] = None
+        self._idle_task: Optional[asyncio.Task] = None
+        self._pending: dict[int, tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._job_ids = itertools.count()
+        self._last_used = time.monotonic()
+
+    @staticmethod
+    def available() -> bool:
+        """Whether the openai-whisper package is installed."""
+        return importlib.util.find_spec("whisper") is not None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._processes)
+
+    async def transcribe(self, audio_path: Path, model: str = "base", language: str = "en") -> str:
+        """
+        Transcribe a file on a warm worker.
+
+        Raises RuntimeError if the worker fails or dies.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        with self._lock:
+            if not self._processes:
+                self._start()
+            job_id = next(self._job_ids)
+            self._pending[job_id] = (loop, future)
+            self._job_queue.put((job_id, str(audio_path), model, language))
+
+        if self._idle_task is None or self._idle_task.done():
+            self._idle_task = asyncio.create_task(self._unload_when_idle())
+
+        try:
+            return await future
+        finally:
+            with self._lock:
+                self._pending.pop(job_id, None)
+                self._last_used = time.monotonic()
+
+    async def close(self):
+        """Stop all workers (pending jobs fail)."""
+        if self._idle_task:
+            self._idle_task.cancel()
+            self._idle_task = None
+        await asyncio.to_thread(self._stop)
+
+    def _start(self):
+        """Spawn workers and the result reader (caller holds the lock)."""
+        num_threads = max(1, CPU_COUNT // self.workers)
+        self._job_queue = self._ctx.Queue()
+        self._result_queue = self._ctx.Queue()
+        self._processes = [
+            self._ctx.Process(
+                target=_worker_main,
+                args=(self._job_queue, self._result_queue, num_threads),
+                daemon=True,
+                name=f"whisper-worker-{i}",
+            )
+            for i in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+
+        self._reader = threading.Thread(
+            target=self._read_results,
+            args=(self._result_queue, self._processes),
+            daemon=True,
+            name="whisper-results",
+        )
+        self._reader.start()
+        self._last_used = time.monotonic()
+        logger.info(f"Started {self.workers} local Whisper workers ({num_threads} threads each)")
+
+    def _detach(self) -> tuple:
+        """
+        Take the running workers, queues and pending jobs off the pool (caller holds the lock).
+
+        The next transcribe() starts a fresh pool; the detached one is shut
+        down with _shutdown outside the lock.
+        """
+        detached = (self._processes, self._job_queue, self._result_queue, list(self._pending.values()))
+        self._processes = []
+        self._job_queue = self._result_queue = None
+        self._pending.clear()
+        return detached
+
+    def _stop(self, graceful: bool = True):
+        """Stop workers and fail pending jobs; graceful lets workers finish their current job."""
+        with self._lock:
+            detached = self._detach()
+        self._shutdown(detached, graceful)
+
+    def _shutdown(self, detached: tuple, graceful: bool = True):
+        """Stop detached workers and fail their pending jobs."""
+        processes, job_queue, result_queue, pending = detached
+        if not processes:
+            return
+
+        for loop, future in pending:
+            loop.call_soon_threadsafe(self._settle, future, False, "Whisper worker pool stopped")
+
+        if graceful:
+            for _ in processes:
+                job_queue.put(None)
+        for process in processes:
+            if graceful:
+                process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=5)
+        result_queue.put(None)  # Stop the reader
+        logger.info("Stopped local Whisper workers")
+
+    def _read_results(self, result_queue, processes):
+        """Resolve futures from worker results; fail everything if a worker dies."""
+        while True:
+            try:
+                item = result_queue.get(timeout=1.0)
+            except queue.Empty:
+                if processes and any(not p.is_alive() for p in processes):
+                    with self._lock:
+                        detached = self._detach() if processes is self._processes else None
+                    if detached:
+                        logger.error("A local Whisper worker died; restarting the pool on next job")
+                        threading.Thread(target=self._shutdown, args=(detached, False), daemon=True).start()
+                        return
+                continue
+
+            if item is None:
+                return
+
+            job_id, ok, payload = item
+            with self._lock:
+                entry = self._pending.get(job_id)
+            if entry:
+                loop, future = entry
+                loop.call_soon_threadsafe(self._settle, future, ok, payload)
+
+    @staticmethod
+    def _settle(future: asyncio.Future, ok: bool, payload: str):
+        if future.done():
+            return
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(RuntimeError(payload))
+
+    async def _unload_when_idle(self):
+        """Stop workers once nothing has run for idle_timeout seconds."""
+        while self.running:
+            await asyncio.sleep(min(self.idle_timeout, 30))
+            # Check and detach together, so a job submitted meanwhile starts a new pool
+            with self._lock:
+                idle = not self._pending and time.monotonic() - self._last_used >= self.idle_timeout
+                detached = self._detach() if idle else None
+            if detached:
+                logger.info(f"Local Whisper idle for {self.idle_timeout:.0f}s, unloading model")
+                await asyncio.to_thread(self._shutdown, detached)
+                return
+
+
+# Shared pool used by the transcription service
+whisper_pool = LocalWhisperPool()
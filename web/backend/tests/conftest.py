@@ -0,0 +1,152 @@
+"""Shared pytest fixtures for the backend."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh, initialized database in a temporary directory."""
+    monkeypatch.setattr(database, "DATABASE_PATH", tmp_path / "cerebro.db")
+    asyncio.run(database.init_db())
+    return database
+
+
+@pytest.fixture
+def http_server():
+    """
+    Start a local HTTP server for the test.
+
+    Call it with a handler(request) returning (status, headers, body); it
+    returns the server's base URL. request has method, path, headers and body.
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from types import SimpleNamespace
+
+    servers = []
+
+    def start(handler):
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = SimpleNamespace(
+                    method=self.command, path=self.path, headers=self.headers,
+                    body=self.rfile.read(length) if length else b"",
+                )
+                status, headers, body = handler(request)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class AnthropicStub:
+    """
+    Stand-in for the Anthropic Messages and Message Batches endpoints.
+
+    Records every request body. Messages are answered by reply(body) ->
+    (text, usage); batches are created "in_progress" and end when a test
+    sets results[batch_id] (a list of result dicts keyed by custom_id) and
+    calls end(batch_id).
+    """
+
+    def __init__(self):
+        self.url = None
+        self.messages = []  # Bodies sent to /v1/messages
+        self.batches = {}  # batch id -> {"body": ..., "status": ...}
+        self.results = {}  # batch id -> list of {"custom_id", "result"}
+        self.reply = lambda body: ("ok", {"input_tokens": 10, "output_tokens": 5})
+
+    def message(self, model: str, text: str, usage: dict) -> dict:
+        return {
+            "id": "msg_stub", "type": "message", "role": "assistant", "model": model,
+            "stop_reason": "end_turn", "stop_sequence": None,
+            "content": [{"type": "text", "text": text}],
+            "usage": {"cache_creation_input_tokens": 0, "cache_read_input_tokens": 0, **usage},
+        }
+
+    def end(self, batch_id: str):
+        self.batches[batch_id]["status"] = "ended"
+
+    def _batch(self, batch_id: str) -> dict:
+        batch = self.batches[batch_id]
+        ended = batch["status"] == "ended"
+        return {
+            "id": batch_id, "type": "message_batch", "processing_status": batch["status"],
+            "request_counts": {
+                "processing": 0 if ended else len(batch["body"]["requests"]),
+                "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0,
+            },
+            "created_at": "2026-01-01T00:00:00Z", "expires_at": "2026-01-02T00:00:00Z",
+            "ended_at": "2026-01-01T01:00:00Z" if ended else None,
+            "archived_at": None, "cancel_initiated_at": None,
+            "results_url": f"{self.url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def handle(self, request):
+        import json
+
+        path = request.path.split("?")[0]
+        if request.method == "POST" and path == "/v1/messages":
+            body = json.loads(request.body)
+            self.messages.append(body)
+            text, usage = self.reply(body)
+            return 200, {"Content-Type": "application/json"}, json.dumps(self.message(body["model"], text, usage)).encode()
+
+        if request.method == "POST" and path == "/v1/messages/batches":
+            batch_id = f"msgbatch_{len(self.batches) + 1}"
+            self.batches[batch_id] = {"body": json.loads(request.body), "status": "in_progress"}
+            return 200, {"Content-Type": "application/json"}, json.dumps(self._batch(batch_id)).encode()
+
+        parts = path.strip("/").split("/")
+        if request.method == "GET" and parts[:3] == ["v1", "messages", "batches"] and parts[3] in self.batches:
+            batch_id = parts[3]
+            if parts[4:] == ["results"]:
+                lines = "\n".join(json.dumps(entry) for entry in self.results.get(batch_id, []))
+                return 200, {"Content-Type": "application/x-jsonl"}, lines.encode()
+            return 200, {"Content-Type": "application/json"}, json.dumps(self._batch(batch_id)).encode()
+
+        return 404, {"Content-Type": "application/json"}, b'{"type": "error", "error": {"type": "not_found_error", "message": "Not found"}}'
+
+
+@pytest.fixture
+def anthropic_stub(http_server, monkeypatch):
+    """An AnthropicStub that services.llm and services.message_batches talk to."""
+    from anthropic import Anthropic
+
+    from services import llm, message_batches
+
+    stub = AnthropicStub()
+    stub.url = http_server(stub.handle)
+
+    def get_client():
+        return Anthropic(api_key="test-key", base_url=stub.url, max_retries=0)
+
+    monkeypatch.setattr(llm, "get_client", get_client)
+    monkeypatch.setattr(message_batches, "get_client", get_client)
+    return stub
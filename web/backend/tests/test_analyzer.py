@@ -0,0 +1,71 @@
+"""Tests for map-reduce chunk summarization in services.analyzer."""
+
+import asyncio
+
+import pytest
+
+from services import analyzer
+from services.llm import LLMResult
+
+
+def test_failed_chunk_stops_unsent_chunks(monkeypatch):
+    sent = []
+
+    async def complete(model_id, user, **kwargs):
+        sent.append(user.split(":")[0])
+        if user.startswith("Part 2 "):
+            raise RuntimeError("API error")
+        await asyncio.sleep(0.05)
+        return LLMResult(text="notes")
+
+    monkeypatch.setattr(analyzer, "complete", complete)
+
+    async def run():
+        results = []
+        with pytest.raises(RuntimeError):
+            async for index, _ in analyzer.summarize_chunks("model", ["a", "b", "c", "d", "e", "f"], "T", "article", fanout=2):
+                results.append(index)
+        # Let anything still scheduled run
+        await asyncio.sleep(0.1)
+        return results
+
+    loop_errors = []
+
+    def run_and_collect():
+        loop = asyncio.new_event_loop()
+        loop.set_exception_handler(lambda loop, context: loop_errors.append(context))
+        try:
+            return loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+    results = run_and_collect()
+
+    assert results == []
+    assert sent == ["Part 1 of 6", "Part 2 of 6"]
+    assert loop_errors == []
+
+
+def test_consumer_stopping_early_cancels_the_rest(monkeypatch):
+    sent = []
+
+    async def complete(model_id, user, **kwargs):
+        sent.append(user.split(":")[0])
+        await asyncio.sleep(0.01 if user.startswith("Part 1 ") else 0.05)
+        return LLMResult(text="notes")
+
+    monkeypatch.setattr(analyzer, "complete", complete)
+
+    async def run():
+        chunks = analyzer.summarize_chunks("model", ["a", "b", "c", "d"], "T", "article", fanout=2)
+        first = await chunks.__anext__()
+        await chunks.aclose()
+        pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        await asyncio.sleep(0.1)
+        return first[0], pending
+
+    first, pending = asyncio.run(run())
+
+    assert first == 0
+    assert pending == []  # Every chunk task was awaited on close
+    assert "Part 4 of 4" not in sent
@@ -0,0 +1,40 @@
+"""Tests for services.captions."""
+
+from services.captions import _sample_rolling_captions, naive_join, normalize_captions
+
+
+def srt(*cues) -> str:
+    """SRT content for (start, end, text) cues."""
+    def time(seconds):
+        return f"00:00:{int(seconds):02d},{int(seconds * 1000) % 1000:03d}"
+    return "\n".join(
+        f"{i}\n{time(start)} --> {time(end)}\n{text}\n"
+        for i, (start, end, text) in enumerate(cues, 1)
+    )
+
+
+def test_rolling_captions_are_deduplicated():
+    content = srt(
+        (0, 2, "so today we're going to talk"),
+        (2, 4, "so today we're going to talk\nabout how transformers work"),
+        (4, 4.01, "about how transformers work"),
+        (4.01, 6, "about how transformers work\nand why attention matters"),
+    )
+    assert normalize_captions(content) == (
+        "so today we're going to talk about how transformers work and why attention matters"
+    )
+
+
+def test_overlapping_cues_are_deduplicated():
+    content = srt((0, 3, "we went to the store"), (2, 5, "the store was closed"))
+    assert normalize_captions(content) == "we went to the store was closed"
+
+
+def test_repeated_words_in_separate_cues_are_kept():
+    content = srt((0, 2, "we went to the store"), (2, 4, "the store was closed so"))
+    assert normalize_captions(content) == "we went to the store the store was closed so"
+
+
+def test_sample_is_much_smaller_than_naive_join():
+    content = _sample_rolling_captions()
+    assert len(normalize_captions(content)) < len(naive_join(content)) / 2
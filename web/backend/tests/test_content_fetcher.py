@@ -0,0 +1,121 @@
+"""Tests for services.content_fetcher."""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from services import content_fetcher
+from services.content_fetcher import (
+    FetchCache, canonical_source_id, canonicalize_url, fetch_article, fetch_content,
+)
+
+real_time = time.time
+
+ARTICLE = (
+    "<html><head>{meta}<title>Café culture</title></head><body><article>"
+    + "<p>The café on the corner, with its worn chairs and strong coffee, "
+      "has been a meeting place for writers, students and neighbours for decades.</p>" * 4
+    + "</article></body></html>"
+)
+
+
+@pytest.mark.parametrize("content_type, meta, encoding", [
+    ("text/html; charset=utf-8", "", "utf-8"),
+    ("text/html; charset=not-a-charset", "", "utf-8"),  # Unknown charset falls back
+    ("text/html", '<meta charset="iso-8859-1">', "iso-8859-1"),  # No header charset: <meta> wins
+])
+def test_fetch_article_encodings(http_server, content_type, meta, encoding):
+    body = ARTICLE.format(meta=meta).encode(encoding)
+    url = http_server(lambda request: (200, {"Content-Type": content_type}, body))
+
+    content, title, _ = asyncio.run(fetch_article(url + "/post"))
+
+    assert title == "Café culture"
+    assert "The café on the corner" in content
+
+
+def test_fetch_cache_max_age(tmp_path, monkeypatch):
+    cache = FetchCache(tmp_path, max_bytes=10_000_000)
+    cache.put("fetch:article:url:https://example.com/a", "text", title="A")
+    assert cache.get("fetch:article:url:https://example.com/a", max_age=3600)["text"] == "text"
+
+    monkeypatch.setattr(time, "time", lambda: real_time() + 7200)
+    assert cache.get("fetch:article:url:https://example.com/a", max_age=3600) is None
+    assert cache.get("fetch:article:url:https://example.com/a") is not None
+
+
+def test_fetch_cache_evicts_least_recently_used(tmp_path):
+    cache = FetchCache(tmp_path, max_bytes=4000)
+    for i in range(10):
+        # Random text so gzip can't shrink it below ~1KB
+        cache.put(f"key-{i}", os.urandom(600).hex())
+        path = cache._path(f"key-{i}")
+        os.utime(path, (i, i))
+
+    assert cache._total == cache._scan_size() <= 4000
+    assert cache.get("key-0") is None
+    assert cache.get("key-9") is not None
+
+
+def test_fetch_content_force_refetches(http_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(content_fetcher, "fetch_cache", FetchCache(tmp_path))
+    pages = iter(["first", "second"])
+
+    def handler(request):
+        body = ARTICLE.format(meta="").replace("strong coffee", f"{next(pages)} coffee")
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, body.encode()
+
+    url = http_server(handler) + "/force-test"
+    first, _, _ = asyncio.run(fetch_content(url, "article"))
+    cached, _, _ = asyncio.run(fetch_content(url, "article"))
+    forced, _, _ = asyncio.run(fetch_content(url, "article", use_cache=False))
+
+    assert "first coffee" in first and "first coffee" in cached
+    assert "second coffee" in forced
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("https://youtu.be/dQw4w9WgXcQ?si=abc", "https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+    ("http://arxiv.org/pdf/2301.01234v2", "https://arxiv.org/abs/2301.01234"),
+    ("http://www.Example.com/post/?utm_source=x&b=2&a=1#top", "https://example.com/post?a=1&b=2"),
+    ("https://medium.com/@a/post?source=rss", "https://medium.com/@a/post"),
+    ("https://news.substack.com/p/post?r=abc&ref=x", "https://news.substack.com/p/post"),
+    # ref/si select content on other sites
+    ("https://github.com/o/r/blob/main/x.md?ref=dev", "https://github.com/o/r/blob/main/x.md?ref=dev"),
+    ("https://example.com/page?si=2", "https://example.com/page?si=2"),
+])
+def test_canonicalize_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+    assert canonical_source_id(url).split(":", 1)[1] in canonical
+
+
+def test_forced_fetch_skips_transcript_cache(tmp_path, monkeypatch):
+    from services import transcription
+
+    monkeypatch.setattr(content_fetcher, "fetch_cache", FetchCache(tmp_path / "cache"))
+    runs = []
+
+    async def download_audio(url, filename=None):
+        path = tmp_path / "episode.mp3"
+        path.write_bytes(b"audio")
+        return path
+
+    async def transcribe_audio(audio_path, use_api, local_model, progress=None):
+        runs.append(audio_path)
+        return f"transcript {len(runs)}"
+
+    monkeypatch.setattr(transcription, "download_audio", download_audio)
+    monkeypatch.setattr(transcription, "transcribe_audio", transcribe_audio)
+
+    url = "https://podcasts.example.com/episode-1.mp3"
+    first, _, _ = asyncio.run(fetch_content(url, "podcast"))
+    cached, _, _ = asyncio.run(fetch_content(url, "podcast"))
+    # Also bypasses the transcript cache, not just the fetch cache
+    forced, _, _ = asyncio.run(fetch_content(url, "podcast", use_cache=False))
+    video, _, _ = asyncio.run(content_fetcher.fetch_youtube_via_audio(
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ", use_cache=False
+    ))
+
+    assert (first, cached, forced, video) == ("transcript 1", "transcript 1", "transcript 2", "transcript 3")
@@ -0,0 +1,24 @@
+"""Tests for routers.export path handling."""
+
+import pytest
+from fastapi import HTTPException
+
+from config import REPORTS_DIR
+from routers.export import _report_path
+
+
+@pytest.mark.parametrize("path", [
+    "../../etc/passwd",
+    "/etc/passwd",
+    "articles/../../web/backend/config.py",
+    "articles/notes.txt",
+])
+def test_rejects_paths_outside_reports(path):
+    with pytest.raises(HTTPException) as exc:
+        _report_path(path)
+    assert exc.value.status_code == 400
+
+
+def test_accepts_report_paths():
+    assert _report_path("articles/2024-01-01-post.md") == REPORTS_DIR / "articles" / "2024-01-01-post.md"
+    assert _report_path("articles/../papers/a.md") == REPORTS_DIR / "papers" / "a.md"
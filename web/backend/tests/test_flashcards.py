@@ -0,0 +1,42 @@
+"""Tests for flashcard ids and syncing."""
+
+import asyncio
+
+import aiosqlite
+
+from config import REPORTS_DIR
+from database import _sync_report_flashcards
+from services.flashcards import extract_flashcards
+
+REPORT = """# Habits
+
+## Key Takeaways
+
+1. Small habits compound into large results over time.
+2. Environment design beats willpower for lasting change.
+"""
+
+
+def test_same_filename_in_different_categories_gets_different_cards():
+    article = extract_flashcards(REPORT, REPORTS_DIR / "articles" / "habits.md")
+    video = extract_flashcards(REPORT, REPORTS_DIR / "youtube" / "habits.md")
+
+    assert len(article) == 2
+    assert not {card.id for card in article} & {card.id for card in video}
+    # Stable across runs
+    assert [c.id for c in article] == [c.id for c in extract_flashcards(REPORT, REPORTS_DIR / "articles" / "habits.md")]
+
+
+def test_sync_does_not_take_over_another_reports_cards(db):
+    cards = [card.to_record() for card in extract_flashcards(REPORT, REPORTS_DIR / "articles" / "habits.md")]
+
+    async def scenario():
+        async with aiosqlite.connect(db.DATABASE_PATH) as conn:
+            await _sync_report_flashcards(conn, 1, cards)
+            # Another report producing the same ids (e.g. cards synced before keys included the category)
+            await _sync_report_flashcards(conn, 2, cards)
+            await conn.commit()
+            cursor = await conn.execute("SELECT DISTINCT report_id FROM flashcards")
+            return await cursor.fetchall()
+
+    assert asyncio.run(scenario()) == [(1,)]
@@ -0,0 +1,31 @@
+"""Tests for services.html_extractor."""
+
+from services.html_extractor import extract_article
+
+PARAGRAPH = (
+    "<p>Habits form through repetition, and the cue, routine and reward loop "
+    "strengthens every time it runs, which is why small, consistent actions "
+    "matter more than occasional bursts of effort.</p>"
+)
+
+
+def test_extracts_article():
+    html = f"<html><head><title>Habits</title></head><body><div class='content'>{PARAGRAPH * 4}</div></body></html>"
+    title, content = extract_article(html)
+    assert title == "Habits"
+    assert "cue, routine and reward" in content
+
+
+def test_form_wrapped_article_still_extracts():
+    # ASP.NET WebForms pages wrap the whole body in one <form>
+    html = (
+        "<html><head><title>Habits</title></head><body>"
+        "<form id='aspnetForm' method='post'><input type='hidden' name='__VIEWSTATE' value='x'>"
+        f"<div class='content'>{PARAGRAPH * 4}</div>"
+        "<button>Subscribe</button><textarea>Leave a comment</textarea>"
+        "</form></body></html>"
+    )
+    _, content = extract_article(html)
+    assert "cue, routine and reward" in content
+    assert "Subscribe" not in content
+    assert "Leave a comment" not in content
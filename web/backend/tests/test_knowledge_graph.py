@@ -0,0 +1,84 @@
+"""Tests for knowledge-graph ingestion in database.py."""
+
+import asyncio
+
+import aiosqlite
+
+CONCEPTS = [{"name": "Habits"}, {"name": "habits"}, {"name": "Repetition", "type": "method"}]
+RELATIONSHIPS = [
+    {"source": "Habits", "target": "Repetition", "type": "uses"},
+    {"source": "Habits", "target": "Unknown"},  # Not an extracted concept: skipped
+]
+
+
+async def add_report(db, report_id: int):
+    async with aiosqlite.connect(db.DATABASE_PATH) as conn:
+        await conn.execute(
+            """INSERT INTO reports (id, filename, filepath, title, content_type, created_at, file_modified_at)
+               VALUES (?, ?, ?, 'Report', 'article', '2026-01-01', '2026-01-01T00:00:00')""",
+            (report_id, f"r{report_id}.md", f"/reports/r{report_id}.md")
+        )
+        await conn.commit()
+
+
+async def graph(db) -> tuple:
+    async with aiosqlite.connect(db.DATABASE_PATH) as conn:
+        concepts = await (await conn.execute("SELECT name, mention_count FROM concepts ORDER BY name")).fetchall()
+        edges = await (await conn.execute("SELECT relationship_type, strength FROM concept_relationships")).fetchall()
+        links = await (await conn.execute("SELECT COUNT(*) FROM report_concepts")).fetchone()
+        return concepts, edges, links[0]
+
+
+def test_ingest_concept_graph(db):
+    async def scenario():
+        await add_report(db, 1)
+        stored = await db.ingest_concept_graph(1, CONCEPTS, RELATIONSHIPS, context="Report")
+        return stored, await graph(db)
+
+    stored, (concepts, edges, links) = asyncio.run(scenario())
+
+    assert stored == {"concepts_stored": 2, "relationships_stored": 1}
+    assert concepts == [("habits", 1), ("repetition", 1)]
+    assert edges == [("uses", 1.0)]
+    assert links == 2
+
+
+def test_reingesting_a_report_replaces_its_contribution(db):
+    async def scenario():
+        await add_report(db, 1)
+        await add_report(db, 2)
+        await db.ingest_concept_graph(1, CONCEPTS, RELATIONSHIPS)
+        await db.ingest_concept_graph(2, CONCEPTS, RELATIONSHIPS)
+        await db.ingest_concept_graph(1, CONCEPTS, RELATIONSHIPS)  # Report 1 changed
+        both = await graph(db)
+
+        # Report 1 no longer mentions the relationship
+        await db.ingest_concept_graph(1, CONCEPTS, [])
+        return both, await graph(db)
+
+    (concepts, edges, links), (_, edges_after, _) = asyncio.run(scenario())
+
+    assert concepts == [("habits", 2), ("repetition", 2)]
+    assert edges == [("uses", 2.0)]
+    assert links == 4
+    assert edges_after == [("uses", 1.0)]
+
+
+def test_extract_all_skips_reports_in_pending_batches_and_reuses_running_job(db):
+    from routers.knowledge_graph import extract_concepts_from_all_reports
+
+    async def scenario():
+        for report_id in (1, 2, 3):
+            await add_report(db, report_id)
+        await db.create_llm_batch("msgbatch_1", "concepts", [("report-2", {"report_id": 2})])
+        needing = [r["id"] for r in await db.get_reports_needing_concepts()]
+
+        await db.create_job("job-1", "concepts", "all")
+        response = await extract_concepts_from_all_reports(limit=None, bulk=False)
+        return needing, response, await db.get_unfinished_jobs("concepts")
+
+    needing, response, jobs = asyncio.run(scenario())
+
+    assert sorted(needing) == [1, 3]
+    assert response["job_id"] == "job-1"
+    assert [job["id"] for job in jobs] == ["job-1"]
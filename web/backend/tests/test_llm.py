@@ -0,0 +1,66 @@
+"""Tests for services.llm request shapes and usage accounting, against a stub API."""
+
+import asyncio
+
+import aiosqlite
+
+from config import MODELS
+from services import llm
+from services.concept_extractor import EXTRACTION_PROMPT, extract_concepts
+
+CACHE_WRITE = {"input_tokens": 40, "output_tokens": 20, "cache_creation_input_tokens": 1500}
+CACHE_READ = {"input_tokens": 40, "output_tokens": 20, "cache_read_input_tokens": 1500}
+
+
+def test_static_prompt_is_a_cached_system_block(db, anthropic_stub):
+    anthropic_stub.reply = lambda body: ('{"concepts": [{"name": "Habits"}], "relationships": []}', CACHE_WRITE)
+
+    result = asyncio.run(extract_concepts("Habits form through repetition.", "Atomic Habits", report_id=7))
+
+    assert result["concepts"][0]["name"] == "Habits"
+    body = anthropic_stub.messages[0]
+    assert body["system"] == [
+        {"type": "text", "text": EXTRACTION_PROMPT, "cache_control": {"type": "ephemeral"}}
+    ]
+    # Only the variable content goes in the messages
+    assert len(body["messages"]) == 1
+    user = body["messages"][0]
+    assert user["role"] == "user"
+    assert "Habits form through repetition." in user["content"]
+    assert "Atomic Habits" in user["content"]
+    assert "knowledge graph" not in user["content"]
+
+
+def test_cache_usage_reaches_result_and_ledger(db, anthropic_stub):
+    model_id = MODELS["sonnet"]["id"]
+    usages = iter([CACHE_WRITE, CACHE_READ])
+    anthropic_stub.reply = lambda body: ("answer", next(usages))
+
+    first = asyncio.run(llm.complete(model_id, "question 1", system="instructions", service="qa", job_id="job-1"))
+    second = asyncio.run(llm.complete(model_id, "question 2", system="instructions", service="qa", report_id=3))
+
+    assert first.text == "answer" and first.model == model_id
+    assert first.usage == {
+        "input_tokens": 40, "output_tokens": 20,
+        "cache_creation_input_tokens": 1500, "cache_read_input_tokens": 0,
+    }
+    assert second.usage["cache_read_input_tokens"] == 1500
+    assert second.usage["cache_creation_input_tokens"] == 0
+
+    async def ledger():
+        async with aiosqlite.connect(db.DATABASE_PATH) as conn:
+            cursor = await conn.execute(
+                """SELECT service, model, input_tokens, output_tokens, cache_creation_tokens,
+                          cache_read_tokens, cost, report_id, job_id
+                   FROM llm_usage ORDER BY id"""
+            )
+            return await cursor.fetchall()
+
+    rows = asyncio.run(ledger())
+    assert [row[:6] for row in rows] == [
+        ("qa", model_id, 40, 20, 1500, 0),
+        ("qa", model_id, 40, 20, 0, 1500),
+    ]
+    assert rows[0][7:] == (None, "job-1") and rows[1][7:] == (3, None)
+    # Cache writes cost more than reads
+    assert rows[0][6] == llm.estimate_cost(first.usage, MODELS["sonnet"]) > rows[1][6] > 0
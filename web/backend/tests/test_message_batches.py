@@ -0,0 +1,182 @@
+"""Tests for services.message_batches against a stub Message Batches API."""
+
+import asyncio
+import json
+
+import aiosqlite
+import pytest
+
+from services import analyzer, content_fetcher, message_batches
+
+ANALYSIS_USAGE = {"input_tokens": 900, "output_tokens": 400}
+
+
+@pytest.fixture
+def batches(db, anthropic_stub, monkeypatch):
+    """Stub API plus a database; the background poller is driven by hand."""
+    monkeypatch.setattr(message_batches.batch_poller, "start", lambda: None)
+    return anthropic_stub
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    """Record save_analysis calls (instead of writing reports) and complete the job."""
+    calls = []
+
+    async def save_analysis(job_id, title, source, content_type, analysis):
+        calls.append(job_id)
+        await message_batches.update_job_status(job_id, "completed", result_filepath=f"reports/{job_id}.md")
+
+    monkeypatch.setattr(analyzer, "save_analysis", save_analysis)
+    return calls
+
+
+def succeeded(custom_id: str, stub, text: str, model: str = "claude-sonnet-4-20250514") -> dict:
+    return {"custom_id": custom_id, "result": {"type": "succeeded", "message": stub.message(model, text, ANALYSIS_USAGE)}}
+
+
+def errored(custom_id: str, message: str) -> dict:
+    return {"custom_id": custom_id, "result": {
+        "type": "errored", "error": {"type": "error", "error": {"type": "invalid_request_error", "message": message}},
+    }}
+
+
+async def rows(db, sql: str, *params) -> list:
+    async with aiosqlite.connect(db.DATABASE_PATH) as conn:
+        cursor = await conn.execute(sql, params)
+        return await cursor.fetchall()
+
+
+async def submit_analyses(db, monkeypatch, urls: list[str]) -> list[str]:
+    async def fetch_content(url, content_type, progress=None, use_cache=True):
+        return f"Article text of {url}", f"Title of {url}", url
+
+    monkeypatch.setattr(content_fetcher, "fetch_content", fetch_content)
+    items = []
+    for i, url in enumerate(urls):
+        await db.create_job(f"job-{i}", "article", url)
+        items.append({"job_id": f"job-{i}", "url": url, "content_type": "article", "model": "sonnet"})
+    return await message_batches.submit_analysis_batch(items)
+
+
+async def poll_all():
+    for batch in await message_batches.get_unfinished_llm_batches():
+        await message_batches.batch_poller.poll(batch)
+
+
+def test_submit_records_batch_and_items(db, batches, monkeypatch):
+    async def scenario():
+        batch_ids = await submit_analyses(db, monkeypatch, ["https://a.example/1", "https://b.example/2"])
+        return batch_ids, await db.get_llm_batch(batch_ids[0]), await rows(
+            db, "SELECT custom_id, payload, status FROM llm_batch_items ORDER BY custom_id"
+        )
+
+    batch_ids, batch, items = asyncio.run(scenario())
+
+    assert batch_ids == ["msgbatch_1"]
+    assert batch["kind"] == "analysis" and batch["status"] == "in_progress"
+    assert batch["request_count"] == 2 and batch["items"] == {"pending": 2}
+    assert [(custom_id, status) for custom_id, _, status in items] == [("job-0", "pending"), ("job-1", "pending")]
+    assert json.loads(items[0][1])["source"] == "https://a.example/1"
+
+    requests = batches.batches["msgbatch_1"]["body"]["requests"]
+    assert [r["custom_id"] for r in requests] == ["job-0", "job-1"]
+    assert requests[0]["params"]["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert requests[0]["params"]["messages"][0]["content"].endswith("Article text of https://a.example/1")
+
+
+def test_ended_batch_applies_results(db, batches, saved, monkeypatch, tmp_path):
+    async def scenario():
+        await submit_analyses(db, monkeypatch, ["https://a.example/1"])
+
+        # A concept batch for a report
+        report = tmp_path / "report.md"
+        report.write_text("# Habits\n\nHabits form through repetition.", encoding="utf-8")
+        async with aiosqlite.connect(db.DATABASE_PATH) as conn:
+            await conn.execute(
+                """INSERT INTO reports (id, filename, filepath, title, content_type, created_at, file_modified_at)
+                   VALUES (1, 'report.md', ?, 'Habits', 'article', '2026-01-01', '2026-01-01T00:00:00')""",
+                (str(report),)
+            )
+            await conn.commit()
+        await message_batches.submit_concept_batch([1])
+
+        await poll_all()  # Still in progress: nothing applied
+        assert saved == []
+
+        batches.results["msgbatch_1"] = [succeeded("job-0", batches, "# Analysis")]
+        batches.results["msgbatch_2"] = [succeeded(
+            "report-1", batches, '{"concepts": [{"name": "Habits"}, {"name": "Repetition"}], '
+            '"relationships": [{"source": "Habits", "target": "Repetition", "type": "uses"}]}',
+        )]
+        batches.end("msgbatch_1")
+        batches.end("msgbatch_2")
+        await poll_all()
+
+        return (
+            await db.get_job("job-0"),
+            await db.get_llm_batch("msgbatch_1"),
+            await rows(db, "SELECT c.name FROM report_concepts rc JOIN concepts c ON c.id = rc.concept_id ORDER BY c.name"),
+            await rows(db, "SELECT service, cost FROM llm_usage ORDER BY service"),
+        )
+
+    job, batch, concepts, usage = asyncio.run(scenario())
+
+    assert saved == ["job-0"]
+    assert job["status"] == "completed"
+    assert batch["status"] == "processed" and batch["succeeded_count"] == 1
+    assert concepts == [("habits",), ("repetition",)]
+    assert [service for service, _ in usage] == ["analysis", "concepts"]
+
+
+def test_errored_and_missing_results_fail_jobs(db, batches, saved, monkeypatch):
+    async def scenario():
+        await submit_analyses(db, monkeypatch, ["https://a.example/1", "https://b.example/2", "https://c.example/3"])
+        batches.results["msgbatch_1"] = [
+            succeeded("job-0", batches, "# Analysis"),
+            errored("job-1", "prompt is too long"),
+            # No result at all for job-2
+        ]
+        batches.end("msgbatch_1")
+        await poll_all()
+        return [await db.get_job(f"job-{i}") for i in range(3)], await db.get_llm_batch("msgbatch_1")
+
+    jobs, batch = asyncio.run(scenario())
+
+    assert [job["status"] for job in jobs] == ["completed", "failed", "failed"]
+    assert jobs[1]["error_message"] == "prompt is too long"
+    assert jobs[2]["error_message"] == "No result in message batch"
+    assert batch["succeeded_count"] == 1 and batch["failed_count"] == 2
+
+
+def test_restart_does_not_reapply_results(db, batches, saved, monkeypatch):
+    async def scenario():
+        await submit_analyses(db, monkeypatch, ["https://a.example/1", "https://b.example/2"])
+        batches.results["msgbatch_1"] = [
+            succeeded("job-0", batches, "# Analysis 0"),
+            succeeded("job-1", batches, "# Analysis 1"),
+        ]
+        batches.end("msgbatch_1")
+
+        # Shut down while applying the second result
+        real_save = analyzer.save_analysis
+
+        async def interrupted(job_id, *args):
+            if job_id == "job-1":
+                raise asyncio.CancelledError
+            await real_save(job_id, *args)
+
+        monkeypatch.setattr(analyzer, "save_analysis", interrupted)
+        with pytest.raises(asyncio.CancelledError):
+            await poll_all()
+        assert (await db.get_llm_batch("msgbatch_1"))["status"] == "in_progress"
+
+        # Restarted: the poller resumes the unfinished batch
+        monkeypatch.setattr(analyzer, "save_analysis", real_save)
+        await poll_all()
+        return await db.get_llm_batch("msgbatch_1")
+
+    batch = asyncio.run(scenario())
+
+    assert saved == ["job-0", "job-1"]
+    assert batch["status"] == "processed" and batch["succeeded_count"] == 2
@@ -0,0 +1,31 @@
+"""Tests for services.transcription segment stitching."""
+
+from services.transcription import stitch_transcripts
+
+
+def test_removes_the_overlap():
+    first = "we started the project in spring and by the summer we had a working prototype"
+    second = "Summer, we had a working prototype that we showed to our first customers"
+    assert stitch_transcripts([first, second]) == (
+        "we started the project in spring and by the Summer, we had a working prototype "
+        "that we showed to our first customers"
+    )
+
+
+def test_tolerates_garbled_words_at_the_edges():
+    first = "and that is why the model needs more data to generaliz-"
+    second = "uh model needs more data to generalize well in practice"
+    assert stitch_transcripts([first, second]) == (
+        "and that is why the model needs more data to generalize well in practice"
+    )
+
+
+def test_ignores_repeated_phrases_away_from_the_boundary():
+    # "and so the" repeats, but not at the segment edges: nothing is dropped
+    first = "and so the first result was surprising to everyone in the lab that week"
+    second = "because nobody expected it and so the second experiment was designed"
+    assert stitch_transcripts([first, second]) == f"{first} {second}"
+
+
+def test_concatenates_without_a_match():
+    assert stitch_transcripts(["one two three", "four five six"]) == "one two three four five six"